@@ -0,0 +1,111 @@
+'''
+    Filename: block_memory.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import os
+import sys
+import time
+import random
+import getopt
+import tempfile
+import resource
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from cstyle import CStyleChecker
+from corpus import FUNCTIONS
+
+
+# Write a file of about size_mb MB of C functions to path
+def generate(path, size_mb, seed):
+    rand = random.Random(seed)
+    size = size_mb << 20
+    written = 0
+    n = 0
+    with open(path, 'w') as f:
+        while written < size:
+            chunk = []
+            for _ in range(1000):
+                template = rand.choice(FUNCTIONS)
+                chunk.append(template.replace('%d', str(n)) + '\n')
+                n += 1
+            chunk = ''.join(chunk)
+            f.write(chunk)
+            written += len(chunk)
+
+
+# Read the file and build the tree of blocks, and print the number of lines
+# and blocks, the seconds the tree took and the peak RSS in KB before and
+# after building it
+def measure(path):
+    checker = CStyleChecker(path, indent_amt=2)
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.time()
+    checker.build_tree()
+    elapsed = time.time() - start
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print('%d %d %f %d %d' % (len(checker.lines), len(checker.block_cache), elapsed,
+                              before, after))
+
+
+def print_memory(path):
+    size = os.path.getsize(path)
+    out = subprocess.check_output([sys.executable, os.path.abspath(__file__),
+                                   '--measure', path])
+    num_lines, num_blocks, elapsed, before, after = out.decode('ascii').split()
+    print('File: %s (%.1f MB, %s lines)' % (path, size / float(1 << 20), num_lines))
+    print('Blocks: %s' % num_blocks)
+    print('Parse time: %.2f s' % float(elapsed))
+    print('Peak RSS before parsing: %.1f MB' % (int(before) / 1024.0))
+    print('Peak RSS after parsing: %.1f MB' % (int(after) / 1024.0))
+    print('Bytes per block: %.0f' % ((int(after) - int(before)) * 1024.0 / int(num_blocks)))
+
+
+def usage():
+    print('Usage: python block_memory.py [-h] [--size <MB>] [--seed <seed>] [file]')
+    print('            -h/--help: Show help message')
+    print('            --size: Size of the file generated when none is passed (default: 5)')
+    print('            --seed: Seed of the generated file')
+
+
+if __name__ == '__main__':
+    argv = sys.argv[1:]
+    try:
+        opts, args = getopt.getopt(argv, "h", ["help", "size=", "seed=", "measure"])
+    except getopt.GetoptError:
+        usage()
+        sys.exit(2)
+
+    size_mb = 5
+    seed = 0
+    run_measure = False
+    for opt, arg in opts:
+        if opt in ('-h', '--help'):
+            usage()
+            sys.exit()
+        elif opt == '--size':
+            size_mb = int(arg)
+        elif opt == '--seed':
+            seed = int(arg)
+        elif opt == '--measure':
+            # Run by print_memory so the peak memory is only that of the file
+            run_measure = True
+
+    if run_measure:
+        measure(args[0])
+    elif len(args) != 0:
+        print_memory(args[0])
+    else:
+        fd, path = tempfile.mkstemp(suffix='.c')
+        os.close(fd)
+        try:
+            generate(path, size_mb, seed)
+            print_memory(path)
+        finally:
+            os.remove(path)
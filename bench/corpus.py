@@ -0,0 +1,230 @@
+'''
+    Filename: corpus.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import os
+import sys
+import random
+import getopt
+
+# Functions the realistic C files are made of. %d is replaced by a number so
+# every function has a name of its own
+FUNCTIONS = [
+    '/*\n * Function: add%d\n * Adds the two numbers\n */\n'
+    'int add%d(int a, int b) {\n  return a + b;\n}\n',
+
+    'int count%d(int *values, int len) {\n  int total = 0;\n'
+    '  for (int i = 0; i < len; i++) {\n    if (values[i] > 0) {\n'
+    '      total++;\n    } else {\n      total--;\n    }\n  }\n\n'
+    '  return total;\n}\n',
+
+    'int pick%d(int c) {\n  switch (c) {\n    case 1:\n      return 2;\n'
+    '    case 2: {\n      int x = c * 2;\n      return x;\n    }\n'
+    '    default:\n      break;\n  }\n  // Nothing matched\n  return 0;\n}\n',
+
+    'struct point%d {\n  int x;\n  int y;\n};\n',
+
+    '#define MAX%d(a, b) \\\n  ((a) > (b) ? (a) : (b))\n',
+
+    'void loop%d(void) {\n  int n = 0;\n  do {\n    n++;\n  } while (n < 4);\n'
+    '  while (n > 0)\n    n--;\n}\n',
+]
+
+# Statements the nested and long C blocks are filled with
+STATEMENTS = [
+    'x += 1;', 'y = x * 2;', 'total = total + values[i];', 'printf("%d\\n", x);',
+    'if (x > y) return x;', 'x = y ? x : 0;  // Pick one', 'buf[i] = \'a\';',
+    'name = "a string with { and ; in it";', '/* Short comment */',
+]
+
+# Lines the assembly files are made of, the instructions indented with tabs
+# and some of them with spaces
+INSTRUCTIONS = [
+    '\tmov\tr0, #5', '\tadd\tr1, r1, r2', '\tldr\tr0, =label', '\tstr\tr1, [sp, #4]',
+    '\tcmp\tr0, #0', '\tbne\tloop', '\tbx\tlr', '\tpush\t{r4, lr}', '\tpop\t{r4, pc}',
+    '\tmov\tr2, r3\t@ Copy it', '    mov r0, r1', '\t.word\t0x1234',
+]
+
+
+# Realistic C: n functions, structures and macros
+def c_functions(rand, n):
+    out = []
+    for i in range(n):
+        out.append(rand.choice(FUNCTIONS).replace('%d', str(i)) + '\n')
+    return ''.join(out)
+
+
+# A function with n blocks nested in each other
+def c_deep_nesting(rand, n):
+    out = ['int nested(int x, int y) {']
+    for depth in range(1, n+1):
+        indent = '  ' * depth
+        keyword = rand.choice(['if (x > %d)' % depth, 'while (y < x)',
+                               'for (int i%d = 0; i%d < x; i%d++)' % (depth, depth, depth)])
+        out.append('%s%s {' % (indent, keyword))
+        out.append('%s  %s' % (indent, rand.choice(STATEMENTS)))
+    for depth in range(n, 0, -1):
+        out.append('%s}' % ('  ' * depth))
+    out.append('  return x;')
+    out.append('}')
+    return '\n'.join(out) + '\n'
+
+
+# A switch with n cases, some of them with curly braces
+def c_switch(rand, n):
+    out = ['int dispatch(int c) {', '  int x = 0;', '  switch (c) {']
+    for i in range(n):
+        if rand.random() < 0.25:
+            out.append('    case %d: {' % i)
+            out.append('      int y = c + %d;' % i)
+            out.append('      x = y;')
+            out.append('      break;')
+            out.append('    }')
+        else:
+            out.append('    case %d:' % i)
+            out.append('      %s' % rand.choice(STATEMENTS))
+            out.append('      break;')
+    out.extend(['    default:', '      x = -1;', '  }', '  return x;', '}'])
+    return '\n'.join(out) + '\n'
+
+
+# An if followed by n else ifs and an else
+def c_else_if(rand, n):
+    out = ['int classify(int x) {', '  if (x == 0) {', '    return 0;']
+    for i in range(1, n+1):
+        out.append('  } else if (x == %d) {' % i)
+        out.append('    %s' % rand.choice(STATEMENTS))
+    out.extend(['  } else {', '    return -1;', '  }', '}'])
+    return '\n'.join(out) + '\n'
+
+
+# A table initialized with n rows of numbers
+def c_table(rand, n):
+    out = ['static const int table[%d][4] = {' % n]
+    for _ in range(n):
+        out.append('  {%s},' % ', '.join([str(rand.randint(0, 65535)) for _ in range(4)]))
+    out.append('};')
+    return '\n'.join(out) + '\n'
+
+
+# n block comments of a few lines each, between short functions
+def c_block_comments(rand, n):
+    out = []
+    for i in range(n):
+        out.append('/*')
+        for _ in range(rand.randint(1, 6)):
+            out.append(' * %s' % rand.choice(STATEMENTS))
+        out.append(' */')
+        out.append('int get%d(void) { return %d; }  /* Inline */' % (i, i))
+        out.append('')
+    return '\n'.join(out) + '\n'
+
+
+# A function with 64 statements that are n characters long each
+def c_long_lines(rand, n):
+    out = ['int sum(int *v) {', '  int x = 0;']
+    for _ in range(64):
+        line = ['  x = x']
+        length = len(line[0])
+        while length < n:
+            term = ' + v[%d]' % rand.randint(0, 999)
+            line.append(term)
+            length += len(term)
+        line.append(';')
+        out.append(''.join(line))
+    out.extend(['  return x;', '}'])
+    return '\n'.join(out) + '\n'
+
+
+# Assembly with n functions of labels, instructions and comments
+def s_functions(rand, n):
+    out = []
+    for i in range(n):
+        out.append('/*')
+        out.append(' * Function: func%d' % i)
+        out.append(' */')
+        out.append('\t.global\tfunc%d' % i)
+        out.append('func%d:' % i)
+        for _ in range(rand.randint(4, 24)):
+            out.append(rand.choice(INSTRUCTIONS))
+        if rand.random() < 0.3:
+            out.append('loop%d:\t\t@ Loop back here' % i)
+            out.append('\tb\tloop%d' % i)
+        out.append('')
+    return '\n'.join(out) + '\n'
+
+
+# Every kind of file, with its extension and what n is for
+GENERATORS = {
+    'c-functions': (c_functions, '.c', 'functions'),
+    'c-deep-nesting': (c_deep_nesting, '.c', 'levels of nesting'),
+    'c-switch': (c_switch, '.c', 'cases'),
+    'c-else-if': (c_else_if, '.c', 'else ifs'),
+    'c-table': (c_table, '.c', 'rows'),
+    'c-block-comments': (c_block_comments, '.c', 'comments'),
+    'c-long-lines': (c_long_lines, '.c', 'characters per line'),
+    's-functions': (s_functions, '.s', 'functions'),
+}
+
+
+# Returns the text of a file of the kind named kind with n of what the kind
+# is made of. The same seed always gives the same text
+def generate(kind, n, seed=0):
+    return GENERATORS[kind][0](random.Random('%s:%d:%d' % (kind, n, seed)), n)
+
+
+# Write a file of kind to directory and return its path
+def write(directory, kind, n, seed=0):
+    path = os.path.join(directory, '%s-%d%s' % (kind, n, GENERATORS[kind][1]))
+    with open(path, 'w') as f:
+        f.write(generate(kind, n, seed))
+    return path
+
+
+def usage():
+    print('Usage: python corpus.py [-h] [-n <count>] [--seed <seed>] [--kind <kind>] <directory>')
+    print('            -h/--help: Show help message')
+    print('            -n: How many of what the kind is made of each file has (default: 100)')
+    print('            --seed: Seed of the files')
+    print('            --kind: Kind of file to write (can be passed more than once, default: all)')
+    for kind in sorted(GENERATORS):
+        print('                %s: n %s' % (kind, GENERATORS[kind][2]))
+
+
+if __name__ == '__main__':
+    argv = sys.argv[1:]
+    try:
+        opts, args = getopt.getopt(argv, "hn:", ["help", "seed=", "kind="])
+    except getopt.GetoptError:
+        usage()
+        sys.exit(2)
+
+    n = 100
+    seed = 0
+    kinds = []
+    for opt, arg in opts:
+        if opt in ('-h', '--help'):
+            usage()
+            sys.exit()
+        elif opt == '-n':
+            n = int(arg)
+        elif opt == '--seed':
+            seed = int(arg)
+        elif opt == '--kind':
+            if arg not in GENERATORS:
+                print('Unknown kind %s' % arg)
+                sys.exit(2)
+            kinds.append(arg)
+
+    if len(args) != 1:
+        usage()
+        sys.exit(2)
+
+    if not os.path.isdir(args[0]):
+        os.makedirs(args[0])
+    for kind in kinds or sorted(GENERATORS):
+        print(write(args[0], kind, n, seed))
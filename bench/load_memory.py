@@ -0,0 +1,134 @@
+'''
+    Filename: load_memory.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import os
+import sys
+import time
+import random
+import getopt
+import tempfile
+import resource
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from source import read_source, split_lines, iter_split_lines, MappedLines, ExpandedLines, TabLines
+
+TAB_LENGTH = 4
+# Lines the generated file is made of, some of them with tabs
+LINES = [
+    '\tmov r0, #5', '\tadd r1, r1, r2', 'loop:', '/* comment */', '', '\t.global main',
+    '    ldr r0, =label', '\tb loop\t@ back', 'main:', '\tbx lr'
+]
+# How each loader is run, in a process of its own so peak memory is its own
+LOADERS = ['read', 'single', 'map']
+
+
+# Write a file of about size_mb MB of assembly lines to path
+def generate(path, size_mb, seed):
+    rand = random.Random(seed)
+    size = size_mb << 20
+    written = 0
+    with open(path, 'w') as f:
+        while written < size:
+            chunk = '\n'.join([rand.choice(LINES) for _ in range(10000)]) + '\n'
+            f.write(chunk)
+            written += len(chunk)
+
+
+# Load the file the way the checkers did before, with every line read into
+# a list and a second list with the tabs expanded
+def load_read(path):
+    og_lines = split_lines(read_source(path))
+    lines = [l.replace('\t', ' ' * TAB_LENGTH) for l in og_lines]
+    return og_lines, lines
+
+
+# Load the file the way the checkers do for files under the size they are
+# mapped at, with a single list of the lines
+def load_single(path):
+    lines = TabLines(iter_split_lines(read_source(path)), TAB_LENGTH)
+    return lines, lines
+
+
+def load_map(path):
+    og_lines = MappedLines(path)
+    return og_lines, ExpandedLines(og_lines, TAB_LENGTH)
+
+
+# Load the file, use every line once and print the number of lines, the
+# seconds it took and the peak RSS in KB
+def measure(loader, path):
+    start = time.time()
+    og_lines, lines = LOAD[loader](path)
+    total = 0
+    for line in lines:
+        total += len(line)
+    elapsed = time.time() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print('%d %f %d' % (len(og_lines), elapsed, peak))
+
+
+LOAD = {'read': load_read, 'single': load_single, 'map': load_map}
+
+
+def print_memory(path):
+    size = os.path.getsize(path)
+    print('File: %s (%.1f MB)' % (path, size / float(1 << 20)))
+    print('%-8s %10s %10s %14s' % ('Loader', 'Lines', 'Time (s)', 'Peak RSS (MB)'))
+    for loader in LOADERS:
+        out = subprocess.check_output([sys.executable, os.path.abspath(__file__),
+                                       '--measure', loader, path])
+        num_lines, elapsed, peak = out.decode('ascii').split()
+        print('%-8s %10s %10.2f %14.1f' % (loader, num_lines, float(elapsed),
+                                            int(peak) / 1024.0))
+
+
+def usage():
+    print('Usage: python load_memory.py [-h] [--size <MB>] [--seed <seed>] [file]')
+    print('            -h/--help: Show help message')
+    print('            --size: Size of the file generated when none is passed (default: 100)')
+    print('            --seed: Seed of the generated file')
+
+
+if __name__ == '__main__':
+    argv = sys.argv[1:]
+    try:
+        opts, args = getopt.getopt(argv, "h", ["help", "size=", "seed=", "measure="])
+    except getopt.GetoptError:
+        usage()
+        sys.exit(2)
+
+    size_mb = 100
+    seed = 0
+    loader = None
+    for opt, arg in opts:
+        if opt in ('-h', '--help'):
+            usage()
+            sys.exit()
+        elif opt == '--size':
+            size_mb = int(arg)
+        elif opt == '--seed':
+            seed = int(arg)
+        elif opt == '--measure':
+            # Run by print_memory to measure one loader
+            loader = arg
+
+    if loader is not None:
+        measure(loader, args[0])
+    elif len(args) != 0:
+        print_memory(args[0])
+    else:
+        fd, path = tempfile.mkstemp(suffix='.s')
+        os.close(fd)
+        try:
+            generate(path, size_mb, seed)
+            print_memory(path)
+        finally:
+            os.remove(path)
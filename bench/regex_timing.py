@@ -0,0 +1,163 @@
+'''
+    Filename: regex_timing.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import os
+import re
+import sys
+import time
+import random
+import getopt
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import cstyle
+from cstyle import STD_CHARS_REGEXP, ASSIGNMENT_OPS_REGEXP
+
+# The obvious versions of the code detection patterns that cstyle.py used to
+# have. They accept the same lines as the ones in cstyle.py but backtrack
+# exponentially on some of them
+OLD_LVALUES_REGEXP = "(|\\()(\\** *)(|\\(*)((%s)|(%s))((\\.(%s).*(|\\)))|(\\-\\>(%s).*(|\\)))|" \
+                     "(\\[.+\\](|\\))))*(|\\))" \
+                     % (STD_CHARS_REGEXP, " *[a-zA-Z_][a-zA-Z0-9_]* *\\(.*\\) *",
+                        STD_CHARS_REGEXP, STD_CHARS_REGEXP)
+OLD_FUNC_KEYWORDS = [
+    'static *', 'const *', 'struct *', 'static struct *', 'const struct *', 'enum *',
+    'static enum *', 'const enum *', 'unsigned *', 'static unsigned *', 'const unsigned *',
+    'long *', 'static long *', 'const long *', 'signed *', 'static signed *', 'const signed *',
+    'unsigned short *', 'static unsigned short *', 'const unsigned short *',
+    'short *', 'static short *', 'const short *', 'unsigned long *', 'static unsigned long *',
+    'const unsigned long *', 'long long *', 'static long long *', 'const long long *',
+    'unsigned long long *', 'static unsigned long long *', 'const unsigned long long *'
+]
+OLD_KEYWORDS_REGEXP = " *(%s|)" % "|".join(OLD_FUNC_KEYWORDS)
+OLD_PATTERNS = {
+    'FUNC': OLD_KEYWORDS_REGEXP + "(%s)(\\** +| +\\**| +\\** +)(%s)( )*(\\(.*\\))"
+            % (STD_CHARS_REGEXP, STD_CHARS_REGEXP),
+    'FUNC_HDR': OLD_KEYWORDS_REGEXP + "%s(\\** +| +\\**| +\\** +)%s( )*\\(.*\\) *; *\\Z"
+                % (STD_CHARS_REGEXP, STD_CHARS_REGEXP),
+    'ASSIGNMENT': " *%s *%s.* *;" % (OLD_LVALUES_REGEXP, ASSIGNMENT_OPS_REGEXP),
+    'DEC_ASSIGNMENT': OLD_KEYWORDS_REGEXP + "%s(\\** +| +\\**| +\\** +)%s( *, *%s)* *=.* *;"
+                      % (STD_CHARS_REGEXP, STD_CHARS_REGEXP, STD_CHARS_REGEXP),
+    'DECLARATIONS': OLD_KEYWORDS_REGEXP + "%s(\\** +| +\\**| +\\** +)%s( *, *%s)* *;"
+                    % (STD_CHARS_REGEXP, STD_CHARS_REGEXP, STD_CHARS_REGEXP),
+    'INCREMENT': " *%s *\\+\\+;" % OLD_LVALUES_REGEXP,
+    'DECREMENT': " *%s *\\-\\-;" % OLD_LVALUES_REGEXP,
+}
+NEW_PATTERNS = {
+    'FUNC': cstyle.FUNC_REGEXP,
+    'FUNC_HDR': cstyle.FUNC_HDR_REGEXP,
+    'ASSIGNMENT': cstyle.ASSIGNMENT_REGEXP,
+    'DEC_ASSIGNMENT': cstyle.DEC_ASSIGNMENT_REGEXP,
+    'DECLARATIONS': cstyle.DECLARATIONS_REGEXP,
+    'INCREMENT': cstyle.INCREMENT_REGEXP,
+    'DECREMENT': cstyle.DECREMENT_REGEXP,
+}
+PATTERN_NAMES = ['FUNC', 'FUNC_HDR', 'ASSIGNMENT', 'DEC_ASSIGNMENT', 'DECLARATIONS',
+                 'INCREMENT', 'DECREMENT']
+
+# Inputs that do not match and make the old patterns backtrack the most.
+# Each is (pattern name, description, function from a size to the input)
+ADVERSARIAL_INPUTS = [
+    ('FUNC', 'static int x  ... (no paren', lambda n: 'static int x' + ' ' * n),
+    ('FUNC', 'int f(((...  (no close', lambda n: 'int f' + '(' * n),
+    ('FUNC_HDR', 'int f() ) ) ...', lambda n: 'int f(' + ') ' * n + 'x'),
+    ('ASSIGNMENT', 'a.b.b.b ... (no op', lambda n: 'a' + '.b' * n),
+    ('ASSIGNMENT', 'a[x][x] ... (no op', lambda n: 'a' + '[x]' * n),
+    ('ASSIGNMENT', 'a->b[x]->b ... =', lambda n: 'a' + '->b[x]' * n + ' ='),
+    ('ASSIGNMENT', 'f(x)(x)) ... (no op', lambda n: 'f(' + 'x)' * n),
+    ('ASSIGNMENT', 'a[x]=]=]= ... (no ;', lambda n: 'a[x' + ']=' * n),
+    ('DEC_ASSIGNMENT', 'int a, b, c ... = (no ;', lambda n: 'int a' + ', b' * n + ' = 1'),
+    ('DEC_ASSIGNMENT', 'int a = ' + '  ... (no ;', lambda n: 'int a = ' + ' ' * n),
+    ('DECLARATIONS', 'int a, b, c ... (no ;', lambda n: 'int a' + ', b' * n),
+    ('INCREMENT', 'a.b.b.b ... (no ++', lambda n: 'a' + '.b' * n),
+    ('DECREMENT', 'a[x].b[x] ... (no --', lambda n: 'a' + '[x].b' * n),
+]
+SIZES = [4, 8, 12, 16, 20, 24, 100, 1000, 10000]
+# Stop timing an old pattern on an input once a single match takes longer
+OLD_TIME_LIMIT = 0.5
+
+# Pieces random lines are made of when looking for differences
+FUZZ_TOKENS = [
+    ' ', ' ', '  ', '(', ')', '*', '[', ']', '.', '->', '-', '>', ',', ';', '=', '+=',
+    '<<=', '>>=', '|=', '++', '--', '+', 'a', 'b1', '_x', 'int', 'static', 'const',
+    'unsigned', 'long', 'short', 'struct', 'enum', 'signed', 'void', '0', '\t', '\n', '/'
+]
+
+
+def time_match(ptrn, s):
+    start = time.time()
+    ptrn.match(s)
+    return time.time() - start
+
+
+def print_timings():
+    old = dict([(name, re.compile(OLD_PATTERNS[name])) for name in PATTERN_NAMES])
+    new = dict([(name, re.compile(NEW_PATTERNS[name])) for name in PATTERN_NAMES])
+
+    print('%-16s %-28s %6s %12s %12s' % ('Pattern', 'Input', 'Size', 'Old (ms)', 'New (ms)'))
+    for name, desc, make in ADVERSARIAL_INPUTS:
+        old_done = False
+        for n in SIZES:
+            s = make(n)
+            if old_done:
+                old_ms = '-'
+            else:
+                elapsed = time_match(old[name], s)
+                old_done = elapsed > OLD_TIME_LIMIT
+                old_ms = '%.3f' % (elapsed * 1000)
+            new_ms = '%.3f' % (time_match(new[name], s) * 1000)
+            print('%-16s %-28s %6d %12s %12s' % (name, desc, n, old_ms, new_ms))
+
+
+# Check that the old and new patterns accept the same random lines
+# Returns the number of lines they disagree on
+def fuzz(count, seed):
+    rand = random.Random(seed)
+    old = [re.compile(OLD_PATTERNS[name]) for name in PATTERN_NAMES]
+    new = [re.compile(NEW_PATTERNS[name]) for name in PATTERN_NAMES]
+    differences = 0
+    for i in range(count):
+        s = ''.join([rand.choice(FUZZ_TOKENS) for _ in range(rand.randint(1, 10))])
+        for name, old_ptrn, new_ptrn in zip(PATTERN_NAMES, old, new):
+            if (old_ptrn.match(s) is None) != (new_ptrn.match(s) is None):
+                differences += 1
+                print('%s differs on %r' % (name, s))
+
+    print('Fuzzed %d lines, %d differences' % (count, differences))
+    return differences
+
+
+def usage():
+    print('Usage: python regex_timing.py [-h] [--fuzz <count>] [--seed <seed>]')
+    print('            -h/--help: Show help message')
+    print('            --fuzz: Compare the old and new patterns on this many random lines')
+    print('            --seed: Seed of the random lines')
+
+
+if __name__ == '__main__':
+    argv = sys.argv[1:]
+    try:
+        opts, args = getopt.getopt(argv, "h", ["help", "fuzz=", "seed="])
+    except getopt.GetoptError:
+        usage()
+        sys.exit(2)
+
+    count = 0
+    seed = 0
+    for opt, arg in opts:
+        if opt in ('-h', '--help'):
+            usage()
+            sys.exit()
+        elif opt == '--fuzz':
+            count = int(arg)
+        elif opt == '--seed':
+            seed = int(arg)
+
+    if count:
+        sys.exit(1 if fuzz(count, seed) else 0)
+    print_timings()
@@ -0,0 +1,177 @@
+'''
+    Filename: scaling.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import os
+import sys
+import time
+import getopt
+import shutil
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+import corpus
+from cstyle import CStyleChecker
+from sstyle import SStyleChecker
+
+# Each kind of file from corpus.py and the n it starts at
+CASES = [
+    ('c-functions', 1000),
+    ('c-deep-nesting', 50),
+    ('c-switch', 250),
+    ('c-else-if', 250),
+    ('c-table', 1000),
+    ('c-block-comments', 200),
+    ('c-long-lines', 1000),
+    ('s-functions', 250),
+]
+# Phases in the order the checkers go through them
+PHASES = ['read', 'preprocess', 'parse', 'check']
+# How much more the time per byte may grow when the size doubles
+DEFAULT_MAX_GROWTH = 1.5
+
+
+# Check the file at path once and return the seconds it took in all and the
+# seconds of each phase
+def time_check(path):
+    checker_cls = CStyleChecker if path.endswith('.c') else SStyleChecker
+    start = time.time()
+    checker = checker_cls(path)
+    checker.run()
+    return time.time() - start, checker.timings
+
+
+# Returns a row for a file of kind: n, lines, bytes, the seconds of the
+# fastest of repeat checks and the seconds of each of its phases
+def measure(directory, kind, n, seed, repeat):
+    path = corpus.write(directory, kind, n, seed)
+    with open(path) as f:
+        num_lines = sum(1 for _ in f)
+    size = os.path.getsize(path)
+
+    best, timings = None, None
+    for _ in range(repeat):
+        elapsed, phases = time_check(path)
+        if best is None or elapsed < best:
+            best, timings = elapsed, phases
+    os.remove(path)
+    return n, num_lines, size, best, timings
+
+
+# How much the time per byte grew from row to next_row
+def growth(row, next_row):
+    _, _, size, elapsed, _ = row
+    _, _, next_size, next_elapsed, _ = next_row
+    if elapsed == 0:
+        return 1.0
+    return (next_elapsed / elapsed) / (float(next_size) / size)
+
+
+def print_row(row, growth_text):
+    n, num_lines, size, elapsed, timings = row
+    phases = ' '.join(['%10.3f' % timings[p] if p in timings else '%10s' % '-'
+                       for p in PHASES])
+    print('%8d %8d %10d %9.3f %10.0f %s %7s' % (n, num_lines, size, elapsed,
+                                               num_lines / max(elapsed, 1e-9), phases,
+                                               growth_text))
+
+
+# Check every case at n, 2n, 4n... and print the lines/sec and the time of
+# each phase. Returns the kinds whose time grew faster than their size
+def run(cases, doublings, seed, repeat, max_growth):
+    directory = tempfile.mkdtemp()
+    failed = []
+    try:
+        for kind, base in cases:
+            print('%s (n is %s)' % (kind, corpus.GENERATORS[kind][2]))
+            print('%8s %8s %10s %9s %10s %s %7s' % (
+                'n', 'Lines', 'Bytes', 'Time (s)', 'Lines/s',
+                ' '.join(['%10s' % p for p in PHASES]), 'Growth'))
+
+            prev = None
+            linear = True
+            for i in range(doublings + 1):
+                try:
+                    row = measure(directory, kind, base << i, seed, repeat)
+                except Exception as e:
+                    # A checker that fails on a bigger file does not scale either
+                    print('%8d Failed with %s: %s' % (base << i, e.__class__.__name__, e))
+                    linear = False
+                    break
+                if prev is None:
+                    print_row(row, '')
+                else:
+                    g = growth(prev, row)
+                    linear = linear and g <= max_growth
+                    print_row(row, '%.2f' % g)
+                prev = row
+
+            if not linear:
+                failed.append(kind)
+            print('%s\n' % ('Linear' if linear else 'NOT LINEAR: time grew faster than size'))
+    finally:
+        shutil.rmtree(directory)
+    return failed
+
+
+def usage():
+    print('Usage: python scaling.py [-h] [--doublings <count>] [--seed <seed>] [--repeat <count>]')
+    print('                         [--max-growth <ratio>] [--scale <factor>] [kinds...]')
+    print('            -h/--help: Show help message')
+    print('            --doublings: How many times each file doubles in size (default: 2)')
+    print('            --seed: Seed of the generated files')
+    print('            --repeat: Checks of each file, the fastest is kept (default: 3)')
+    print('            --max-growth: Most the time per byte may grow when the size doubles')
+    print('                          (default: %.1f)' % DEFAULT_MAX_GROWTH)
+    print('            --scale: Multiply the size every case starts at')
+    print('            kinds: Cases to run (default: all), one of')
+    for kind, base in CASES:
+        print('                %s: starts at %d %s' % (kind, base, corpus.GENERATORS[kind][2]))
+
+
+if __name__ == '__main__':
+    argv = sys.argv[1:]
+    try:
+        opts, args = getopt.getopt(argv, "h", ["help", "doublings=", "seed=", "repeat=",
+                                               "max-growth=", "scale="])
+    except getopt.GetoptError:
+        usage()
+        sys.exit(2)
+
+    doublings = 2
+    seed = 0
+    repeat = 3
+    max_growth = DEFAULT_MAX_GROWTH
+    scale = 1.0
+    for opt, arg in opts:
+        if opt in ('-h', '--help'):
+            usage()
+            sys.exit()
+        elif opt == '--doublings':
+            doublings = int(arg)
+        elif opt == '--seed':
+            seed = int(arg)
+        elif opt == '--repeat':
+            repeat = int(arg)
+        elif opt == '--max-growth':
+            max_growth = float(arg)
+        elif opt == '--scale':
+            scale = float(arg)
+
+    cases = [(kind, max(1, int(base * scale))) for kind, base in CASES
+             if len(args) == 0 or kind in args]
+    unknown = set(args) - set([kind for kind, _ in CASES])
+    if unknown:
+        print('Unknown cases %s' % ', '.join(sorted(unknown)))
+        sys.exit(2)
+
+    failed = run(cases, doublings, seed, repeat, max_growth)
+    if failed:
+        print('Not linear: %s' % ', '.join(failed))
+        sys.exit(1)
@@ -0,0 +1,155 @@
+'''
+    Filename: cache.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import os
+import json
+import hashlib
+import tempfile
+from collections import OrderedDict
+
+CACHE_DIR_ENV = 'STYLE_CHECKER_CACHE'
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'style_checker')
+# Once the cache grows over the max size, the least recently used entries are
+# removed until it is under the low water mark
+CACHE_MAX_SIZE = 64 * 1024 * 1024
+CACHE_LOW_WATER = 0.8
+ENTRY_EXTENSION = '.json'
+
+
+def default_cache_dir():
+    return os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR)
+
+
+# Results of checking files stored on disk, one file per entry
+class ResultCache(object):
+    def __init__(self, directory=None, max_size=CACHE_MAX_SIZE):
+        self.directory = default_cache_dir() if directory is None else directory
+        self.max_size = max_size
+        # Total size of the entries, computed the first time something is added
+        self.size = None
+
+        try:
+            os.makedirs(self.directory)
+        except OSError:
+            if not os.path.isdir(self.directory):
+                raise
+
+    # Key for the content of a file checked by the named checker with the
+    # passed in options. Any change to the content, the options or the
+    # version of the checker gives a new key
+    def key(self, content, checker, version, options):
+        h = hashlib.sha1()
+        h.update(('%s %s %r\n' % (checker, version, sorted(options.items()))).encode('utf-8'))
+        h.update(content)
+        return h.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ENTRY_EXTENSION)
+
+    # Returns the stored value or None if there is none
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path, 'r') as f:
+                value = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+
+        # Mark the entry as recently used
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key, value):
+        data = json.dumps(value)
+        # Write to a temporary file first so other processes never see a
+        # partially written entry
+        fd, tmp = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(data)
+            os.rename(tmp, self.path(key))
+        except (IOError, OSError):
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+
+        if self.size is None:
+            self.size = sum([size for (mtime, size, path) in self.entries()])
+        else:
+            self.size += len(data)
+
+        if self.size > self.max_size:
+            self.evict()
+
+    # Returns a list of (last used time, size, path) of every entry
+    def entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(ENTRY_EXTENSION):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    # Remove the least recently used entries until the cache is under the
+    # low water mark
+    def evict(self):
+        entries = sorted(self.entries())
+        self.size = sum([size for (mtime, size, path) in entries])
+        target = self.max_size * CACHE_LOW_WATER
+        for (mtime, size, path) in entries:
+            if self.size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.size -= size
+
+    def clear(self):
+        for (mtime, size, path) in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.size = 0
+
+
+# Results kept in memory by a long running process. Once it holds max_size
+# entries, adding one removes the least recently used
+class MemoryCache(object):
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.entries.pop(key, None)
+        if value is None:
+            self.misses += 1
+            return None
+        # Put it back at the end as the most recently used
+        self.entries[key] = value
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries.pop(key, None)
+        self.entries[key] = value
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
@@ -0,0 +1,147 @@
+'''
+    Filename: client.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import os
+import sys
+import json
+import time
+import socket
+import subprocess
+
+from cache import CACHE_DIR_ENV, DEFAULT_CACHE_DIR
+
+SOCKET_ENV = 'STYLE_CHECKER_SOCKET'
+SOCKET_NAME = 'daemon.sock'
+CHECKERS = ['cstyle', 'sstyle']
+# How long to wait for a daemon that was just started, in seconds
+START_TIMEOUT = 5.0
+START_POLL = 0.05
+RECV_SIZE = 65536
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def default_socket_path():
+    return os.environ.get(SOCKET_ENV, os.path.join(DEFAULT_CACHE_DIR, SOCKET_NAME))
+
+
+# Messages are a line of JSON each way
+def send_message(sock, message):
+    sock.sendall((json.dumps(message) + '\n').encode('utf-8'))
+
+
+def recv_message(sock):
+    chunks = []
+    while True:
+        chunk = sock.recv(RECV_SIZE)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if chunk.endswith(b'\n'):
+            break
+    return json.loads(b''.join(chunks).decode('utf-8'))
+
+
+# Returns a socket connected to the daemon or None if none is listening
+def connect(path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except socket.error:
+        sock.close()
+        return None
+    return sock
+
+
+# Start a daemon in the background and wait for it to listen.
+# Returns a connected socket or None if it did not come up
+def start_daemon(path):
+    with open(os.devnull, 'r+') as devnull:
+        subprocess.Popen([sys.executable, os.path.join(HERE, 'daemon.py'), '--socket', path],
+                         stdin=devnull, stdout=devnull, stderr=devnull,
+                         close_fds=True, preexec_fn=os.setsid)
+
+    deadline = time.time() + START_TIMEOUT
+    while time.time() < deadline:
+        sock = connect(path)
+        if sock is not None:
+            return sock
+        time.sleep(START_POLL)
+    return None
+
+
+# Send message to the daemon, starting one if none is running.
+# Returns the response or None if no daemon could be reached
+def request(message, path=None, start=True):
+    path = default_socket_path() if path is None else path
+    sock = connect(path)
+    if sock is None and start:
+        sock = start_daemon(path)
+    if sock is None:
+        return None
+
+    try:
+        send_message(sock, message)
+        return recv_message(sock)
+    except (socket.error, ValueError):
+        return None
+    finally:
+        sock.close()
+
+
+# Whether any of args is - (or an --option=-), which the checkers read as
+# stdin. Only the client has it, the daemon's is /dev/null
+def reads_stdin(args):
+    return any([arg == '-' or arg.endswith('=-') for arg in args])
+
+
+def write(out, text):
+    if not isinstance(text, str):
+        # Python 2 gets unicode back from json
+        text = text.encode('utf-8')
+    out.write(text)
+
+
+def usage():
+    print(
+        "Usage: python %s <%s> [options and files of the checker]\n" % (sys.argv[0], "|".join(CHECKERS)) +
+        "\tRuns the checker in a daemon that stays running between runs, starting it\n" +
+        "\tif needed. Takes the same options as cstyle.py and sstyle.py. Checkers\n" +
+        "\tthat read stdin (-) are run directly instead of in the daemon.\n" +
+        "\t$%s: Path of the socket of the daemon (default: %s)\n"
+        % (SOCKET_ENV, os.path.join(DEFAULT_CACHE_DIR, SOCKET_NAME))
+    )
+
+
+def main(argv):
+    if len(argv) == 0 or argv[0] not in CHECKERS:
+        usage()
+        sys.exit(1)
+
+    checker, args = argv[0], argv[1:]
+    response = None
+    if not reads_stdin(args):
+        response = request({
+            'checker': checker,
+            'argv': args,
+            'prog': checker + '.py',
+            'cwd': os.getcwd(),
+            'env': {CACHE_DIR_ENV: os.environ.get(CACHE_DIR_ENV)}
+        })
+    if response is None:
+        # No daemon, or the checker reads stdin, so run it the usual way
+        script = os.path.join(HERE, checker + '.py')
+        os.execv(sys.executable, [sys.executable, script] + args)
+
+    write(sys.stdout, response['output'])
+    write(sys.stderr, response['errors'])
+    sys.exit(response['status'])
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -8,10 +8,36 @@
 
 
 import re
+import copy
 import sys
+import hashlib
+import itertools
+import time
 import getopt
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
 
+import cache
+from diagnostics import REPORTERS, Collector, Diagnostic, to_entry_dict, from_entry_dict
+from errors import ParseError, StyleCheckError
+from source import load_lines, expand_tabs, iter_split_lines
+import runner
+import diffs
+from lexer import Lexer, CODE, STRING, CHAR, LINE_CMMT, BLOCK_CMMT
+from profiler import Profiler, Counters
+import rules
+
+try:
+    line_span = xrange
+except NameError:
+    line_span = range
+
+try:
+    recursion_error = RecursionError
+except NameError:
+    # Python 2 raises a RuntimeError
+    recursion_error = RuntimeError
+
 LEFT_CURLY = '{'
 RIGHT_CURLY = '}'
 LEFT_PAREN = '('
@@ -31,6 +57,9 @@ START_COMMENT = '//'
 SPACE_REPLACEMENT_CHAR = '^'
 POUND = '#'
 
+# Files picked up when a directory is passed in
+C_EXTENSIONS = ['.c', '.h']
+
 VARS_ALLOWED_CHARS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_"
 
 # Characters that can be used in a type or a function name
@@ -45,50 +74,91 @@ BLCK_CMMT_EMPTY_REGEXP = " *(\/\*.*\*\/) *\Z"    # Block comment followed by emp
 COMMENT_REGEXP = " *\/\/.*"
 STMT_REGEXP = ".*;"
 WHITE_SPACE_REGEXP = "(|( |\t)+)\Z"
-MAGIC_NUMBER_REGEXP = "[^a-zA-Z0-9_]+(-|)((0x|0|)[0-9]+)"
-# The group index that is the number inside the magic number pattern
-NUM_GROUP_IND = 2
+# A number that does not continue a name or another number. Searched for in
+# the text of many lines at once, see scan_magic, so the character in front
+# of it is looked behind at rather than matched, which could run over many
+# lines of blanked out comments
+MAGIC_NUMBER_REGEXP = "(?<![a-zA-Z0-9_])(0x|0|)[0-9]+"
 
 STRING_REGEXP = "(\".*\")"
 CHAR_REGEXP = "(\'.*\')"
 SEP_BY_SPACE_REGEXP = "\A. .\Z"
-LVALUES_REGEXP = "(|\()(\** *)(|\(*)((%s)|(%s))((\.(%s).*(|\)))|(\-\>(%s).*(|\)))|(\[.+\](|\))))*(|\))" \
-                 % (STD_CHARS_REGEXP, " *[a-zA-Z_][a-zA-Z0-9_]* *\(.*\) *",
-                    STD_CHARS_REGEXP, STD_CHARS_REGEXP)
-
-# Covers most cases of return types for functions
-FUNC_KEYWORDS = [
-    'static *', 'const *', 'struct *', 'static struct *', 'const struct *', 'enum *',
-    'static enum *', 'const enum *', 'unsigned *', 'static unsigned *', 'const unsigned *',
-    'long *', 'static long *', 'const long *', 'signed *', 'static signed *', 'const signed *',
-    'unsigned short *', 'static unsigned short *', 'const unsigned short *',
-    'short *', 'static short *', 'const short *', 'unsigned long *', 'static unsigned long *',
-    'const unsigned long *', 'long long *', 'static long long *', 'const long long *',
-    'unsigned long long *', 'static unsigned long long *', 'const unsigned long long *'
-]
+
+# The patterns below are only ever used with match() to tell whether a line
+# starts like code, so each one is written to accept the same lines as the
+# obvious pattern while never backtracking more than a constant number of
+# times over any part of the line. bench/regex_timing.py has the obvious
+# patterns and compares the two
+
+atomic_ids = itertools.count()
+
+
+# Match regexp once and never backtrack into it, the way an atomic group does.
+# Only used where the leftmost match is as good as any other
+def atomic(regexp):
+    name = 'atomic%d' % next(atomic_ids)
+    return "(?=(?P<%s>%s))(?P=%s)" % (name, regexp, name)
+
+
+# Covers most cases of return types for functions. Any of static or const,
+# then any of the types, each followed by spaces
+FUNC_TYPES_REGEXP = "struct|enum|signed|short|unsigned(?: short| long(?: long)?)?|long(?: long)?"
+FUNC_KEYWORDS_REGEXP = "(?:(?:static|const)(?: (?:%s))?|%s) *" % (FUNC_TYPES_REGEXP,
+                                                                  FUNC_TYPES_REGEXP)
+# Pointer stars between a type and a name
+POINTER_SEP_REGEXP = "(?:\*+ +| +(?:\*+ *)?)"
+TYPE_AND_NAME_REGEXP = " *(?:%s)?%s%s%s" % (FUNC_KEYWORDS_REGEXP, STD_CHARS_REGEXP,
+                                            POINTER_SEP_REGEXP, STD_CHARS_REGEXP)
+
+# Lvalues are a variable or a function call in any number of ( and * and
+# then any number of [], . and -> accesses.
+# Spaces, ( and * in front of a variable
+LVALUE_PREFIX_REGEXP = " *(?:\(\** *\(*|\*+ *\(*)?"
+# Spaces, ( and * in front of a function call
+CALL_PREFIX_REGEXP = " *(?:\(\** *(?:\(+ *)?|\*+ *(?:\(+ *)?)?"
+MEMBER_REGEXP = "(?:\.|->)[a-zA-Z_]"
+
+
+# Lvalue followed by op. Everything after a member access is accepted, so
+# lines with one only need to have member_rest after it. Otherwise rest has
+# to follow op
+def lvalue_regexp(op, rest, member_rest):
+    var = LVALUE_PREFIX_REGEXP + STD_CHARS_REGEXP
+    call = CALL_PREFIX_REGEXP + STD_CHARS_REGEXP + " *\("
+    return "|".join([
+        # var, var) or var[...])) followed by op
+        "%s(?:\)?%s|\[%s)%s" % (var, op, atomic(".+?\]\)?\)?" + op), rest),
+        # var.member or var[...].member
+        "%s(?:\[%s|%s)%s" % (var, atomic(".+?\]\)?" + MEMBER_REGEXP), MEMBER_REGEXP,
+                              member_rest),
+        # call(...) followed by op
+        "%s%s%s" % (call, atomic(".*?\)" + op), rest),
+        # call(...)[...] followed by op
+        "%s%s%s%s" % (call, atomic(".*?\) *\["), atomic(".+?\]" + op), rest),
+        # call(...).member
+        "%s%s%s" % (call, atomic(".*?\) *" + MEMBER_REGEXP), member_rest),
+        # call(...)[...].member
+        "%s%s%s%s" % (call, atomic(".*?\) *\["), atomic(".+?\]" + MEMBER_REGEXP),
+                      member_rest),
+    ])
 
 # Code detections regular expressions
 C_DIRS_REGEXP = " *\#(define|include|undef|ifdef|ifndef|if|else|elif|endif|error|pragma)"
-FUNC_REGEXP = (" *(%s|)" % "|".join(FUNC_KEYWORDS)) +\
-    "(%s)(\** +| +\**| +\** +)(%s)( )*(\(.*\))" % (STD_CHARS_REGEXP, STD_CHARS_REGEXP)
-FUNC_HDR_REGEXP = (" *(%s|)" % "|".join(FUNC_KEYWORDS)) +\
-    "%s(\** +| +\**| +\** +)%s( )*\(.*\) *; *\Z" % (STD_CHARS_REGEXP, STD_CHARS_REGEXP)
-ASSIGNMENT_REGEXP = " *%s *%s.* *;" % (LVALUES_REGEXP, ASSIGNMENT_OPS_REGEXP)
-DEC_ASSIGNMENT_REGEXP = " *(%s|)%s(\** +| +\**| +\** +)%s( *, *%s)* *=.* *;"\
-                        % ("|".join(FUNC_KEYWORDS), STD_CHARS_REGEXP,
-                           STD_CHARS_REGEXP, STD_CHARS_REGEXP)
+FUNC_REGEXP = "%s *\([^)\n]*\)" % TYPE_AND_NAME_REGEXP
+FUNC_HDR_REGEXP = "%s *\(.*\) *; *\Z" % TYPE_AND_NAME_REGEXP
+ASSIGNMENT_REGEXP = lvalue_regexp(" *" + ASSIGNMENT_OPS_REGEXP, "[^;\n]*;", "[^=\n]*=[^;\n]*;")
+DEC_ASSIGNMENT_REGEXP = "%s(?: *, *%s)* *=[^;\n]*;" % (TYPE_AND_NAME_REGEXP, STD_CHARS_REGEXP)
 FUNC_CALL_REGEXP = " *(\( *void *\)|) *[a-zA-Z_][a-zA-Z0-9_]* *\(.*\) *;"
-DECLARATIONS_REGEXP = " *(%s|)%s(\** +| +\**| +\** +)%s( *, *%s)* *;"\
-                      % ("|".join(FUNC_KEYWORDS), STD_CHARS_REGEXP,
-                         STD_CHARS_REGEXP, STD_CHARS_REGEXP)
+DECLARATIONS_REGEXP = "%s(?: *, *%s)* *;" % (TYPE_AND_NAME_REGEXP, STD_CHARS_REGEXP)
 KEYWORDS_REGEXP = "( *(if|else if|while|for|switch) *\(.*\))|((continue|break);)|(return.*;)"
-INCREMENT_REGEXP = " *%s *\+\+;" % LVALUES_REGEXP
-DECREMENT_REGEXP = " *%s *\-\-;" % LVALUES_REGEXP
+INCREMENT_REGEXP = lvalue_regexp(" *\+\+;", "", ".*\+\+;")
+DECREMENT_REGEXP = lvalue_regexp(" *\-\-;", "", ".*\-\-;")
 
 # Misc
 TODO_COMMENT_REGEXP = " *// *TODO"
 
 SWITCH_CASE_REGEXP = " *((case .+ *:)|(default *:))"
+BRACKETS_REGEXP = "[{}()]"
 
 
 blck_cmmt_ptrn = re.compile(BLCK_COMMENT_REGEXP)
@@ -100,6 +170,7 @@ magic_num_ptrn = re.compile(MAGIC_NUMBER_REGEXP)
 string_ptrn = re.compile(STRING_REGEXP)
 char_ptrn = re.compile(CHAR_REGEXP)
 switch_case_regexp = re.compile(SWITCH_CASE_REGEXP)
+brackets_ptrn = re.compile(BRACKETS_REGEXP)
 
 c_dirs_ptrn = re.compile(C_DIRS_REGEXP)
 func_ptrn = re.compile(FUNC_REGEXP)
@@ -115,11 +186,22 @@ decrement_ptrn = re.compile(DECREMENT_REGEXP)
 todo_cmmt_ptrn = re.compile(TODO_COMMENT_REGEXP)
 sep_space_ptrn = re.compile(SEP_BY_SPACE_REGEXP)
 
+c_lexer = Lexer([START_COMMENT])
+char_mask_ptrn = re.compile(CHAR + '+')
+# Runs of a mask that are not code, within a line
+non_code_mask_ptrn = re.compile('[^%s\n]+' % CODE)
+
 code_regexp = [
     c_dirs_ptrn, func_ptrn, func_hdr_ptrn, asg_ptrn,
     dec_asg_ptrn, func_call_ptrn, dec_ptrn, keywords_ptrn,
     increment_ptrn, decrement_ptrn
 ]
+# Names of the patterns of code_regexp in the stats
+CODE_PATTERN_NAMES = [
+    'c_dirs_ptrn', 'func_ptrn', 'func_hdr_ptrn', 'asg_ptrn',
+    'dec_asg_ptrn', 'func_call_ptrn', 'dec_ptrn', 'keywords_ptrn',
+    'increment_ptrn', 'decrement_ptrn'
+]
 
 # Types
 _BLOCK_CMMT = 0
@@ -133,11 +215,24 @@ _STRUCTURE = 7      # Anything within curly braces that is not a function defn
 _EMPTY_LINE = 8
 _SWITCH_CASE = 9
 
+# Top level blocks whose output is stored and reused when their text does
+# not change
+INCREMENTAL_TYPES = [_FUNC, _STRUCTURE, _DIRECTIVE]
 
-CONDITIONALS = ["while", "for", "switch", "if", "else if"]
+SWITCH = "switch"
+CASE = "case"
+DEFAULT = "default"
+CONDITIONALS = ["while", "for", SWITCH, "if", "else if"]
 UNCONDITIONALS = ["else", "do"]
-SWITCH_CASE = ["case", "default"]
+SWITCH_CASE = [CASE, DEFAULT]
 OTHERS = ["break"]
+KEYWORDS = CONDITIONALS + UNCONDITIONALS + SWITCH_CASE + OTHERS
+
+# Any keyword that is not part of a variable name. Alternatives are tried in
+# the order of KEYWORDS so else if is found before else
+KEYWORD_SCAN_REGEXP = "(?<![%s])(%s)(?![%s])" % (VARS_ALLOWED_CHARS, "|".join(KEYWORDS),
+                                                VARS_ALLOWED_CHARS)
+keyword_scan_ptrn = re.compile(KEYWORD_SCAN_REGEXP)
 
 # DECLARATIONS_REGEXP = " *(union | struct | enum |)[a-zA-Z_][a-zA-Z0-9_]* [a-zA-Z_][a-zA-Z0-9_]*;"
 
@@ -157,6 +252,56 @@ NON_MAGIC_NUMBERS = [
 # Then the next line should be indented in by an extra NEXT_LINE_INDENT
 NEXT_LINE_INDENT = 2
 
+# What parsing and checking run into on sources they cannot make sense of,
+# such as unbalanced braces or parentheses, or a block that keeps parsing
+# itself again. Raised as ParseError instead
+PARSE_FAILURES = (IndexError, KeyError, TypeError, ValueError, AttributeError,
+                  recursion_error)
+# Lines scan_magic looks at in one go. Bounds the copies of the text it makes
+MAGIC_SCAN_LINES = 4096
+# Files with fewer lines to check than this are checked by a single process
+# even with jobs, since starting the processes would take longer
+PARALLEL_MIN_LINES = 4000
+# How many runs of top level blocks each process is given to check
+PARALLEL_CHUNKS_PER_JOB = 4
+
+# Rules reported by the checker, see rules.py
+RULES = [
+    'case-placement', 'comment-spacing', 'commented-out-code', 'condition-spacing',
+    'curly-braces', 'curly-spacing', 'else-spacing', 'empty-line-whitespace',
+    'excess-newlines', 'indentation', 'leading-statement', 'line-length', 'magic-number',
+    'tab-indent', 'todo-comment', 'trailing-statement', 'trailing-whitespace'
+]
+# Rules only checked in strict mode or with the white space check unless they
+# are enabled
+STRICT_RULES = ['comment-spacing', 'condition-spacing', 'curly-braces', 'curly-spacing',
+                'else-spacing']
+WHITESPACE_RULES = ['empty-line-whitespace', 'trailing-whitespace']
+# Rules checked in comments
+COMMENT_RULES = ['commented-out-code', 'todo-comment', 'comment-spacing']
+# What is reported for each of them
+COMMENT_MESSAGES = {
+    'commented-out-code': 'Commented out code',
+    'todo-comment': 'Left in TODO comment',
+    'comment-spacing': 'Comments should start with // followed by a space',
+}
+
+
+# Rules checked unless they are enabled or disabled
+def default_rules(strict=False, check_whitespace=True):
+    return [rule for rule in RULES if (strict or rule not in STRICT_RULES) and
+            (check_whitespace or rule not in WHITESPACE_RULES)]
+
+
+# Methods timed with --profile along with every handle_* method
+PROFILED_METHODS = [
+    'preprocess', 'build_tree', 'parse_line',
+    'classify_line', 'match_keywords', 'match_terms', 'find_statement_terminator',
+    'rfind_statement_terminator', 'find_condition', 'find_code_block', 'visit',
+    'check_indentation', 'check_magic', 'scan_magic', 'check_comment', 'is_code',
+    'check_line_limit'
+]
+
 matchers = {
     '{': '}',
     '(': ')',
@@ -164,9 +309,47 @@ matchers = {
 }
 
 
+# Locations of a block are packed into a single int each, the line number in
+# the high bits and the index in the line plus one (so -1 fits) in the low bits
+LOC_BITS = 32
+LOC_MASK = (1 << LOC_BITS) - 1
+
+
+def pack_loc(loc):
+    return (loc[0] << LOC_BITS) | (loc[1] + 1)
+
+
+def unpack_loc(packed):
+    return (packed >> LOC_BITS, (packed & LOC_MASK) - 1)
+
+
+# Property that reads and writes a location as a tuple of (line number, index
+# in line) and keeps it packed in the slot called name
+def location_property(name):
+    def get(self):
+        packed = getattr(self, name)
+        return None if packed is None else unpack_loc(packed)
+
+    def set(self, loc):
+        setattr(self, name, None if loc is None else pack_loc(loc))
+
+    return property(get, set)
+
+
 class CodeBlock(object):
-    def __init__(self, lines, t):
-        self.lines = lines
+    # There is a block for most lines of a file, so they have no __dict__
+    __slots__ = ('first_line', 'last_line', '_type', 'keyword', '_start', '_end',
+                 '_term_loc', '_start_cond', '_end_cond', '_block_start', '_block_end',
+                 'uses_curly', '_do_while_loc', '_prev_rcurly', '_start_params',
+                 '_end_params', '_colon_loc', 'end_keyword', 'fingerprint',
+                 'cached_output', 'parent', 'children', 'indent_amt', 'check_magic',
+                 'in_switch')
+
+    # The block spans the lines first_line to last_line (inclusive). It is
+    # empty when last_line is before first_line
+    def __init__(self, first_line, last_line, t):
+        self.first_line = first_line
+        self.last_line = last_line
         self._type = t
 
         # Used to store the keyword (aka switch/if/else/etc...)
@@ -174,72 +357,188 @@ class CodeBlock(object):
 
         # Location represented as tuple of (line number, index in line)
         # Note that end location is INCLUSIVE
-        self.start = None
-        self.end = None
-        self.term_loc = None
+        self._start = None
+        self._end = None
+        self._term_loc = None
 
         # If the code block has a condition include that too
         # End location is INCLUSIVE
-        self.start_cond = None
-        self.end_cond = None
+        self._start_cond = None
+        self._end_cond = None
 
         # Block location is stored as a tuple of (location, location)
         # where each location is a tuple of (line number, index in line)
         # This field is available if the block uses curly braces surrounded code
-        self.block_loc = None
+        self._block_start = None
+        self._block_end = None
 
         # Flag set to indicate that the block uses curly brace. Some blocks
         # do not need curly brace like (if/else) so we need this
         self.uses_curly = False
 
         # Used only to store location of while in do while loop
-        self.do_while_loc = None
+        self._do_while_loc = None
 
         # Used for else if and else to record the location of the }
         # from the previous if/else if
-        self.prev_rcurly = None
+        self._prev_rcurly = None
 
         # Used for functions only
-        self.start_params = None
-        self.end_params = None
+        self._start_params = None
+        self._end_params = None
 
         # For switch case
-        self.colon_loc = None
+        self._colon_loc = None
+
+        # Keyword found behind the } that ends the block. For example the
+        # else in } else {
+        self.end_keyword = None
+
+        # For top level blocks that are checked incrementally
+        self.fingerprint = None
+        self.cached_output = None
+
+        # Links to the surrounding block and the blocks nested in this one.
+        # Top level blocks do not have a parent and blocks with nothing nested
+        # in them share the same empty tuple
+        self.parent = None
+        self.children = ()
+
+        # What the block is checked with. Set when the block is put in the
+        # tree, so indent_amt is None until then
+        self.indent_amt = None
+        self.check_magic = True
+        self.in_switch = False
+
+    start = location_property('_start')
+    end = location_property('_end')
+    term_loc = location_property('_term_loc')
+    start_cond = location_property('_start_cond')
+    end_cond = location_property('_end_cond')
+    do_while_loc = location_property('_do_while_loc')
+    prev_rcurly = location_property('_prev_rcurly')
+    start_params = location_property('_start_params')
+    end_params = location_property('_end_params')
+    colon_loc = location_property('_colon_loc')
+
+    @property
+    def block_loc(self):
+        if self._block_start is None:
+            return None
+        return unpack_loc(self._block_start), unpack_loc(self._block_end)
+
+    @block_loc.setter
+    def block_loc(self, locs):
+        if locs is None:
+            self._block_start = self._block_end = None
+        else:
+            self._block_start, self._block_end = pack_loc(locs[0]), pack_loc(locs[1])
+
+    # Line numbers of the lines of the block
+    @property
+    def lines(self):
+        return line_span(self.first_line, self.last_line + 1)
+
+    # Extend the block up to line last (inclusive). A last line before the
+    # first line of the block leaves it as it is
+    def extend_to(self, last):
+        if last >= self.first_line:
+            self.last_line = last
 
     def get_type(self):
         return self._type
 
 class CStyleChecker(object):
+    # Bump when the output of the checker changes. Cached results are keyed
+    # by it
+    VERSION = 7
+    # Takes a result cache to reuse the output of unchanged top level blocks
+    INCREMENTAL = True
+    # Takes jobs to check the top level blocks of a file with many processes
+    PARALLEL = True
+    RULES = RULES
+
+    # Checks the file named filename, or source if it is passed in, in which
+    # case filename is only used to name it. source is text or bytes. The
+    # rules in enable and disable are checked or not regardless of strict and
+    # check_whitespace.
+    # If changed is passed, only the 1 based lines in it are checked, see
+    # changed_blocks.
+    # Raises SourceError if the file cannot be read and ValueError for rules
+    # it does not know of
     def __init__(self, filename, check_whitespace=True,
-                 print_headers=False, strict=False, indent_amt=None):
-        self.check_ws = check_whitespace
+                 print_headers=False, strict=False, indent_amt=None,
+                 result_cache=None, source=None, profile=False, stats=False, jobs=1,
+                 enable=(), disable=(), changed=None):
+        self.filename = filename
+        # Processes the top level blocks are checked with, see check_parallel
+        self.jobs = jobs
+        # 0 based lines that are checked, or None to check the whole file.
+        # Blocks are only partly checked then, so their output is not cached
+        self.changed = None
+        if changed is not None:
+            self.changed = set([n-1 for n in changed])
+            result_cache = None
+        self.result_cache = result_cache
         self.print_headers = print_headers
         self.strict = strict
-        self.og_lines = []
+        # Rules that are checked. The work of the others is skipped
+        self.rules = rules.select(RULES, default_rules(strict, check_whitespace),
+                                  enable, disable)
+        self.check_spacing = not self.rules.isdisjoint(STRICT_RULES)
+        # Everything the checker finds. See diagnostics.py
+        self.collector = Collector(self.rules, None if changed is None else set(changed))
+        # 0 based lines with a magic number or char, see scan_magic
+        self.magic_lines = set()
         self.lines = []
         if strict:
             indent_amt = INDENT_AMOUNT
         self.indent_amt = INDENT_AMOUNT if indent_amt is None else indent_amt
         self.block_cmmts = []
+        self.block_cmmt_starts = []
+        # Per line classification of every character. See lexer.py
+        self.masks = []
+        # Lines over LINE_LIMIT
+        self.long_lines = []
+        # Location of every valid opening term mapped to the location of its
+        # matching term, and the sorted locations of the opening terms
+        self.partners = {}
+        self.openers = {}
+        # Blocks returned by parse_line keyed by their starting line. The lines
+        # do not change for the life of the checker so neither do the blocks
+        self.block_cache = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Top level blocks of the file, built by build_tree
+        self.tree = []
+        # Time spent in each phase of the checker, in seconds: read and
+        # preprocess here, parse and check in run()
+        self.timings = {}
+        # Times the handlers and primitives when profile is set, see profiler.py
+        self.profiler = None
+        if profile:
+            self.profiler = Profiler()
+            self.profiler.wrap(self, PROFILED_METHODS +
+                               [name for name in dir(self) if name.startswith('handle_')])
+        # Calls and characters looked at of the hot primitives by name, only
+        # counted when stats is set
+        self.code_regexp = code_regexp
+        self.counters = None
+        self.stats = {}
+        if stats:
+            self.count_primitives()
+
+        # Only the lines with their tabs expanded are kept, see source.py
+        start = time.time()
+        if source is None:
+            self.lines = expand_tabs(load_lines(filename), TAB_LENGTH)
+        else:
+            self.lines = expand_tabs(iter_split_lines(source), TAB_LENGTH)
+        self.timings['read'] = time.time() - start
 
-        try:
-            f = open(filename, "r")
-        except IOError:
-            print('Could not open file')
-            sys.exit(1)
-
-        l = f.readline()
-        while l:
-            if l[-1] == '\n':
-                l = l[:-1]
-            self.og_lines.append(l)
-            self.lines.append(l.replace(TAB_CHAR, SPACE_CHAR * TAB_LENGTH))
-            l = f.readline()
-
-        f.close()
-
-        # Preprocessing Stuff
-        self.get_block_comments()
+        # Preprocessing Stuff, all in one pass over the lines
+        start = time.time()
+        case_indented = self.preprocess()
 
         # Find the first indented line to figure out the indent amount
         if indent_amt is None:
@@ -263,192 +562,207 @@ class CStyleChecker(object):
 
                 i = block.lines[-1] + 1
 
-            print('Detected Indent Amount of %d' % self.indent_amt)
-
-        # Loop through to see which switch indentation convention
-        # they use
-        for i, line in enumerate(self.lines):
-            done = False
-            keyword, switch_ind = self.match_keywords(line, i)
-            if keyword == "switch":
-                # Find a case
-                term_line, term_ind = self.find_statement_terminator(i, switch_ind,
-                                        term=COLON)
-                j = term_line
-                while j < len(self.lines):
-                    keyword, case_ind = self.match_keywords(self.lines[j], j)
-                    if keyword in SWITCH_CASE:
-                        done = True
-                        if case_ind - switch_ind == 0:
-                            # Case where they do not indent switch case
-                            self.case_indent = 0
-                            break
-                        else:
-                            # Case where they do indent switch case
-                            self.case_indent = self.indent_amt
-                            break
-                    j += 1
-            if done:
-                break
-
-    def get_block_comments(self):
-        start = None
-
-        for i in range(len(self.lines)):
-            line = self.lines[i]
-            for j in range(len(line)-1):
-                if line[j:j+2] == START_BLOCK_COMMENT:
-                    if self.valid_string(line, i, j, j+2):
-                        start = (i, j)
-                elif line[j:j+2] == END_BLOCK_COMMENT:
-                    end = (i, j+2)
-                    self.block_cmmts.append((start, end))
+            self.collector.text('Detected Indent Amount of %d' % self.indent_amt)
+
+        # Which switch indentation convention they use. Only known if there
+        # is a switch with a case
+        if case_indented is not None:
+            self.case_indent = self.indent_amt if case_indented else 0
+        self.timings['preprocess'] = time.time() - start
+
+    # Everything the checker needs to know about the lines before parsing
+    # them, found in a single pass:
+    # - The code/string/comment masks and the block comments. The lexer
+    #   records the block comments in the same pass that builds the masks.
+    #   Block comments cannot overlap, so the spans come out sorted by their
+    #   start location
+    # - The partner of every valid { and (, paired using a stack per term so
+    #   that matching a term later is just a lookup
+    # - The lines over the limit, reported by check_line_limit
+    # - Whether the cases of the first switch are indented
+    # Returns that last one, or None if there is no switch with a case
+    def preprocess(self):
+        self.masks = []
+        self.block_cmmts = []
+        self.long_lines = []
+        self.openers = dict([(term, []) for term in matchers])
+        stacks = {LEFT_CURLY: [], LEFT_PAREN: []}
+        closers = {RIGHT_CURLY: LEFT_CURLY, RIGHT_PAREN: LEFT_PAREN}
+        masks = self.masks
+        partners = self.partners
+        openers = self.openers
+        scan_line = c_lexer.scan_line
+
+        block_start = None
+        # Index of the first switch in its line and the line of the first :
+        # after it. no_colon is the location of the first switch that has no
+        # : after it so far
+        switch_ind = None
+        colon_line = None
+        no_colon = None
+        case_indented = None
+        for n, line in enumerate(self.lines):
+            mask, block_start = scan_line(n, line, block_start, self.block_cmmts)
+            masks.append(mask)
+
+            for match in brackets_ptrn.finditer(line):
+                j = match.start()
+                if mask[j] != CODE:
+                    continue
+
+                c = line[j]
+                if c in stacks:
+                    stacks[c].append((n, j))
+                    openers[c].append((n, j))
+                elif len(stacks[closers[c]]) != 0:
+                    partners[stacks[closers[c]].pop()] = (n, j)
+
+            if len(line) > LINE_LIMIT:
+                self.long_lines.append(n)
+
+            if case_indented is not None:
+                continue
+            # Only a line with the word in it can start with the keyword
+            if SWITCH in line:
+                keyword, j = self.match_keywords(line, n)
+                if keyword == SWITCH:
+                    if switch_ind is None:
+                        switch_ind = j
+                    if no_colon is None:
+                        no_colon = (n, j)
+            if no_colon is not None and COLON in line:
+                j = line.find(COLON, no_colon[1] if n == no_colon[0] else 0)
+                while j != -1 and mask[j] != CODE:
+                    j = line.find(COLON, j + 1)
+                if j != -1:
+                    # The cases of the first switch start after its first :
+                    if colon_line is None:
+                        colon_line = n
+                    no_colon = None
+            if colon_line is not None and (CASE in line or DEFAULT in line):
+                keyword, case_ind = self.match_keywords(line, n)
+                if keyword in SWITCH_CASE:
+                    case_indented = case_ind - switch_ind != 0
+
+        if case_indented is None and no_colon is not None:
+            # The case of a switch with no : after it is looked for in the
+            # whole file, starting with the last line
+            for n in [len(self.lines)-1] + list(range(len(self.lines))):
+                keyword, case_ind = self.match_keywords(self.lines[n], n)
+                if keyword in SWITCH_CASE:
+                    case_indented = case_ind - no_colon[1] != 0
+                    break
+
+        self.block_cmmt_starts = [start for (start, end) in self.block_cmmts]
+        # Block comments were already paired by the lexer
+        for (start, end) in self.block_cmmts:
+            openers[START_BLOCK_COMMENT].append(start)
+            partners[start] = (end[0], end[1]-len(END_BLOCK_COMMENT))
+
+        return case_indented
+
+    # Binary search for the block comment containing location (n, j)
+    # Returns the (start, end) span of the comment or None
+    def find_block_comment(self, n, j):
+        i = bisect_right(self.block_cmmt_starts, (n, j)) - 1
+        if i >= 0 and (n, j) < self.block_cmmts[i][1]:
+            return self.block_cmmts[i]
+        return None
 
     def get_indent_amt(self, n):
         stripped = self.lines[n].lstrip()
         return len(self.lines[n]) - len(stripped)
 
     def is_code(self, s):
-        for ptrn in code_regexp:
+        for ptrn in self.code_regexp:
             match = ptrn.match(s)
             if match:
                 return match
         return None
 
     # A string is considered valid if they are not within quotes and not
-    # within comments
-    def valid_string(self, s, n, lo, hi):
-        return not self.within_quotes(s, lo, hi) and not self.within_comment(s, n, lo, hi)
-
-    def contains_magic(self, line, n):
-        # Hack: Add a space at the beginning so the regexp works
-        line = ' ' + line
-        matches = magic_num_ptrn.finditer(line)
-        for match in matches:
-            number = match.group(NUM_GROUP_IND)
-            if number not in NON_MAGIC_NUMBERS:
-                lo, hi = match.start(NUM_GROUP_IND), match.end(NUM_GROUP_IND)
-                # Check if the magic number is inside a string or a comment
-                if self.valid_string(line, n, lo, hi):
-                    return True
-
-        # The checks below are for checking if there are strings and characters
-
-        in_quote = False
-        # index = line.find(DOUBLE_QUOTE)
-        # if index != -1:
-        #     prev_quote = index
-        #     # Check for strings on this line
-        #     for i in range(index, len(line)):
-        #         if line[i] == DOUBLE_QUOTE and (i == 0 or line[i-1] != BACKSLASH):
-        #             if in_quote:
-        #                 in_quote = False
-        #                 # Check if the string found is non magic string
-        #                 if line[prev_quote:i+1] not in NON_MAGIC_NUMBERS:
-        #                     index = line.find(line[prev_quote:i+1])
-        #                     lo, hi = index, index + len(line[prev_quote:i+1])
-        #                     in_comment = self.within_comment(line, n, lo, hi)
-        #                     if not in_comment:
-        #                         return True
-        #             else:
-        #                 in_quote = True
-        #                 prev_quote = i
-        #
-        index = line.find(SINGLE_QUOTE)
-        if index != -1:
-            prev_quote = index
-            # Check for strings on this line
-            for i in range(index, len(line)):
-                if line[i] == SINGLE_QUOTE and (i == 0 or line[i-1] != BACKSLASH):
-                    if in_quote:
-                        in_quote = False
-                        # Check if the char found is non magic char
-                        if line[prev_quote:i+1] not in NON_MAGIC_NUMBERS:
-                            index = line.find(line[prev_quote:i+1])
-                            lo, hi = index, index + len(line[prev_quote:i+1])
-                            in_comment = self.within_comment(line, n, lo, hi)
-                            if not in_comment:
-                                return True
-                    else:
-                        in_quote = True
-                        prev_quote = i
-
-        return False
+    # within comments. lo is the index of the string in line n
+    def valid_string(self, n, lo):
+        return self.masks[n][lo] == CODE
+
+    # Returns the set of lines (of lines, 0 based) that have a magic number
+    # or char in code. The lines are joined MAGIC_SCAN_LINES at a time with
+    # their strings and comments blanked out, and each chunk is searched in a
+    # single pass rather than line by line
+    def scan_magic(self, lines):
+        magic = set()
+        for i in range(0, len(lines), MAGIC_SCAN_LINES):
+            chunk = lines[i:i+MAGIC_SCAN_LINES]
+            # Each line starts after a newline, so a number at the start of
+            # it does not continue anything
+            text = '\n' + '\n'.join([self.lines[n] for n in chunk])
+            mask = '\n' + '\n'.join([self.masks[n] for n in chunk])
+
+            # Locations of the magic numbers and chars in text. The lexer only
+            # marks char literals that are outside strings and comments
+            hits = []
+            for match in char_mask_ptrn.finditer(mask):
+                if text[match.start():match.end()] not in NON_MAGIC_NUMBERS:
+                    hits.append(match.start())
+
+            pieces = []
+            j = 0
+            for match in non_code_mask_ptrn.finditer(mask):
+                pieces.append(text[j:match.start()])
+                pieces.append(' ' * (match.end() - match.start()))
+                j = match.end()
+            pieces.append(text[j:])
+            code = ''.join(pieces)
+
+            match = magic_num_ptrn.search(code)
+            while match is not None:
+                if match.group() in NON_MAGIC_NUMBERS:
+                    match = magic_num_ptrn.search(code, match.end())
+                else:
+                    hits.append(match.start())
+                    # One is enough, go on with the next line
+                    end = code.find('\n', match.end())
+                    match = None if end == -1 else magic_num_ptrn.search(code, end)
+
+            # Number of newlines in front of each hit
+            hits.sort()
+            k = 0
+            prev = 0
+            for hit in hits:
+                k += code.count('\n', prev, hit)
+                prev = hit
+                magic.add(chunk[k-1])
+        return magic
 
     # Check if the comment contains TODO or code in it
     # Also check if comment has a space between text and //
     def check_comment(self, s, n):
+        if self.rules.isdisjoint(COMMENT_RULES):
+            return
+
         strip = s.lstrip()
         strip = strip.lstrip(FORWARD_SLASH)
-        if self.is_code(strip):
-            print('Line %d: Commented out code' % (n+1))
-            print(self.lines[n])
+        if todo_cmmt_ptrn.match(s):
+            rule = 'todo-comment'
+        elif len(strip) != 0 and not white_space_ptrn.match(strip[0]):
+            rule = 'comment-spacing'
         else:
-            if todo_cmmt_ptrn.match(s):
-                print('Line %d: Left in TODO comment' % (n+1))
-                print(self.lines[n])
-            elif self.strict and len(strip) != 0 and\
-                    not white_space_ptrn.match(strip[0]):
-                print('Line %d: Comments should start with // followed '
-                      'by a space' % (n+1))
-                print(self.lines[n])
-
-
-    def within_quotes(self, s, lo, hi):
-        # Capture ranges that are within a string
-        ranges = []
-        index = s.find(DOUBLE_QUOTE)
-        if index == -1:
-            return False
-
-        # Look for matching double quotes that are not escaped
-        in_quote = False
-        prev_quote = index
-        for i in range(index, len(s)):
-            # Check if char at index i is a double quotes that is not escaped
-            if s[i] == DOUBLE_QUOTE and (i == 0 or s[i-1] != BACKSLASH):
-                if in_quote:
-                    in_quote = False
-                    ranges.append((prev_quote, i+1))
-                else:
-                    in_quote = True
-                    prev_quote = i
-
-        # If the range is within the quotes
-        return any([lo >= left and hi < right for (left, right) in ranges])
-
-    # s is the line, n is the line number
-    def within_comment(self, s, n, lo, hi):
-        # Look left from lo to check for //
-        in_quote = False
-        for i in reversed(range(1, lo)):
-            if not in_quote and (s[i-1] + s[i]) == START_COMMENT:
-                return True
-            if s[i] == DOUBLE_QUOTE and (i == 0 or s[i-1] != BACKSLASH):
-                if in_quote:
-                    in_quote = False
-                else:
-                    in_quote = True
-
-        # Check if the string is within a block comment
-        for (start, end) in self.block_cmmts:
-            start_line, start_ind = start[0], start[1]
-            end_line, end_ind = end[0], end[1]
-            # If line is within range
-            if n >= start_line and n <= end_line:
-                if n == start_line and start_line == end_line:
-                    if lo >= start_ind and hi < end_ind:
-                        return True
-                elif n == start_line:
-                    if lo >= start_ind:
-                        return True
-                elif n == end_line:
-                    if hi < end_ind:
-                        return True
-                else:
-                    return True
-
-        return False
+            rule = None
+        # A comment is reported under the same rule whichever rules are
+        # checked, so comments that look like code are never reported under
+        # another one. The code patterns are only matched when that matters
+        if ('commented-out-code' in self.rules or rule in self.rules) and self.is_code(strip):
+            rule = 'commented-out-code'
+        if rule in self.rules:
+            self.collector.report(rule, n+1, COMMENT_MESSAGES[rule], context=[self.lines[n]])
+
+    # n is the line number, lo is the index in the line
+    def within_quotes(self, n, lo):
+        return self.masks[n][lo] in (STRING, CHAR)
+
+    # n is the line number, lo is the index in the line
+    def within_comment(self, n, lo):
+        return self.masks[n][lo] in (LINE_CMMT, BLOCK_CMMT)
 
     # Given two locations, figure out if they are only separated by a space
     def within_one_space(self, loc1, loc2):
@@ -460,27 +774,23 @@ class CStyleChecker(object):
         else:
             return sep_space_ptrn.match(self.lines[loc1[0]][loc2[1]:loc1[1]+1])
 
-    def match_keywords(self, line, n):
-        for j in range(len(line)):
-            for keyword in CONDITIONALS + UNCONDITIONALS + SWITCH_CASE + OTHERS:
-                if len(line) <= len(keyword):
-                    if line.startswith(keyword):
-                        return keyword, 0
-                else:
-                    if line[j:j+len(keyword)] == keyword:
-                        # Look to the left and right to see if it is part of a variable
-                        # name
-                        left = True
-                        right = True
-                        if j != 0:
-                            left = line[j-1] not in VARS_ALLOWED_CHARS
-                        if j + len(keyword) < len(line):
-                            right = line[j+len(keyword)] not in VARS_ALLOWED_CHARS
-
-                        if left and right:
-                            # Check if it's part of a comment
-                            if self.valid_string(line, n, j, j+len(keyword)):
-                                return keyword, j
+    # offset is the index in line n where the passed in line starts
+    # Find the first keyword in line. line starts at index offset of line n
+    def match_keywords(self, line, n, offset=0):
+        # A line that is nothing but a keyword is taken as is
+        if line in KEYWORDS:
+            return line, 0
+        return self.search_keyword(line, n, 0, offset)
+
+    # Find the first keyword in line at or after lo that is in code
+    def search_keyword(self, line, n, lo, offset=0):
+        match = keyword_scan_ptrn.search(line, lo)
+        while match is not None:
+            j = match.start()
+            if self.valid_string(n, offset + j):
+                return match.group(1), j
+            # Skip the keyword since it is all in a comment or string
+            match = keyword_scan_ptrn.search(line, match.end())
 
         return None, -1
 
@@ -488,51 +798,43 @@ class CStyleChecker(object):
     # l1 j1 l2 j2 indicate start and end locations
     def match_terms(self, l1, j1, l2, j2, term):
         assert term in matchers
-        match = matchers[term]
         # Use this value to account for when match is longer than 1 char
-        lookahead = len(match) - 1
-        start = 0
-        prev = None
-        for line_n in range(l1, l2+1):
-            line = self.lines[line_n]
-            lo = j1 if line_n == l1 else 0
-            hi = j2-lookahead if line_n == l2 else len(line) - lookahead
-            for j in range(lo, hi):
-                if line[j:j+len(term)] == term and\
-                        self.valid_string(line, line_n, j, j+len(term)):
-                    start += 1
-                    if prev is None:
-                        prev = (line_n, j)
-                elif line[j:j+len(match)] == match and\
-                        self.valid_string(line, line_n, j, j+len(match)):
-                    start -= 1
-                    if start == 0:
-                        return prev, (line_n, j)
-
-        return None, None
+        lookahead = len(matchers[term]) - 1
+        bound = (l2, j2-lookahead)
+
+        # First opening term at or after the start location
+        openers = self.openers[term]
+        i = bisect_left(openers, (l1, j1))
+        if i == len(openers) or openers[i] >= bound:
+            return None, None
+
+        start = openers[i]
+        end = self.partners.get(start)
+        if end is None or end >= bound:
+            return None, None
+        return start, end
 
     # Look for either the ; or {.
     # If include_keywords, will also look for the keywords on the following lines
     def find_statement_terminator(self, n, start, term=None, include_keywords=False):
-        keywords = CONDITIONALS + UNCONDITIONALS + SWITCH_CASE + OTHERS
+        if term is None:
+            term = (LEFT_CURLY, SEMICOLON)
         for line_n in range(n, len(self.lines)):
             lo = start if line_n == n else 0
             line = self.lines[line_n]
-            for j in range(lo, len(line)):
-                if term is None:
-                    if line[j] in (LEFT_CURLY, SEMICOLON):
-                        if self.valid_string(line, line_n, j, j+1):
-                            return line_n, j
-                else:
-                    if line[j] in term:
-                        if self.valid_string(line, line_n, j, j+1):
-                            return line_n, j
+            hi = len(line)
+            if include_keywords:
+                # Only a term before the keyword can come first
+                keyword, j = self.search_keyword(line, line_n, lo)
+                if keyword is not None:
+                    hi = j
+
+            for j in range(lo, hi):
+                if line[j] in term and self.valid_string(line_n, j):
+                    return line_n, j
 
-                if include_keywords:
-                    for keyword in keywords:
-                        if line[j:j+len(keyword)] == keyword and\
-                                self.valid_string(line, line_n, j, j+len(keyword)):
-                            return line_n, j
+            if hi < len(line):
+                return line_n, hi
 
         return -1, -1
 
@@ -542,7 +844,7 @@ class CStyleChecker(object):
             line = self.lines[line_n]
             hi = start+1 if line_n == n else len(line)
             for j in range(hi):
-                if line[j] in term and self.valid_string(line, line_n, j, j+1):
+                if line[j] in term and self.valid_string(line_n, j):
                     return line_n, j
         return -1, -1
 
@@ -557,6 +859,8 @@ class CStyleChecker(object):
     # Argument n, start specifies the first curly brace
     def find_code_block(self, n, start):
         assert self.lines[n][start] == LEFT_CURLY
+        if (n, start) in self.partners:
+            return (n, start), self.partners[(n, start)]
         return self.match_terms(n, start,
                                 len(self.lines)-1, len(self.lines[-1]),
                                 LEFT_CURLY)
@@ -565,27 +869,46 @@ class CStyleChecker(object):
     def generate_guide(self, s, indices):
         return "".join(['^' if i in indices else ' ' for i in range(len(s))])
 
+    # Same as classify_line but every line is only classified once
+    # Raises ParseError if the line cannot be classified
+    def parse_line(self, n):
+        block = self.block_cache.get(n)
+        if block is None:
+            self.cache_misses += 1
+            try:
+                block = self.classify_line(n)
+            except PARSE_FAILURES:
+                raise self.parse_error(n)
+            if block.last_line < block.first_line:
+                # Nothing could be found to go with the line
+                raise self.parse_error(n)
+            self.block_cache[n] = block
+        else:
+            self.cache_hits += 1
+        return block
+
     # Check what kind of statement starting from this line
     # Return group of lines that belong to that statement and the type
-    def parse_line(self, n):
+    def classify_line(self, n):
         og_line = self.lines[n]
         line = og_line.lstrip()    # Strip white space to the left
-        group = []
+        # Last line of the group, before n while the group is empty
+        last = n - 1
 
         if len(line) == 0:
-            group.append(n)
+            last = n
             # If lines below are empty, add them to the group
             for line_n in range(n+1, len(self.lines)):
                 if len(self.lines[line_n].lstrip()) == 0:
-                    group.append(line_n)
+                    last = line_n
                 else:
                     break
-            block = CodeBlock(group, _EMPTY_LINE)
+            block = CodeBlock(n, last, _EMPTY_LINE)
             return block
 
         match = cmmt_ptrn.match(line)
         if match:
-            block = CodeBlock([n], _CMMT)
+            block = CodeBlock(n, n, _CMMT)
             # Find where the / starts
             block.start = (n, og_line.find(FORWARD_SLASH))
             block.end = (n, len(og_line)-1)
@@ -595,24 +918,21 @@ class CStyleChecker(object):
         if match:
             # Find the end of the comment block
             start = og_line.find(START_BLOCK_COMMENT)
-            for line_n in range(n, len(self.lines)):
-                lo = start+2 if line_n == n else 0
-                for j in range(lo, len(self.lines[line_n])-1):
-                    pair = self.lines[line_n][j:j+2]
-                    if pair == END_BLOCK_COMMENT:
-                        # Found the end of the comment block
-                        group.append(line_n)
-                        block = CodeBlock(group, _BLOCK_CMMT)
-                        block.start = (n, start)
-                        block.end = (line_n, j+1)
-                        return block
-
-                group.append(line_n)
+            span = self.find_block_comment(n, start)
+            if span:
+                end_line, end_ind = span[1]
+                block = CodeBlock(n, end_line, _BLOCK_CMMT)
+                block.start = (n, start)
+                block.end = (end_line, end_ind-1)
+                return block
+
+            # Comment block is never closed
+            last = len(self.lines) - 1
 
         keyword, index = self.match_keywords(og_line, n)
         if keyword:
             if keyword in CONDITIONALS:
-                block = CodeBlock(group, _CONDITIONAL)
+                block = CodeBlock(n, last, _CONDITIONAL)
                 block.keyword = keyword
                 # Start of the keyword
                 block.start = (n, index)
@@ -621,8 +941,7 @@ class CStyleChecker(object):
                 block.start_cond = start
                 block.end_cond = end
                 # All line numbers from start of condition keyword to end of condition
-                line_nums = [_ for _ in range(n, end[0]+1)]
-                group.extend(line_nums)
+                block.extend_to(end[0])
 
                 l, j = self.find_statement_terminator(end[0], end[1])
                 block.term_loc = (l, j)
@@ -634,11 +953,11 @@ class CStyleChecker(object):
                     block.block_loc = (code_start, code_end)
                     block.end = code_end
                     # Add all lines up to the matching right curly brace (inclusive)
-                    group.extend([_ for _ in range(end[0]+1, code_end[0]+1)])
+                    block.extend_to(code_end[0])
                 else:   # Terminator is semicolon
                     # Add all lines from one past the condition right paren up to
                     # the semicolon
-                    group.extend([_ for _ in range(end[0]+1, l+1)])
+                    block.extend_to(l)
                     block.end = (l, j)
 
                 if block.keyword == "else if":
@@ -653,7 +972,7 @@ class CStyleChecker(object):
 
                 return block
             elif keyword in UNCONDITIONALS:
-                block = CodeBlock(group, _UNCONDITIONAL)
+                block = CodeBlock(n, last, _UNCONDITIONAL)
                 block.keyword = keyword
                 block.start = (n, index)
 
@@ -684,7 +1003,7 @@ class CStyleChecker(object):
                     l, j = self.find_statement_terminator(end_cond[0], end_cond[1], term=SEMICOLON)
                     end = (l, j)
                     block.end = end
-                    group.extend([_ for _ in range(n, end[0]+1)])
+                    block.extend_to(end[0])
                     return block
                 else:
                     if self.lines[l][j] == LEFT_CURLY:
@@ -695,12 +1014,12 @@ class CStyleChecker(object):
                         block.end = code_end
 
                         # Add all lines up to the matching right curly brace (inclusive)
-                        group.extend([_ for _ in range(n, code_end[0]+1)])
+                        block.extend_to(code_end[0])
                     else:   # Terminator is semicolon
                         # Add all lines from one past the condition right paren up to
                         # the semicolon
                         block.end = (l, j)
-                        group.extend([_ for _ in range(n, l+1)])
+                        block.extend_to(l)
 
                     if block.keyword == "else":
                         # Look for }
@@ -713,7 +1032,7 @@ class CStyleChecker(object):
                             block.prev_rcurly = (l, j)
                     return block
             elif keyword in SWITCH_CASE:    # Keyword is case or default
-                block = CodeBlock(group, _SWITCH_CASE)
+                block = CodeBlock(n, last, _SWITCH_CASE)
                 block.keyword = keyword
                 block.start = (n, index)
 
@@ -739,6 +1058,10 @@ class CStyleChecker(object):
 
                 count = 1   # Curly brace count starts at 1 because we are within switch
                 lo = block.term_loc[0]
+                # The lines of the case start at its terminator, so a label
+                # on a line of its own is not checked with them
+                if block.last_line < block.first_line:
+                    block.first_line = lo
                 for line_n in range(lo, len(self.lines)):
                     line = self.lines[line_n]
                     # If we don't use curly then if we run into another case, then
@@ -759,11 +1082,11 @@ class CStyleChecker(object):
                     for j in range(start, len(line)):
                         if line[j] == LEFT_CURLY:
                             # Check if the curly is in a comment or in string
-                            if self.valid_string(line, line_n, j, j+1):
+                            if self.valid_string(line_n, j):
                                 count += 1
                         elif line[j] == RIGHT_CURLY:
                             # Check if the curly is in a comment or in string
-                            if self.valid_string(line, line_n, j, j+1):
+                            if self.valid_string(line_n, j):
                                 count -= 1
                                 if count == 0:
                                     if not uses_curly:
@@ -771,26 +1094,26 @@ class CStyleChecker(object):
                                         # it contains statements from the current case
                                         match = white_space_ptrn.match(line[:j])
                                         if match is None:
-                                            group.append(line_n)
+                                            block.extend_to(line_n)
                                     else:
                                         block.end = (line_n, j)
                                         block.block_loc = (block.term_loc, block.end)
-                                        group.append(line_n)
+                                        block.extend_to(line_n)
 
                                     return block
 
-                    group.append(line_n)
+                    block.extend_to(line_n)
 
                 return block
 
         match = c_dirs_ptrn.match(line)
         if match:
-            block = CodeBlock(group, _DIRECTIVE)
+            block = CodeBlock(n, last, _DIRECTIVE)
             block.start = (n, og_line.find(POUND))
             # C Directive
             for line_n in range(n, len(self.lines)):
                 line = self.lines[line_n]
-                group.append(line_n)
+                block.extend_to(line_n)
                 # Check if this directive was escaped and break if it is not
                 # since the next line won't be part of the directive
                 l = line.rstrip()
@@ -804,7 +1127,7 @@ class CStyleChecker(object):
         l, j = self.find_statement_terminator(n, 0)
         code = "".join([self.lines[_] for _ in range(n, l+1)])
         if func_ptrn.match(code) and not func_hdr_ptrn.match(code):
-            block = CodeBlock(group, _FUNC)
+            block = CodeBlock(n, last, _FUNC)
             index = len(og_line) - len(og_line.lstrip())
             block.start = (n, index)
 
@@ -816,9 +1139,7 @@ class CStyleChecker(object):
             l, j = self.find_statement_terminator(l, j, term=LEFT_CURLY)
             block.term_loc = (l, j)
             if l == -1:
-                print(self.lines[n])
-                print('Program ran into an error')
-                sys.exit(1)
+                raise self.parse_error(n)
 
             # Find parameters start and end
             start_params, end_params = self.match_terms(block.start[0], block.start[1],
@@ -829,134 +1150,454 @@ class CStyleChecker(object):
             block.block_loc = (start, end)
             block.end = end
             block.uses_curly = True
-            group.extend([_ for _ in range(n, end[0]+1)])
+            block.extend_to(end[0])
             return block
         else:   # Either structure or regular statement
             index = len(og_line) - len(og_line.lstrip())
             if self.lines[l][j] == LEFT_CURLY:
-                block = CodeBlock(group, _STRUCTURE)
+                block = CodeBlock(n, last, _STRUCTURE)
                 block.start = (n, index)
 
                 # Structure
                 start, end = self.find_code_block(l, j)
                 block.block_loc = (start, end)
                 block.end = end
-                group.extend([_ for _ in range(n, end[0]+1)])
+                block.extend_to(end[0])
                 block.uses_curly = True
                 return block
             else:   # Semicolon
-                block = CodeBlock(group, _STATEMENT)
+                block = CodeBlock(n, last, _STATEMENT)
                 block.start = (n, index)
                 block.end = (l, j)
 
-                group.extend([_ for _ in range(n, l+1)])
+                block.extend_to(l)
                 return block
 
+    # Parse phase: build the tree of blocks for the whole file
+    # Without nested, only the top level blocks are parsed and parse_children
+    # has to be called on each of them before it is checked
+    def build_tree(self, nested=True):
+        self.tree = self.parse_blocks(None, 0, len(self.lines)-1, 0, check_magic=False,
+                                      nested=nested)
+
+    # Parse the blocks starting at line i up to line last (inclusive) that are
+    # nested in parent. indent_amt, check_magic and in_switch are what the
+    # blocks will be checked with. Comments can be given their own indent_amt.
+    # Without nested, the blocks nested in them are not parsed
+    def parse_blocks(self, parent, i, last, indent_amt, check_magic=True,
+                     in_switch=False, cmmt_indent=None, nested=True):
+        blocks = []
+        while i < len(self.lines) and i <= last:
+            block = self.parse_line(i)
+            if block.indent_amt is not None:
+                # Cached block that is already in the tree somewhere else
+                block = copy.copy(block)
+
+            block.parent = parent
+            block.check_magic = check_magic
+            block.in_switch = in_switch
+            if cmmt_indent is not None and block.get_type() == _CMMT:
+                block.indent_amt = cmmt_indent
+            else:
+                block.indent_amt = indent_amt
+
+            blocks.append(block)
+            t = block.get_type()
+            if self.result_cache is not None and parent is None and\
+                    t in INCREMENTAL_TYPES:
+                # Unchanged top level blocks are not parsed any further
+                block.fingerprint = self.get_fingerprint(block)
+                block.cached_output = self.result_cache.get(block.fingerprint)
+                if block.cached_output is not None:
+                    i = block.lines[-1] + 1
+                    continue
+
+            i = self.parse_children(block, nested)
+
+        return blocks
+
+    # Parse the blocks nested in block and return the line number to continue
+    # parsing from. This walks the lines in the same order the handlers
+    # check them. Without nested, only the line to continue from is found
+    # Raises ParseError for the first line of the innermost block that could
+    # not be parsed
+    def parse_children(self, block, nested=True):
+        try:
+            return self.parse_nested(block, nested)
+        except PARSE_FAILURES:
+            raise self.parse_error(block.first_line)
+
+    def parse_nested(self, block, nested):
+        lines = block.lines
+        t = block.get_type()
+        indent_amt = block.indent_amt
+        if t == _CMMT:
+            return lines[0] + 1
+        elif t in (_CONDITIONAL, _UNCONDITIONAL):
+            term_line, term_ind = block.term_loc[0], block.term_loc[1]
+            if self.lines[term_line][term_ind] != LEFT_CURLY:
+                # Statement on the same line as the condition
+                if term_line == lines[0]:
+                    return term_line + 1
+
+                # Statements on the lines following the condition
+                if nested:
+                    start = block.end_cond if t == _CONDITIONAL else block.start
+                    block.children = self.parse_blocks(block, start[0]+1, lines[-1],
+                                                       indent_amt+self.indent_amt)
+                return lines[-1] + 1
+
+            if nested:
+                # Inside a switch, the cases are not indented in any further
+                is_switch = block.keyword == "switch"
+                n_indent_amt = indent_amt if is_switch else indent_amt+self.indent_amt
+                block.children = self.parse_blocks(block, term_line+1, lines[-1]-1,
+                                                   n_indent_amt, in_switch=is_switch)
+            # If there is a keyword behind the }, the last line gets parsed again
+            block.end_keyword = self.find_end_keyword(block)
+            return lines[-1] if block.end_keyword else lines[-1] + 1
+        elif t == _FUNC:
+            if nested:
+                block.children = self.parse_blocks(block, block.term_loc[0]+1, lines[-1]-1,
+                                                   indent_amt+self.indent_amt)
+        elif t == _STRUCTURE:
+            if nested and len(lines) > 1:
+                term_line, term_ind = self.find_statement_terminator(lines[0], 0)
+                block.children = self.parse_blocks(block, term_line+1, lines[-1]-1,
+                                                   indent_amt+self.indent_amt,
+                                                   check_magic=block.check_magic)
+                # A keyword behind the } skips the check of the last line,
+                # but unlike a condition the line is not parsed again
+                block.end_keyword = self.find_end_keyword(block)
+        elif t == _SWITCH_CASE:
+            if nested:
+                # If uses curly, we only go up to the second to last line
+                last = lines[-1]-1 if block.uses_curly else lines[-1]
+                block.children = self.parse_blocks(block, block.term_loc[0]+1, last,
+                                                   indent_amt+self.case_indent+self.indent_amt,
+                                                   in_switch=True, cmmt_indent=indent_amt)
+            if block.uses_curly:
+                block.end_keyword = self.find_end_keyword(block)
+                if block.end_keyword:
+                    return lines[-1]
+
+        return lines[-1] + 1
+
+    # Look for a keyword behind the } that ends the block
+    def find_end_keyword(self, block):
+        if block.keyword == "do":
+            return None
+
+        curly_end = block.block_loc[1]
+        after = self.lines[curly_end[0]][curly_end[1]+1:]
+        # If the after part is not a comment
+        if len(after) != 0 and not cmmt_ptrn.match(after) and\
+                not blck_cmmt_empty_ptrn.match(after):
+            keyword, index = self.match_keywords(after, curly_end[0], curly_end[1]+1)
+            return keyword
+
+        return None
+
+    # Fingerprint of the text of a top level block and of everything else
+    # that its output depends on
+    def get_fingerprint(self, block):
+        h = hashlib.sha1()
+        settings = (self.__class__.__name__, self.VERSION, self.strict, sorted(self.rules),
+                    self.indent_amt, getattr(self, 'case_indent', None))
+        h.update(repr(settings).encode('utf-8'))
+        for line_n in block.lines:
+            # The masks make sure the block is lexed the same way
+            h.update(('\n%s\n%s' % (self.lines[line_n], self.masks[line_n])).encode('utf-8'))
+        return h.hexdigest()
+
+    # Check a top level block, or add entries if it was already checked by
+    # another process (as dicts, see check_parallel). If the result cache has
+    # what the same block reported in an earlier run, report that again with
+    # the line numbers moved to where the block is now
+    def visit_top_level(self, block, entries=None):
+        if block.cached_output is not None:
+            delta = block.lines[0] - block.cached_output['start']
+            for d in block.cached_output['entries']:
+                entry = from_entry_dict(d)
+                if delta != 0 and isinstance(entry, Diagnostic):
+                    entry = entry.shifted(delta)
+                self.collector.entries.append(entry)
+            return
+
+        if entries is not None:
+            self.collector.entries.extend([from_entry_dict(d) for d in entries])
+        else:
+            first = len(self.collector.entries)
+            self.visit(block)
+            if block.fingerprint is not None:
+                entries = [to_entry_dict(e) for e in self.collector.entries[first:]]
+
+        if block.fingerprint is not None:
+            self.result_cache.put(block.fingerprint, {'start': block.lines[0],
+                                                      'entries': entries})
+
+    # Parse and check the top level blocks that are not cached with self.jobs
+    # processes. Only the top level blocks are parsed by run() first. They are
+    # parsed and checked at indent 0 without looking at the blocks around
+    # them, so they are split into runs of about the same number of lines and
+    # each run is handled by whichever process is free.
+    # Returns the entries of every block that was checked as dicts, by the
+    # index of the block in the tree. The blocks that were not are parsed
+    # here, in order, so a block that cannot be parsed raises before anything
+    # is checked, as it does with a single process
+    def check_parallel(self):
+        global parallel_checker
+        todo = [i for i, block in enumerate(self.tree) if block.cached_output is None]
+        num_lines = sum([len(self.tree[i].lines) for i in todo])
+
+        chunk_lines = num_lines // (self.jobs * PARALLEL_CHUNKS_PER_JOB) + 1
+        chunks = []
+        chunk = []
+        size = 0
+        for i in todo:
+            chunk.append(i)
+            size += len(self.tree[i].lines)
+            if size >= chunk_lines:
+                chunks.append(chunk)
+                chunk = []
+                size = 0
+        if chunk:
+            chunks.append(chunk)
+
+        checked = {}
+        if num_lines >= PARALLEL_MIN_LINES and len(chunks) > 1:
+            # The processes are forked with a copy of the checker, tree and all
+            parallel_checker = self
+            pool = None
+            results = []
+            try:
+                pool = runner.fork_pool(self.jobs)
+                if pool is not None:
+                    results = pool.map(check_top_level, chunks)
+            finally:
+                parallel_checker = None
+                if pool is not None:
+                    pool.close()
+                    pool.join()
+
+            for chunk, entries in zip(chunks, results):
+                # Blocks from one that raised on are left out of entries
+                checked.update(zip(chunk, entries))
+
+        for i in todo:
+            if i not in checked:
+                self.parse_children(self.tree[i])
+        return checked
+
+    # The smallest blocks that hold the changed lines, in the order of their
+    # lines, by the index of the top level block they are in. Each run of
+    # changed lines goes to the blocks nested in a block that it overlaps,
+    # and only stops at the block itself if it holds its first or last line
+    # or some of its lines are not in any of them. Only the top level blocks
+    # that hold changed lines have what is nested in them parsed, if parse is
+    # set. The rest of the file is not parsed any further
+    def changed_blocks(self, parse=True):
+        runs = []
+        for n in sorted(self.changed):
+            if len(runs) != 0 and runs[-1][1] == n - 1:
+                runs[-1][1] = n
+            else:
+                runs.append([n, n])
+
+        firsts = [block.first_line for block in self.tree]
+        selected = defaultdict(list)
+        for lo, hi in runs:
+            # Top level blocks can share a line with the one before them
+            i = max(bisect_right(firsts, lo) - 2, 0)
+            while i < len(self.tree) and self.tree[i].first_line <= hi:
+                block = self.tree[i]
+                if block.last_line >= lo:
+                    if parse and i not in selected:
+                        self.parse_children(block)
+                    blocks = selected[i]
+                    for inner in self.enclosing_blocks(block, max(lo, block.first_line),
+                                                       min(hi, block.last_line)):
+                        if inner not in blocks:
+                            blocks.append(inner)
+                i += 1
+
+        for i, blocks in selected.items():
+            chosen = set([id(block) for block in blocks])
+            kept = []
+            for block in sorted(blocks, key=lambda b: (b.first_line, -b.last_line)):
+                # Blocks nested in another chosen block are checked with it
+                parent = block.parent
+                while parent is not None and id(parent) not in chosen:
+                    parent = parent.parent
+                if parent is None:
+                    kept.append(block)
+            selected[i] = kept
+        return selected
+
+    # The smallest blocks nested in block, or block itself, that hold the
+    # lines from lo up to hi of it
+    def enclosing_blocks(self, block, lo, hi):
+        # The first and last lines of a block are checked by the block
+        # itself, even when a block nested in it shares them
+        if lo <= self.first_checked_line(block) <= hi or lo <= block.first_line <= hi or\
+                lo <= block.last_line <= hi:
+            return [block]
+        inner = [child for child in block.children
+                 if self.first_checked_line(child) <= hi and child.last_line >= lo]
+        # Lines of block that are not in the ones nested in it
+        n = lo
+        for child in inner:
+            if child.first_line > n:
+                return [block]
+            n = max(n, child.last_line + 1)
+        if n <= hi:
+            return [block]
+
+        blocks = []
+        for child in inner:
+            blocks.extend(self.enclosing_blocks(child, max(lo, self.first_checked_line(child)),
+                                                min(hi, child.last_line)))
+        return blocks
+
+    # First line block reports issues on. An else or else if on a line after
+    # the } of the block before it reports on the line of that } as well
+    def first_checked_line(self, block):
+        if block.prev_rcurly is not None:
+            return min(block.prev_rcurly[0], block.first_line)
+        return block.first_line
+
     def print_lines(self, lines, print_n=False):
         for line_n in lines:
             if print_n:
-                print('%d\t\t%s' % (line_n+1, self.lines[line_n]))
+                self.collector.text('%d\t\t%s' % (line_n+1, self.lines[line_n]))
             else:
-                print(self.lines[line_n])
+                self.collector.text(self.lines[line_n])
 
     # General case indentation
     # with exact indentation match
     # flex parameter will check for either indent_amt or indent_amt + self.indent_amt
     def check_indentation(self, lines, indent_amt, flex=False):
+        check_indent = 'indentation' in self.rules
+        check_tabs = 'tab-indent' in self.rules
         errors = defaultdict(list)
         for line_n in lines:
             line = self.lines[line_n]
             # Ignore if the line is whitespace only
             if white_space_ptrn.match(line):
-                block = CodeBlock([line_n], _EMPTY_LINE)
+                block = CodeBlock(line_n, line_n, _EMPTY_LINE)
                 self.handle_whitespace(block)
                 continue
 
-            stripped_line = line.lstrip()
-            actual_indent_amt = len(line) - len(stripped_line)
-            if flex:
-                if actual_indent_amt != indent_amt and\
-                        actual_indent_amt != indent_amt + self.indent_amt:
-                    errors[line_n].append(
-                        'Line %d: Inconsistent Indentation. Expected %d spaces. Got %d'
-                        % (line_n+1, indent_amt, actual_indent_amt)
-                    )
+            if check_indent:
+                stripped_line = line.lstrip()
+                actual_indent_amt = len(line) - len(stripped_line)
+                if flex:
+                    if actual_indent_amt != indent_amt and\
+                            actual_indent_amt != indent_amt + self.indent_amt:
+                        errors[line_n].append((
+                            'indentation',
+                            'Inconsistent Indentation. Expected %d spaces. Got %d'
+                            % (indent_amt, actual_indent_amt)
+                        ))
 
-            else:
-                if line_n == lines[0]:
-                    # For the first line, the statement start exactly at indent_amt
-                    if actual_indent_amt != indent_amt:
-                        errors[line_n].append(
-                            'Line %d: Inconsistent Indentation. Expected %d spaces, Got %d'
-                            % (line_n+1, indent_amt, actual_indent_amt)
-                        )
                 else:
-                    # For any other line, the statement must be indented
-                    # at least indent_amt in
-                    if actual_indent_amt < indent_amt + NEXT_LINE_INDENT:
-                        errors[line_n].append(
-                            'Line %d: Inconsistent Indentation. Continuation of statement must be '
-                            'indented in by %d. Got %d' % (line_n+1, indent_amt+NEXT_LINE_INDENT, actual_indent_amt)
-                        )
-            og_line = self.og_lines[line_n]
-            i = len(og_line) - len(og_line.lstrip())
-            if og_line[:i].find(TAB_CHAR) != -1:
-                errors[line_n].append('Line %d: Used TAB to indent' % (line_n+1))
+                    if line_n == lines[0]:
+                        # For the first line, the statement start exactly at indent_amt
+                        if actual_indent_amt != indent_amt:
+                            errors[line_n].append((
+                                'indentation',
+                                'Inconsistent Indentation. Expected %d spaces, Got %d'
+                                % (indent_amt, actual_indent_amt)
+                            ))
+                    else:
+                        # For any other line, the statement must be indented
+                        # at least indent_amt in
+                        if actual_indent_amt < indent_amt + NEXT_LINE_INDENT:
+                            errors[line_n].append((
+                                'indentation',
+                                'Inconsistent Indentation. Continuation of statement must be '
+                                'indented in by %d. Got %d' % (indent_amt+NEXT_LINE_INDENT, actual_indent_amt)
+                            ))
+            if check_tabs and self.lines.has_tabs(line_n):
+                og_line = self.lines.raw(line_n)
+                i = len(og_line) - len(og_line.lstrip())
+                if og_line[:i].find(TAB_CHAR) != -1:
+                    errors[line_n].append(('tab-indent', 'Used TAB to indent'))
 
         if len(errors) != 0:
             keys = sorted(list(errors.keys()))
             for key in keys:
-                for error in errors[key]:
-                    print(error)
-                print(self.lines[key])
+                # The line is shown once, under the last error of the line
+                for i, (rule, message) in enumerate(errors[key]):
+                    context = [self.lines[key]] if i == len(errors[key]) - 1 else []
+                    self.collector.report(rule, key+1, message, context=context)
 
     def check_magic(self, lines):
+        if 'magic-number' not in self.rules:
+            return
         for line_n in lines:
-            has_magic = self.contains_magic(self.lines[line_n], line_n)
-            if has_magic:
-                print('Line %d: Contains magic number' % (line_n+1))
-                print(self.lines[line_n])
+            if line_n in self.magic_lines:
+                self.collector.report('magic-number', line_n+1, 'Contains magic number',
+                                      context=[self.lines[line_n]])
 
     # General case: Handling group of lines with t being the type that
     # the lines belong to
     def handle_block(self, block, indent_amt, check_magic=True, in_switch=False):
         t = block.get_type()
         if t == _BLOCK_CMMT:
-            return self.handle_block_comment(block, indent_amt)
+            self.handle_block_comment(block, indent_amt)
         elif t == _CMMT:
-            return self.handle_comment(block, indent_amt, in_switch)
+            self.handle_comment(block, indent_amt, in_switch)
         elif t == _DIRECTIVE:
-            return self.handle_directive(block, indent_amt)
+            self.handle_directive(block, indent_amt)
         elif t == _CONDITIONAL:
-            return self.handle_cond(block, indent_amt)
+            self.handle_cond(block, indent_amt)
         elif t == _UNCONDITIONAL:
-            return self.handle_uncond(block, indent_amt)
+            self.handle_uncond(block, indent_amt)
         elif t == _FUNC:
-            return self.handle_func(block, indent_amt)
+            self.handle_func(block, indent_amt)
         elif t == _STATEMENT:
-            return self.handle_statement(block, indent_amt, check_magic)
+            self.handle_statement(block, indent_amt, check_magic)
         elif t == _STRUCTURE:
-            return self.handle_structure(block, indent_amt, check_magic)
+            self.handle_structure(block, indent_amt, check_magic)
         elif t == _EMPTY_LINE:
-            return self.handle_whitespace(block)
+            self.handle_whitespace(block)
         elif t == _SWITCH_CASE:
-            return self.handle_switch_case(block, indent_amt)
+            self.handle_switch_case(block, indent_amt)
 
-        return None
+    # Check a block of the tree with what it was parsed with
+    # Raises ParseError for the first line of the innermost block the
+    # handlers could not make sense of
+    def visit(self, block):
+        try:
+            self.handle_block(block, block.indent_amt, check_magic=block.check_magic,
+                              in_switch=block.in_switch)
+        except PARSE_FAILURES:
+            raise self.parse_error(block.first_line)
+
+    # What is raised when the checker gives up on line n
+    def parse_error(self, n):
+        return ParseError('Program ran into an error', self.filename,
+                          context=[self.lines[n]], line=n+1)
+
+    def visit_children(self, block):
+        for child in block.children:
+            self.visit(child)
 
     def handle_trailing_string(self, trail, n, terminator):
         if len(trail) != 0:
             # Trailing white space is more than 1 space char
             if white_space_ptrn.match(trail):
-                if len(trail) > 1 and self.check_ws:
-                    print('Line %d: Extra white space behind %s' % (n+1, terminator))
-                    print(self.lines[n])
+                if len(trail) > 1 and 'trailing-whitespace' in self.rules:
+                    self.collector.report('trailing-whitespace', n+1,
+                                          'Extra white space behind %s' % terminator,
+                                          context=[self.lines[n]])
             else:
                 # Check if the trailing string is a comment. If it is then it's fine
                 if not cmmt_ptrn.match(trail) and not blck_cmmt_empty_ptrn.match(trail):
-                    print('Line %d: Statements behind %s should be '\
-                          'on the next line' % (n+1, terminator))
-                    print(self.lines[n])
+                    self.collector.report('trailing-statement', n+1,
+                                          'Statements behind %s should be on the next line'
+                                          % terminator, context=[self.lines[n]])
                 else:
                     # Check if the comment is a todo comment or commented out code
                     self.check_comment(trail, n)
@@ -966,12 +1607,13 @@ class CStyleChecker(object):
             if white_space_ptrn.match(leading):
                 self.check_indentation([n], indent_amt)
             else:
-                print('Line %d: %s should be on the next line' % (n+1, terminator))
+                self.collector.report('leading-statement', n+1,
+                                      '%s should be on the next line' % terminator)
 
     # Handle style checking around the terminator { or ;
-    # If {, then it will check the curly brace indentation. Returns None
+    # If {, then it will check the curly brace indentation. Returns False
     # If ;, then it will simply handle the statement that follows up to that ;
-    # Returns the line number to follow if ;
+    # Returns True since the whole block has been handled
     def handle_terminator(self, block, indent_amt):
         lines = block.lines
         term_line, term_ind = block.term_loc[0], block.term_loc[1]
@@ -996,7 +1638,7 @@ class CStyleChecker(object):
 
             after = self.lines[term_line][term_ind+1:]
             self.handle_trailing_string(after, term_line, LEFT_CURLY)
-            return None
+            return False
         else:   # Semicolon or keywords
             # Condition statement and the following statement is on the same
             # line. For example: if (condition) print(something);
@@ -1004,7 +1646,7 @@ class CStyleChecker(object):
             # for the inner block
             if term_line == lines[0]:
                 self.check_indentation([term_line], indent_amt)
-                return term_line + 1
+                return True
 
             # Must handle case where we have
             # if (condition1)
@@ -1017,13 +1659,9 @@ class CStyleChecker(object):
                 start = block.start
                 self.check_indentation([start[0]], indent_amt)
 
-            # We will parse starting at the first line after the start line
-            i = start[0] + 1
-            while i < len(self.lines) and i <= lines[-1]:
-                n_block = self.parse_line(i)
-                i = self.handle_block(n_block, indent_amt+self.indent_amt)
-
-            return lines[-1] + 1
+            # The statements start at the first line after the start line
+            self.visit_children(block)
+            return True
 
     def handle_end_block(self, block, indent_amt):
         curly_start, curly_end = block.block_loc[0], block.block_loc[1]
@@ -1042,10 +1680,9 @@ class CStyleChecker(object):
         if len(after) != 0:
             # If the after part is not a comment
             if not cmmt_ptrn.match(after) and not blck_cmmt_empty_ptrn.match(after):
-                keyword, index = self.match_keywords(after, curly_end[0])
-                # If there is a keyword, return this line so that
-                # that could be parsed later. We ignore the leading and trailing
-                # check
+                keyword = block.end_keyword
+                # If there is a keyword, the line was parsed again as the
+                # next block. We ignore the leading and trailing check
                 if keyword:
                     return keyword
                 else:
@@ -1066,16 +1703,17 @@ class CStyleChecker(object):
         if not self.within_one_space(loc1, loc2):
             line = self.lines[block.start[0]]
             if loc1[0] != loc2[0]:
-                print('Line %d to %d: %s block must start on the same line as the '
-                      'curly brace of the previous if/else if block'\
-                      % (loc1[0]+1, loc2[0]+1, block.keyword))
-                self.print_lines([_ for _ in range(block.prev_rcurly[0],
-                                                   block.start[0]+1)])
+                self.collector.report('else-spacing', loc1[0]+1,
+                                      '%s block must start on the same line as the '
+                                      'curly brace of the previous if/else if block'
+                                      % block.keyword, end_line=loc2[0]+1,
+                                      context=[self.lines[_] for _ in
+                                               range(block.prev_rcurly[0], block.start[0]+1)])
             else:
-                print('Line %d: %s block must start within one space of }'\
-                      % (block.start[0]+1, block.keyword))
-                print(line)
-                print(self.generate_guide(line, [loc1[1], loc2[1]]))
+                self.collector.report('else-spacing', block.start[0]+1,
+                                      '%s block must start within one space of }'
+                                      % block.keyword, column=loc2[1]+1,
+                                      context=[line, self.generate_guide(line, [loc1[1], loc2[1]])])
 
     def handle_curly_brace_spacing(self, block):
         if block.get_type() == _CONDITIONAL:
@@ -1090,19 +1728,17 @@ class CStyleChecker(object):
         if not self.within_one_space(loc1, loc2):
             line = self.lines[loc1[0]]
             if loc1[0] != loc2[0]:
-                print('Line %d to %d: { must be on the same line after the '
-                      'end of %s condition'
-                      % (loc1[0]+1, loc2[0]+1, block.keyword))
-                self.print_lines([_ for _ in range(loc1[0], loc2[0]+1)])
+                self.collector.report('curly-spacing', loc1[0]+1,
+                                      '{ must be on the same line after the end of %s condition'
+                                      % block.keyword, end_line=loc2[0]+1,
+                                      context=[self.lines[_] for _ in range(loc1[0], loc2[0]+1)])
             else:
-                print('Line %d: ) and { must be separated with a space'
-                      % (loc1[0]+1))
-                print(line)
-                print(self.generate_guide(line, [loc1[1], loc2[1]]))
+                self.collector.report('curly-spacing', loc1[0]+1,
+                                      ') and { must be separated with a space', column=loc2[1]+1,
+                                      context=[line, self.generate_guide(line, [loc1[1], loc2[1]])])
 
     def handle_block_comment(self, block, indent_amt):
         lines = block.lines
-        errors = []
         for line_n in lines:
             # Replace tabs with spaces
             line = self.lines[line_n]
@@ -1116,47 +1752,33 @@ class CStyleChecker(object):
             if line_n == lines[0]:
                 # For the first line, the / should be == indent_amt
                 if actual_indent_amt != indent_amt:
-                    errors.append((
-                        'Line %d: Inconsistent Indentation. Expected %d spaces. Got %d'\
-                        % (line_n+1, indent_amt, actual_indent_amt),
-                        line
-                    ))
+                    self.collector.report('indentation', line_n+1,
+                                          'Inconsistent Indentation. Expected %d spaces. Got %d'
+                                          % (indent_amt, actual_indent_amt), context=[line])
             else:
                 # For any other line, the * should line up, so indent
                 # amount should be == indent_amt + 1
                 # Only check this if they start the comment block with *
                 if stripped_line[0] == ASTERISK:
                     if actual_indent_amt != indent_amt + 1:
-                        errors.append((
-                            'Line %d: Inconsistent Indentation. Expected %d spaces. Got %d'\
-                            % (line_n+1, indent_amt+1, actual_indent_amt),
-                            line
-                        ))
+                        self.collector.report('indentation', line_n+1,
+                                              'Inconsistent Indentation. Expected %d spaces. '
+                                              'Got %d' % (indent_amt+1, actual_indent_amt),
+                                              context=[line])
                 else:
                     if actual_indent_amt < indent_amt + 2:
-                        errors.append((
-                            'Line %d: Inconsistent Indentation. Expected at least %d spaces. Got %d'\
-                            % (line_n+1, indent_amt+2, actual_indent_amt),
-                            line
-                        ))
-
-        if len(errors) != 0:
-            for (error, line) in errors:
-                print(error)
-                print(line)
+                        self.collector.report('indentation', line_n+1,
+                                              'Inconsistent Indentation. Expected at least %d '
+                                              'spaces. Got %d' % (indent_amt+2, actual_indent_amt),
+                                              context=[line])
 
         last_line = self.lines[lines[-1]]
         index = last_line.find(END_BLOCK_COMMENT)
+        # Should always be found given the code compiles
         if index != -1:
             after = last_line[index+2:]
             self.handle_trailing_string(after, lines[-1], END_BLOCK_COMMENT)
 
-            # Return the next line number
-            return lines[-1] + 1
-
-        # This should not happen given the code compiles
-        return None
-
     def handle_comment(self, block, indent_amt, in_switch=False):
         lines = block.lines
         if in_switch:
@@ -1169,19 +1791,14 @@ class CStyleChecker(object):
         # Check for TODO and commented out code
         self.check_comment(self.lines[lines[0]], lines[0])
 
-        return lines[0] + 1
-
     def handle_directive(self, block, indent_amt):
-        lines = block.lines
-        self.check_indentation(lines, indent_amt)
-        return lines[-1] + 1
+        self.check_indentation(block.lines, indent_amt)
 
     def handle_switch_case(self, block, indent_amt):
         lines = block.lines
-        switch_indent = indent_amt
         indent_amt = indent_amt + self.case_indent
 
-        if block.uses_curly and self.strict:
+        if block.uses_curly and 'curly-spacing' in self.rules:
             self.handle_curly_brace_spacing(block)
 
         # Look for colon
@@ -1193,109 +1810,86 @@ class CStyleChecker(object):
         after = line[term_ind+1:]
         self.handle_trailing_string(after, term_line, line[term_ind])
 
-        # Parse the statements for this case
-        i = term_line + 1
-        # If uses curly, we only go up to the second to last line
-        k = lines[-1]-1 if block.uses_curly else lines[-1]
-        while i < len(self.lines) and i <= k:
-            n_block = self.parse_line(i)
-            if n_block.get_type() == _CMMT:
-                i = self.handle_block(n_block, switch_indent, in_switch=True)
-            else:
-                i = self.handle_block(n_block, indent_amt+self.indent_amt, in_switch=True)
+        # Check the statements for this case
+        self.visit_children(block)
 
-        keyword = None
         if block.uses_curly:
             keyword = self.handle_end_block(block, indent_amt)
             if keyword:
-                print('Line %d: Next case statement should be on the next line'\
-                            % (lines[-1]+1))
-                print(self.lines[lines[-1]])
-
-        return lines[-1] if keyword else lines[-1] + 1
+                self.collector.report('case-placement', lines[-1]+1,
+                                      'Next case statement should be on the next line',
+                                      context=[self.lines[lines[-1]]])
 
     # Anything with conditions (while, for, if, else if, switch)
     # indent_amt passed in is the indent amount of the code within
     # the condition statements, not the first line itself
     def handle_cond(self, block, indent_amt):
         lines = block.lines
-        is_switch = block.keyword == "switch"
 
         # Check if condition contains magic number
         self.check_magic([_ for _ in range(lines[0], block.end_cond[0]+1)])
 
-        if self.strict:
+        if self.check_spacing:
             self.handle_cond_strict(block, indent_amt)
 
-        ret = self.handle_terminator(block, indent_amt)
-        if ret:
-            return ret
-
-        i = block.term_loc[0] + 1
-        while i < len(self.lines) and i < lines[-1]:
-            n_block = self.parse_line(i)
-            n_indent_amt = indent_amt if is_switch else indent_amt+self.indent_amt
-            i = self.handle_block(n_block, n_indent_amt, in_switch=is_switch)
+        if self.handle_terminator(block, indent_amt):
+            return
 
-        keyword = self.handle_end_block(block, indent_amt)
-        return lines[-1] if keyword else lines[-1] + 1
+        self.visit_children(block)
+        self.handle_end_block(block, indent_amt)
 
     def handle_cond_strict(self, block, indent_amt):
         # 1: Condition must start 1 space in from the keyword
         loc1 = (block.start[0], block.start[1]+len(block.keyword)-1)
         loc2 = block.start_cond
-        if not self.within_one_space(loc1, loc2):
+        if 'condition-spacing' in self.rules and not self.within_one_space(loc1, loc2):
             line = self.lines[loc1[0]]
-            print('Line %d: %s and (condition) must be separated with a space'
-                  % (block.start_cond[0]+1, block.keyword))
-            print(line)
-            print(self.generate_guide(line, [loc1[1], loc2[1]]))
+            self.collector.report('condition-spacing', block.start_cond[0]+1,
+                                  '%s and (condition) must be separated with a space'
+                                  % block.keyword, column=loc2[1]+1,
+                                  context=[line, self.generate_guide(line, [loc1[1], loc2[1]])])
 
         if block.uses_curly:
-            self.handle_curly_brace_spacing(block)
-        else:
+            if 'curly-spacing' in self.rules:
+                self.handle_curly_brace_spacing(block)
+        elif 'curly-braces' in self.rules:
             # 2: Should use curly braces for if/else/etc...
-            print('Line %d: %s should use curly braces'
-                  % (block.start[0]+1, block.keyword))
-            print(self.lines[block.start[0]])
+            self.collector.report('curly-braces', block.start[0]+1,
+                                  '%s should use curly braces' % block.keyword,
+                                  context=[self.lines[block.start[0]]])
 
         # 3: Check for else if that the right curly brace of the previous
         #    if/else if is on the same line and within one space
-        if block.keyword == "else if" and block.prev_rcurly is not None:
+        if block.keyword == "else if" and block.prev_rcurly is not None and\
+                'else-spacing' in self.rules:
             self.handle_if_else_spacing(block)
 
     def handle_uncond(self, block, indent_amt):
-        lines = block.lines
-
-        if self.strict:
+        if self.check_spacing:
             self.handle_uncond_strict(block, indent_amt)
 
-        ret = self.handle_terminator(block, indent_amt)
-        if ret:     # Will only be true if terminator != {
-            return ret
-
-        i = block.term_loc[0] + 1
-        while i < len(self.lines) and i < lines[-1]:
-            n_block = self.parse_line(i)
-            i = self.handle_block(n_block, indent_amt+self.indent_amt)
+        # Will only be true if terminator != {
+        if self.handle_terminator(block, indent_amt):
+            return
 
+        self.visit_children(block)
         keyword = self.handle_end_block(block, indent_amt)
         if keyword == "do":
             # If it is do while, check the while condition for magic
             # number
             self.check_magic([block.do_while_loc[0]])
 
-        return lines[-1] if keyword else lines[-1] + 1
-
     def handle_uncond_strict(self, block, indent_amt):
         if block.uses_curly:
-            self.handle_curly_brace_spacing(block)
-        elif block.keyword == "else":
-            print('Line %d: %s should use curly braces'
-                  % (block.start[0]+1, block.keyword))
-            print(self.lines[block.start[0]])
-
-        if block.keyword == "else" and block.prev_rcurly is not None:
+            if 'curly-spacing' in self.rules:
+                self.handle_curly_brace_spacing(block)
+        elif block.keyword == "else" and 'curly-braces' in self.rules:
+            self.collector.report('curly-braces', block.start[0]+1,
+                                  '%s should use curly braces' % block.keyword,
+                                  context=[self.lines[block.start[0]]])
+
+        if block.keyword == "else" and block.prev_rcurly is not None and\
+                'else-spacing' in self.rules:
             self.handle_if_else_spacing(block)
 
     def handle_func(self, block, indent_amt):
@@ -1314,13 +1908,8 @@ class CStyleChecker(object):
             check_lines = [_ for _ in range(lines[0], term_line+1)]
             self.check_indentation(check_lines, indent_amt)
 
-        i = term_line + 1
-        while i < len(self.lines) and i < lines[-1]:
-            n_block = self.parse_line(i)
-            i = self.handle_block(n_block, indent_amt+self.indent_amt)
-
+        self.visit_children(block)
         self.check_indentation([lines[-1]], indent_amt)
-        return lines[-1] + 1
 
     def handle_statement(self, block, indent_amt, check_magic=True):
         lines = block.lines
@@ -1332,7 +1921,6 @@ class CStyleChecker(object):
         after = self.lines[block.end[0]][block.end[1]+1:]
         term = self.lines[block.end[0]][block.end[1]]
         self.handle_trailing_string(after, block.end[0], term)
-        return lines[-1] + 1
 
     def handle_structure(self, block, indent_amt, check_magic):
         lines = block.lines
@@ -1342,27 +1930,21 @@ class CStyleChecker(object):
         if len(lines) == 1:
             if check_magic:
                 self.check_magic(lines)
-            return lines[-1] + 1
+            return
 
         term_line, term_ind = self.find_statement_terminator(lines[0], 0)
         # Check trailing after left curly brace
         after = self.lines[term_line][term_ind+1:]
         self.handle_trailing_string(after, lines[0], LEFT_CURLY)
 
-        i = term_line + 1
-        while i < len(self.lines) and i < lines[-1]:
-            n_block = self.parse_line(i)
-            i = self.handle_block(n_block, indent_amt+self.indent_amt,
-                                  check_magic=check_magic)
-
+        self.visit_children(block)
         self.handle_end_block(block, indent_amt)
-        return lines[-1] + 1
 
     def handle_whitespace(self, block):
         lines = block.lines
         # If check whitespace is enabled, then check for excess
         # whitespace
-        if self.check_ws:
+        if 'empty-line-whitespace' in self.rules:
             indent_error = False
             for line_n in lines:
                 line = self.lines[line_n]
@@ -1370,36 +1952,68 @@ class CStyleChecker(object):
                     indent_error = True
 
             if indent_error:
+                # Replace white space with caret so user could see the spaces
+                ls = [self.lines[l].replace(SPACE_CHAR,
+                    SPACE_REPLACEMENT_CHAR) for l in lines]
+                context = ['Note: White space replaced with ^'] + ls
                 if len(lines) == 1:
-                    print('Line %d: Extra whitespace on empty line' % (lines[0]+1))
-                    print('Note: White space replaced with ^')
-                    print(self.lines[lines[0]].replace(
-                        SPACE_CHAR, SPACE_REPLACEMENT_CHAR)
-                    )
+                    self.collector.report('empty-line-whitespace', lines[0]+1,
+                                          'Extra whitespace on empty line', context=context)
                 else:
-                    print('Line %d to %d: Extra whitespace on empty lines' % (lines[0]+1, lines[-1]+1))
-                    # Replace white space with caret so user could see the spaces
-                    ls = [self.lines[l].replace(SPACE_CHAR,
-                        SPACE_REPLACEMENT_CHAR) for l in lines]
-                    print('Note: White space replaced with ^')
-                    for l in ls:
-                        print(l)
+                    self.collector.report('empty-line-whitespace', lines[0]+1,
+                                          'Extra whitespace on empty lines',
+                                          end_line=lines[-1]+1, context=context)
 
         if len(lines) > NEWLINES_LIMIT:
             beg, end = lines[0]+1, lines[-1]+1
-            print('Line %d to %d: Excess newlines. More than the newline limit (%d)'\
-                % (beg, end, NEWLINES_LIMIT))
-
-        return lines[-1] + 1
+            self.collector.report('excess-newlines', beg,
+                                  'Excess newlines. More than the newline limit (%d)'
+                                  % NEWLINES_LIMIT, end_line=end)
 
+    # The lines over the limit are found by preprocess
     def check_line_limit(self):
-        for i, l in enumerate(self.lines):
-            if len(l) > LINE_LIMIT:
-                print('Line %d: Over %d characters' % (i+1, LINE_LIMIT))
-                print(l)
+        if 'line-length' not in self.rules:
+            return
+        for i in self.long_lines:
+            if self.changed is not None and i not in self.changed:
+                continue
+            self.collector.report('line-length', i+1, 'Over %d characters' % LINE_LIMIT,
+                                  column=LINE_LIMIT+1, context=[self.lines[i]])
 
     def run(self):
-        print('')
+        # Parse phase
+        start = time.time()
+        # With jobs, the blocks nested in the top level ones are parsed along
+        # with checking them, see check_parallel. With changed lines, only
+        # the ones that hold them are, see changed_blocks
+        parallel = self.jobs > 1 and self.changed is None and self.profiler is None and\
+            self.counters is None
+        top_level = parallel or self.changed is not None
+        if top_level:
+            try:
+                self.build_tree(nested=False)
+            except Exception:
+                # Parse everything to raise what a single process would
+                parallel = top_level = False
+                self.block_cache = {}
+        if not top_level:
+            self.build_tree()
+        self.timings['parse'] = time.time() - start
+
+        # Check phase
+        start = time.time()
+        if 'magic-number' in self.rules:
+            # Before the pool is forked, so it is only done once
+            if self.changed is None:
+                self.magic_lines = self.scan_magic(range(len(self.lines)))
+            else:
+                self.magic_lines = self.scan_magic([n for n in sorted(self.changed)
+                                                    if n < len(self.lines)])
+        checked = self.check_parallel() if parallel else {}
+        selected = None
+        if self.changed is not None:
+            selected = self.changed_blocks(parse=top_level)
+        self.collector.text('')
         self.check_line_limit()
 
         file_header = []
@@ -1407,16 +2021,18 @@ class CStyleChecker(object):
         # Collect function headers
         func_headers = []
 
-        i = 0
         # The way to keep track of function header is to check the type
         # If the type is a block comment, record that. Then when a function
         # type follows, it is most likely the function header
         prev_type = None
         prev_group = None
-        while i < len(self.lines):
-            block = self.parse_line(i)
+        for i, block in enumerate(self.tree):
             group, t = block.lines, block.get_type()
-            i = self.handle_block(block, 0, check_magic=False)
+            if selected is None:
+                self.visit_top_level(block, checked.get(i))
+            else:
+                for changed_block in selected.get(i, []):
+                    self.visit(changed_block)
 
             # Collect headers
             if t == _BLOCK_CMMT:
@@ -1426,7 +2042,7 @@ class CStyleChecker(object):
                 # Is a function header
                 term_line, term_ind = self.find_statement_terminator(group[0], 0, term=LEFT_CURLY)
                 # Join the function header lines with the function declaration
-                new_group = prev_group + [_ for _ in range(group[0], term_line+1)]
+                new_group = list(prev_group) + [_ for _ in range(group[0], term_line+1)]
                 func_headers.append(new_group)
 
                 # Clear memory of seeing a comment block
@@ -1447,49 +2063,167 @@ class CStyleChecker(object):
             # Print the file header first, which is the first block of comment
             if len(self.block_cmmts) != 0:
                 if len(file_header) != 0:
-                    print('\nFile header:')
+                    self.collector.text('\nFile header:')
                     self.print_lines(file_header, print_n=True)
                 else:
-                    print('\nThere is no file header')
+                    self.collector.text('\nThere is no file header')
 
                 # Print function headers
                 if len(func_headers) != 0:
-                    print('\nFunction headers:')
+                    self.collector.text('\nFunction headers:')
                     for lines in func_headers:
                         self.print_lines(lines, print_n=True)
-                        print('')
+                        self.collector.text('')
                 else:
-                    print('\nThere are no function headers')
+                    self.collector.text('\nThere are no function headers')
             else:
-                print('\nNo file/function headers')
+                self.collector.text('\nNo file/function headers')
+
+        self.collector.text('')
+        self.timings['check'] = time.time() - start
+
+        if self.profiler is not None:
+            for line in self.profiler.report():
+                self.collector.text(line)
+            self.collector.text('')
+        if self.counters is not None:
+            for line in self.counters.report():
+                self.collector.text(line)
+            self.collector.text('')
+        return self.collector
+
+    # Count the calls of the primitives that look at the lines and the
+    # characters they look at, see profiler.py. The ones that only look up
+    # a mask or the partner of a term count one per call
+    def count_primitives(self):
+        self.counters = Counters()
+        self.stats = self.counters.stats
+        one = lambda result, *args, **kwargs: 1
+        for name in ('valid_string', 'within_quotes', 'within_comment', 'match_terms'):
+            self.counters.wrap(self, name, one)
+        self.counters.wrap(self, 'scan_magic', lambda result, lines:
+                           sum([len(self.lines[n]) for n in lines]))
+        self.counters.wrap(self, 'find_statement_terminator', self.count_terminator)
+        self.counters.wrap(self, 'rfind_statement_terminator', self.count_rterminator)
+        self.code_regexp = [self.counters.pattern('code_regexp: ' + name, ptrn)
+                            for name, ptrn in zip(CODE_PATTERN_NAMES, code_regexp)]
+
+    # Number of characters from location start up to location end (exclusive)
+    def chars_between(self, start, end):
+        if start[0] == end[0]:
+            return end[1] - start[1]
+        total = len(self.lines[start[0]]) - start[1] + end[1]
+        for line_n in range(start[0]+1, end[0]):
+            total += len(self.lines[line_n])
+        return total
+
+    # The characters from the start of the search up to the terminator, or
+    # the end of the file if there is none
+    def count_terminator(self, result, n, start, *args, **kwargs):
+        l, j = result
+        if l == -1:
+            l, j = len(self.lines) - 1, len(self.lines[-1]) - 1
+        return self.chars_between((n, start), (l, j+1))
+
+    # Lines are searched from their start going up, so the characters from
+    # the start of the line of the terminator up to the start of the search
+    def count_rterminator(self, result, n, start, *args, **kwargs):
+        l, j = result
+        if l == -1:
+            return self.chars_between((0, 0), (n, start+1))
+        if l == n:
+            return j + 1
+        return self.chars_between((l+1, 0), (n, start+1)) + j + 1
+
+# The checker whose top level blocks are being checked by the processes of
+# CStyleChecker.check_parallel. They are forked once it is set, so each has
+# its own copy of it
+parallel_checker = None
+
+
+# Parse and check the top level blocks of parallel_checker at the indices in
+# chunk. Returns the entries of each block as dicts. A block that raises ends
+# the chunk, and it and the blocks after it are parsed and checked again by
+# the checker itself, which raises what a single process would have
+def check_top_level(chunk):
+    checker = parallel_checker
+    results = []
+    for i in chunk:
+        block = checker.tree[i]
+        checker.collector = Collector(checker.rules)
+        try:
+            checker.parse_children(block)
+            checker.visit(block)
+        except Exception:
+            break
+        results.append(checker.collector.to_list())
+    return results
+
+
+# Check C source held in memory, see CStyleChecker for the options.
+# Returns the list of diagnostics found. Raises ParseError if the source
+# cannot be parsed
+def check_source(source, filename='<source>', **options):
+    return CStyleChecker(filename, source=source, **options).run().diagnostics()
 
-        print('')
 
 def usage():
     print(
-        ("Usage: python %s -f <C filename> [-h] [-i <indent amount>] [-w] [-p] [-s]\n" % sys.argv[0]) +
+        ("Usage: python %s -f <C filename> [-h] [-i <indent amount>] [-w] [-p] [-s] "
+         "[-j <jobs>] [files/directories/globs...]\n" % sys.argv[0]) +
         "\t-h/--help: Show help message\n" +
-        "\t-f/--file: Filename to style check (required argument)\n" +
+        "\t-f/--file: Filename to style check (can be passed more than once)\n" +
         "\t-i/--indent: Indentation amount\n" +
         "\t-w/--whitespace-check: Use excess white space check\n" +
         "\t-p/--print-headers: If passed, program will print the file/function headers\n" +
-        "\t-s/--strict-check: If passed, programm will check style in strict mode\n"
+        "\t-s/--strict-check: If passed, programm will check style in strict mode\n" +
+        "\t-j/--jobs: Number of processes used to check the files, or the top level\n" +
+        "\t           blocks of a single file\n" +
+        "\t--no-cache: Check every file even if the result is cached\n" +
+        "\t--cache-dir: Directory of the result cache (default: %s)\n" % cache.default_cache_dir() +
+        "\t--format: Output format, one of %s (default: text)\n" % ", ".join(sorted(REPORTERS)) +
+        "\t--profile: Print the time spent in each handler of the checker (not cached)\n" +
+        "\t--stats: Print how many times the hot primitives were called and the characters\n" +
+        "\t         they looked at (not cached)\n" +
+        "\t--enable: Comma separated rules to check (can be passed more than once)\n" +
+        "\t--disable: Comma separated rules not to check (can be passed more than once)\n" +
+        "\t--config: Config file with the rules to enable and disable\n" +
+        "\t--list-rules: List the rules and whether they are checked by default\n" +
+        "\t--diff: Unified diff, - reads stdin. Only the lines it adds or changes are\n" +
+        "\t        checked, in the files passed or else in every file of the diff.\n" +
+        "\t        A block that runs past the end of the block it is nested in, which\n" +
+        "\t        only happens in code the checker cannot make sense of, has its lines\n" +
+        "\t        checked twice by a full check but only once with --diff\n" +
+        "\tDirectories are searched recursively for %s files\n" % "/".join(C_EXTENSIONS)
     )
 
-if __name__ == '__main__':
-    opts, args = getopt.getopt(sys.argv[1:], "hf:i:wps", ["help", "file=",
-        "indent=", "whitespace-check", "print-headers", "strict-check"])
-    file = None
+# Run the command line with the arguments in argv, without the program name
+def main(argv):
+    opts, args = getopt.getopt(argv, "hf:i:wpsj:", ["help", "file=",
+        "indent=", "whitespace-check", "print-headers", "strict-check", "jobs=",
+        "no-cache", "cache-dir=", "format=", "profile", "stats", "enable=", "disable=",
+        "config=", "list-rules", "diff="])
+    files = []
     indent = None
     check_whitespace = False
     print_headers = False
     strict = False
+    jobs = 1
+    cache_dir = cache.default_cache_dir()
+    output_format = 'text'
+    profile = False
+    stats = False
+    enable = []
+    disable = []
+    config = None
+    list_rules = False
+    diff = None
     for o, a in opts:
         if o in ("--help", "-h"):
             usage()
             sys.exit(0)
         elif o in ("--file", "-f"):
-            file = a
+            files.append(a)
         elif o in ("--indent", "-i"):
             try:
                 indent = int(a)
@@ -1502,15 +2236,86 @@ if __name__ == '__main__':
             print_headers = True
         elif o in ("--strict-check", "-s"):
             strict = True
+        elif o in ("--jobs", "-j"):
+            try:
+                jobs = int(a)
+            except ValueError:
+                print('Jobs must be able to convert to an integer')
+                sys.exit(1)
+        elif o == "--no-cache":
+            cache_dir = None
+        elif o == "--cache-dir":
+            cache_dir = a
+        elif o == "--format":
+            if a not in REPORTERS:
+                print('Format must be one of %s' % ", ".join(sorted(REPORTERS)))
+                sys.exit(1)
+            output_format = a
+        elif o == "--profile":
+            profile = True
+        elif o == "--stats":
+            stats = True
+        elif o == "--enable":
+            enable.extend(rules.parse_list(a))
+        elif o == "--disable":
+            disable.extend(rules.parse_list(a))
+        elif o == "--config":
+            config = a
+        elif o == "--list-rules":
+            list_rules = True
+        elif o == "--diff":
+            diff = a
         else:
             usage()
             sys.exit(1)
 
-    if file is None:
-        usage()
+    if list_rules:
+        for line in rules.describe(RULES, default_rules(strict, check_whitespace)):
+            print(line)
+        sys.exit(0)
+
+    # Unknown rules are reported before any file is checked
+    try:
+        if config is not None:
+            enable, disable = rules.merge(rules.load_config(config, 'cstyle', RULES), enable, disable)
+        rules.select(RULES, RULES, enable, disable)
+    except ValueError as e:
+        print(str(e))
+        sys.exit(1)
+
+    changes = None
+    if diff is not None:
+        try:
+            changes = diffs.read_changes(diff)
+        except StyleCheckError as e:
+            print('%s: %s' % (e.message, diff))
+            sys.exit(1)
+        if len(files + args) != 0:
+            files = runner.collect_files(files + args, C_EXTENSIONS)
+        else:
+            files = diffs.changed_files(changes, C_EXTENSIONS)
+        # Files the diff does not change have nothing to check
+        changes = diffs.file_changes(changes, files)
+        files = [filename for filename in files if filename in changes]
+    else:
+        files = runner.collect_files(files + args, C_EXTENSIONS)
+        if len(files) == 0:
+            usage()
+            sys.exit(1)
+
+    options = dict(check_whitespace=check_whitespace, print_headers=print_headers,
+                   strict=strict, indent_amt=indent)
+    if enable or disable:
+        options.update(enable=tuple(enable), disable=tuple(disable))
+    if profile or stats:
+        # Cached results would not be checked, so there would be nothing to
+        # time or count
+        options.update(profile=profile, stats=stats)
+        cache_dir = None
+    if not runner.run_files(CStyleChecker, files, options, jobs=jobs, cache_dir=cache_dir,
+                            reporter=REPORTERS[output_format]('cstyle'), changes=changes):
         sys.exit(1)
 
-    stl = CStyleChecker(file, check_whitespace=check_whitespace,
-                        print_headers=print_headers, strict=strict, indent_amt=indent)
 
-    stl.run()
+if __name__ == '__main__':
+    main(sys.argv[1:])
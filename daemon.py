@@ -0,0 +1,185 @@
+'''
+    Filename: daemon.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import os
+import sys
+import getopt
+import socket
+import traceback
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+import cache
+import client
+import runner
+import cstyle
+import sstyle
+
+CHECKERS = {
+    'cstyle': cstyle.main,
+    'sstyle': sstyle.main,
+}
+DEFAULT_MAX_RESULTS = 1024
+BACKLOG = 16
+
+
+# Run a checker the same way its command line would and capture what it
+# writes. Returns the response sent back to the client
+def run_request(request):
+    main = CHECKERS[request['checker']]
+    out = StringIO()
+    err = StringIO()
+    status = 0
+
+    saved_cwd = os.getcwd()
+    saved_env = dict([(name, os.environ.get(name)) for name in request['env']])
+    saved_argv = sys.argv
+    saved_stdout, saved_stderr = sys.stdout, sys.stderr
+    try:
+        os.chdir(request['cwd'])
+        set_env(request['env'])
+        sys.argv = [request['prog']] + request['argv']
+        sys.stdout, sys.stderr = out, err
+        main(request['argv'])
+    except SystemExit as e:
+        if e.code is None:
+            status = 0
+        elif isinstance(e.code, int):
+            status = e.code
+        else:
+            err.write('%s\n' % e.code)
+            status = 1
+    except Exception:
+        err.write(traceback.format_exc())
+        status = 1
+    finally:
+        sys.stdout, sys.stderr = saved_stdout, saved_stderr
+        sys.argv = saved_argv
+        set_env(saved_env)
+        os.chdir(saved_cwd)
+
+    return {'output': out.getvalue(), 'errors': err.getvalue(), 'status': status}
+
+
+def set_env(env):
+    for name, value in env.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+
+# Returns a socket listening on path or None if another daemon already is
+def listen(path):
+    if os.path.exists(path):
+        sock = client.connect(path)
+        if sock is not None:
+            sock.close()
+            return None
+        # Left behind by a daemon that did not stop cleanly
+        os.remove(path)
+
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # Only the user running the daemon can connect to it
+    umask = os.umask(0o077)
+    try:
+        sock.bind(path)
+    finally:
+        os.umask(umask)
+    sock.listen(BACKLOG)
+    return sock
+
+
+# Answer requests one at a time until asked to stop.
+# Returns False if another daemon is already listening on path
+def serve(path, max_results=DEFAULT_MAX_RESULTS):
+    sock = listen(path)
+    if sock is None:
+        return False
+
+    runner.memory = cache.MemoryCache(max_results)
+    try:
+        stop = False
+        while not stop:
+            conn, _ = sock.accept()
+            try:
+                request = client.recv_message(conn)
+                if request.get('command') == 'stop':
+                    stop = True
+                    response = {'output': '', 'errors': '', 'status': 0}
+                else:
+                    response = run_request(request)
+                client.send_message(conn, response)
+            except (socket.error, ValueError, KeyError):
+                # Client went away or sent something that is not a request
+                pass
+            finally:
+                conn.close()
+    finally:
+        sock.close()
+        os.remove(path)
+    return True
+
+
+def usage():
+    print(
+        "Usage: python %s [-h] [--socket <path>] [--max-results <count>] [--stop]\n" % sys.argv[0] +
+        "\t-h/--help: Show help message\n" +
+        "\t--socket: Path of the socket to listen on (default: %s)\n" % client.default_socket_path() +
+        "\t--max-results: Number of results of recently checked files kept in memory\n" +
+        "\t--stop: Stop the daemon listening on the socket\n"
+    )
+
+
+def main(argv):
+    try:
+        opts, args = getopt.getopt(argv, "h", ["help", "socket=", "max-results=", "stop"])
+    except getopt.GetoptError:
+        usage()
+        sys.exit(2)
+
+    path = client.default_socket_path()
+    max_results = DEFAULT_MAX_RESULTS
+    stop = False
+    for opt, arg in opts:
+        if opt in ('-h', '--help'):
+            usage()
+            sys.exit()
+        elif opt == '--socket':
+            path = arg
+        elif opt == '--max-results':
+            try:
+                max_results = int(arg)
+            except ValueError:
+                max_results = 0
+            if max_results < 1:
+                print("Invalid number of results %s" % arg)
+                sys.exit(2)
+        elif opt == '--stop':
+            stop = True
+
+    if stop:
+        if client.request({'command': 'stop'}, path, start=False) is None:
+            print("No daemon is listening on %s" % path)
+            sys.exit(1)
+        sys.exit()
+
+    if not serve(path, max_results):
+        print("A daemon is already listening on %s" % path)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,243 @@
+'''
+    Filename: diagnostics.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import sys
+import json
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+SARIF_VERSION = '2.1.0'
+
+
+# A single style issue. line and end_line are the 1 based lines it covers,
+# column is 1 based or None when the issue is about the whole line. context
+# is the lines shown under the message, usually the offending source lines.
+# Issues that are about many separate lines have no line and list them in
+# lines instead
+class Diagnostic(object):
+    def __init__(self, rule, line, message, column=None, end_line=None,
+                 context=None, lines=None):
+        self.rule = rule
+        self.line = line
+        self.message = message
+        self.column = column
+        self.end_line = end_line
+        self.context = [] if context is None else context
+        self.lines = lines
+
+    # The first line of the text format
+    def header(self):
+        if self.line is None:
+            return self.message
+        elif self.end_line is None:
+            return 'Line %d: %s' % (self.line, self.message)
+        return 'Line %d to %d: %s' % (self.line, self.end_line, self.message)
+
+    # Same diagnostic moved down by delta lines
+    def shifted(self, delta):
+        return Diagnostic(self.rule,
+                          None if self.line is None else self.line + delta,
+                          self.message, self.column,
+                          None if self.end_line is None else self.end_line + delta,
+                          self.context,
+                          None if self.lines is None else [n + delta for n in self.lines])
+
+    # Whether the diagnostic is on any of lines, a set of 1 based line numbers.
+    # Diagnostics about the whole file are on all of them
+    def touches(self, lines):
+        if self.lines is not None:
+            return any([n in lines for n in self.lines])
+        elif self.line is None:
+            return True
+        end_line = self.line if self.end_line is None else self.end_line
+        return any([n in lines for n in range(self.line, end_line+1)])
+
+    def to_dict(self):
+        return {
+            'rule': self.rule, 'line': self.line, 'message': self.message,
+            'column': self.column, 'end_line': self.end_line,
+            'context': self.context, 'lines': self.lines
+        }
+
+
+# Everything a checker reports for a file, in the order it is reported.
+# Entries are either diagnostics or plain lines of text such as the printed
+# headers, which only the text format shows
+class Collector(object):
+    # Only the rules in rules are reported if it is not None. The checkers
+    # skip the work of the rules that are not, this only makes sure of it.
+    # If lines is not None, only diagnostics on one of those 1 based lines
+    # are reported
+    def __init__(self, rules=None, lines=None):
+        self.entries = []
+        self.rules = rules
+        self.lines = lines
+
+    def report(self, rule, line, message, column=None, end_line=None,
+               context=None, lines=None):
+        if self.rules is not None and rule not in self.rules:
+            return
+        diagnostic = Diagnostic(rule, line, message, column, end_line, context, lines)
+        if self.lines is not None and not diagnostic.touches(self.lines):
+            return
+        self.entries.append(diagnostic)
+
+    def text(self, text):
+        self.entries.append(text)
+
+    def diagnostics(self):
+        return [e for e in self.entries if isinstance(e, Diagnostic)]
+
+    def to_list(self):
+        return [to_entry_dict(e) for e in self.entries]
+
+
+# Entries are turned into dicts to be cached or sent between processes
+def to_entry_dict(entry):
+    if isinstance(entry, Diagnostic):
+        return entry.to_dict()
+    return {'text': entry}
+
+
+def from_entry_dict(d):
+    if 'text' in d:
+        return d['text']
+    return Diagnostic(d['rule'], d['line'], d['message'], d['column'],
+                      d['end_line'], d['context'], d['lines'])
+
+
+# Reporters write the entries of every file checked. Each file is written
+# with a single write
+class Reporter(object):
+    def __init__(self, tool, out=None):
+        self.tool = tool
+        self.out = out
+
+    def write(self, data):
+        out = sys.stdout if self.out is None else self.out
+        out.write(data)
+        out.flush()
+
+    # named is True when more than one file is checked. reason is None if the
+    # file was checked, or why it could not be as a dict of the message and
+    # the 1 based line it was given up on (or None)
+    def write_file(self, filename, entries, named, reason=None):
+        pass
+
+    # Called once every file is written with the totals of the run
+    def finish(self, files, lines, seconds, issues, failed):
+        pass
+
+
+# The format the checkers always printed
+class TextReporter(Reporter):
+    # Why a file could not be checked is already in its entries
+    def write_file(self, filename, entries, named, reason=None):
+        parts = []
+        if named:
+            parts.append('Checking %s' % filename)
+        for entry in entries:
+            if isinstance(entry, Diagnostic):
+                parts.append(entry.header())
+                parts.extend(entry.context)
+            else:
+                parts.append(entry)
+        if len(parts) != 0:
+            self.write('\n'.join(parts) + '\n')
+
+    def finish(self, files, lines, seconds, issues, failed):
+        if files > 1:
+            self.write('Checked %d files (%d lines) in %.2fs: %d issues, %d failed\n'
+                       % (files, lines, seconds, issues, failed))
+
+
+# One JSON object per diagnostic, and one with an error instead of a rule
+# for each file that could not be checked
+class JsonLinesReporter(Reporter):
+    def write_file(self, filename, entries, named, reason=None):
+        parts = []
+        for entry in entries:
+            if isinstance(entry, Diagnostic):
+                d = entry.to_dict()
+                d['file'] = filename
+                parts.append(json.dumps(d, sort_keys=True))
+        if reason is not None:
+            parts.append(json.dumps({'file': filename, 'error': reason['message'],
+                                     'line': reason['line']}, sort_keys=True))
+        if len(parts) != 0:
+            self.write('\n'.join(parts) + '\n')
+
+
+# A single SARIF log for the whole run, written once every file is checked.
+# Files that could not be checked are error notifications of the invocation
+class SarifReporter(Reporter):
+    def __init__(self, tool, out=None):
+        Reporter.__init__(self, tool, out)
+        self.results = []
+        self.rules = []
+        self.notifications = []
+
+    def write_file(self, filename, entries, named, reason=None):
+        if reason is not None:
+            location = {'artifactLocation': {'uri': filename}}
+            if reason['line'] is not None:
+                location['region'] = {'startLine': reason['line']}
+            self.notifications.append({
+                'level': 'error',
+                'message': {'text': reason['message']},
+                'locations': [{'physicalLocation': location}]
+            })
+        for entry in entries:
+            if not isinstance(entry, Diagnostic):
+                continue
+            if entry.rule not in self.rules:
+                self.rules.append(entry.rule)
+
+            lines = [entry.line] if entry.line is not None else (entry.lines or [])
+            locations = []
+            for line in lines:
+                region = {'startLine': line}
+                if entry.end_line is not None:
+                    region['endLine'] = entry.end_line
+                if entry.column is not None:
+                    region['startColumn'] = entry.column
+                locations.append({'physicalLocation': {
+                    'artifactLocation': {'uri': filename},
+                    'region': region
+                }})
+
+            self.results.append({
+                'ruleId': entry.rule,
+                'level': 'warning',
+                'message': {'text': entry.message},
+                'locations': locations
+            })
+
+    def finish(self, files, lines, seconds, issues, failed):
+        log = {
+            '$schema': SARIF_SCHEMA,
+            'version': SARIF_VERSION,
+            'runs': [{
+                'tool': {'driver': {
+                    'name': self.tool,
+                    'rules': [{'id': rule} for rule in self.rules]
+                }},
+                'invocations': [{
+                    'executionSuccessful': failed == 0,
+                    'toolExecutionNotifications': self.notifications
+                }],
+                'results': self.results
+            }]
+        }
+        self.write(json.dumps(log, indent=2, sort_keys=True) + '\n')
+
+
+REPORTERS = {
+    'text': TextReporter,
+    'jsonl': JsonLinesReporter,
+    'sarif': SarifReporter,
+}
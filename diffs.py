@@ -0,0 +1,112 @@
+'''
+    Filename: diffs.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import os
+import re
+
+from source import iter_lines
+
+# Side of the diff a file does not exist on
+DEV_NULL = '/dev/null'
+# Start of a hunk, with where it starts and how many lines it has on the old
+# and the new side. A count that is left out is 1
+HUNK_REGEXP = "@@ -([0-9]+)(?:,([0-9]+))? \+([0-9]+)(?:,([0-9]+))? @@"
+
+hunk_ptrn = re.compile(HUNK_REGEXP)
+
+
+# Path of a file from a --- or +++ line, without the timestamp diff puts
+# after a tab
+def header_path(line):
+    return line[4:].split('\t')[0].strip()
+
+
+# Returns the lines added or changed by a unified diff, as a dict of the path
+# of each file on the new side of it to the sorted 1 based numbers of those
+# lines. Lines that were only removed leave nothing behind to check, and
+# neither do deleted files. The a/ and b/ that git puts in front of paths
+# are removed. lines are the lines of the diff
+def changed_lines(lines):
+    changes = {}
+    old_path = None
+    path = None
+    # Lines of the current hunk left on each side, and the next new line
+    old_left = new_left = 0
+    n = 0
+    for line in lines:
+        if old_left > 0 or new_left > 0:
+            if line.startswith('+'):
+                if path is not None:
+                    changes[path].append(n)
+                n += 1
+                new_left -= 1
+            elif line.startswith('-'):
+                old_left -= 1
+            elif line.startswith('\\'):
+                # No newline at end of file
+                pass
+            else:
+                n += 1
+                old_left -= 1
+                new_left -= 1
+            continue
+
+        if line.startswith('--- '):
+            old_path = header_path(line)
+        elif line.startswith('+++ '):
+            path = header_path(line)
+            if path == DEV_NULL:
+                path = None
+            else:
+                if path.startswith('b/') and old_path is not None and\
+                        (old_path.startswith('a/') or old_path == DEV_NULL):
+                    path = path[2:]
+                path = normalize(path)
+                changes.setdefault(path, [])
+        else:
+            match = hunk_ptrn.match(line)
+            if match:
+                old_left = 1 if match.group(2) is None else int(match.group(2))
+                n = int(match.group(3))
+                new_left = 1 if match.group(4) is None else int(match.group(4))
+
+    for path in changes:
+        changes[path] = sorted(set(changes[path]))
+    return changes
+
+
+# Same as changed_lines, reading the diff from the file named filename, or
+# stdin if it is '-'.
+# Raises SourceError if the file cannot be read
+def read_changes(filename):
+    return changed_lines(iter_lines(filename))
+
+
+# Path relative to the current directory, so the paths of the files passed in
+# and the ones in a diff can be compared
+def normalize(path):
+    return os.path.normpath(os.path.relpath(os.path.abspath(path)))
+
+
+# The files of changes with one of the extensions that have lines to check
+# and still exist, in the order of their paths
+def changed_files(changes, extensions):
+    return [path for path in sorted(changes)
+            if os.path.splitext(path)[1] in extensions and len(changes[path]) != 0 and
+            os.path.isfile(path)]
+
+
+# The lines of changes to check in each of files, by the files as they are
+# named. Files with no lines to check are left out
+def file_changes(changes, files):
+    by_file = {}
+    for filename in files:
+        lines = changes.get(normalize(filename))
+        if lines:
+            by_file[filename] = lines
+    return by_file
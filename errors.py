@@ -0,0 +1,30 @@
+'''
+    Filename: errors.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+
+# Raised by the checkers when a source cannot be checked. context is the
+# lines shown above the message, such as the line the checker gave up on
+class StyleCheckError(Exception):
+    def __init__(self, message, filename=None, context=None):
+        Exception.__init__(self, message)
+        self.message = message
+        self.filename = filename
+        self.context = [] if context is None else context
+
+
+# The file could not be opened or read
+class SourceError(StyleCheckError):
+    pass
+
+
+# The source could not be parsed, usually because it does not compile.
+# line is the 1 based line the checker gave up on
+class ParseError(StyleCheckError):
+    def __init__(self, message, filename=None, context=None, line=None):
+        StyleCheckError.__init__(self, message, filename, context)
+        self.line = line
@@ -0,0 +1,100 @@
+'''
+    Filename: lexer.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import re
+
+DOUBLE_QUOTE = '\"'
+SINGLE_QUOTE = '\''
+START_BLOCK_COMMENT = '/*'
+END_BLOCK_COMMENT = '*/'
+
+# Classes a character can belong to. Every line gets a mask string that is
+# parallel to the line with one of these per character
+CODE = 'c'
+STRING = 's'
+CHAR = 'q'
+LINE_CMMT = 'l'
+BLOCK_CMMT = 'b'
+
+# Rest of a string or char literal, honoring escapes. If the literal is not
+# closed, it runs to the end of the line
+STRING_END_REGEXP = "(?:[^\"\\\\]|\\\\.)*(\"|\\\\?\\Z)"
+CHAR_END_REGEXP = "(?:[^\'\\\\]|\\\\.)*(\'|\\\\?\\Z)"
+
+string_end_ptrn = re.compile(STRING_END_REGEXP)
+char_end_ptrn = re.compile(CHAR_END_REGEXP)
+
+
+class Lexer(object):
+    def __init__(self, line_cmmts):
+        # Anything in code that changes the state of the lexer. Line comments
+        # come first so that // is not mistaken for something else
+        self.special_ptrn = re.compile(
+            "(%s)|(/\\*)|(\")|(\')" % "|".join([re.escape(c) for c in line_cmmts])
+        )
+
+    # Classify every character of every line as code, string, char literal,
+    # line comment or block comment.
+    # Returns the list of masks and the list of block comment spans where each
+    # span is ((start line, index of /*), (end line, index after */))
+    def scan(self, lines):
+        masks = []
+        block_cmmts = []
+        block_start = None
+        for n, line in enumerate(lines):
+            mask, block_start = self.scan_line(n, line, block_start, block_cmmts)
+            masks.append(mask)
+
+        return masks, block_cmmts
+
+    # Classify the characters of line n. block_start is where the block comment
+    # that is still open at the start of the line began, or None. The spans of
+    # block comments that end on the line are appended to block_cmmts.
+    # Returns the mask of the line and the block_start of the next line
+    def scan_line(self, n, line, block_start, block_cmmts):
+        parts = []
+        j = 0
+        length = len(line)
+        while j < length:
+            if block_start is not None:
+                # Inside a block comment, only */ matters
+                k = line.find(END_BLOCK_COMMENT, j)
+                if k == -1:
+                    parts.append(BLOCK_CMMT * (length - j))
+                    break
+                parts.append(BLOCK_CMMT * (k + 2 - j))
+                j = k + 2
+                block_cmmts.append((block_start, (n, j)))
+                block_start = None
+                continue
+
+            match = self.special_ptrn.search(line, j)
+            if match is None:
+                parts.append(CODE * (length - j))
+                break
+
+            k = match.start()
+            parts.append(CODE * (k - j))
+            if match.group(1):
+                # Line comment runs to the end of the line
+                parts.append(LINE_CMMT * (length - k))
+                break
+            elif match.group(2):
+                block_start = (n, k)
+                parts.append(BLOCK_CMMT * 2)
+                j = k + 2
+            else:
+                if match.group(3):
+                    end_ptrn, cls = string_end_ptrn, STRING
+                else:
+                    end_ptrn, cls = char_end_ptrn, CHAR
+                end = end_ptrn.match(line, k + 1).end()
+                parts.append(cls * (end - k))
+                j = end
+
+        return "".join(parts), block_start
@@ -0,0 +1,122 @@
+'''
+    Filename: profiler.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import time
+
+# perf_counter is only on Python 3
+clock = getattr(time, 'perf_counter', time.time)
+
+
+# Times the methods of a checker. Only the methods it is asked to wrap are
+# timed, by replacing them on the checker itself, so a checker that is not
+# profiled runs exactly as it would without this
+class Profiler(object):
+    def __init__(self):
+        self.start = clock()
+        # Calls, cumulative seconds and self seconds of each method by name
+        self.stats = {}
+        # Seconds spent in the methods called by each timed call on the stack
+        self.stack = []
+        # How many calls of each method are on the stack, so time spent in
+        # recursive calls only counts once in the cumulative time
+        self.depth = {}
+
+    # Time the methods named names of obj
+    def wrap(self, obj, names):
+        for name in names:
+            setattr(obj, name, self.timed(name, getattr(obj, name)))
+
+    def timed(self, name, method):
+        stats = self.stats.setdefault(name, [0, 0.0, 0.0])
+        self.depth[name] = 0
+        stack = self.stack
+        depth = self.depth
+
+        def timed_method(*args, **kwargs):
+            children = [0.0]
+            stack.append(children)
+            depth[name] += 1
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                stack.pop()
+                depth[name] -= 1
+                stats[0] += 1
+                stats[2] += elapsed - children[0]
+                if depth[name] == 0:
+                    stats[1] += elapsed
+                if stack:
+                    stack[-1][0] += elapsed
+
+        return timed_method
+
+    # Returns the lines of a table of the methods that were called, the ones
+    # that took the most time by themselves first
+    def report(self):
+        total = clock() - self.start
+        rows = [(name, s[0], s[1], s[2]) for name, s in self.stats.items() if s[0] > 0]
+        rows.sort(key=lambda row: (-row[3], row[0]))
+
+        lines = ['Profile (%.3f seconds):' % total,
+                 '%-28s %10s %14s %10s %7s' % ('Method', 'Calls', 'Cumulative (s)',
+                                               'Self (s)', 'Self %')]
+        for name, calls, cumulative, own in rows:
+            percent = 100.0 * own / total if total > 0 else 0.0
+            lines.append('%-28s %10d %14.4f %10.4f %6.1f%%' % (name, calls, cumulative,
+                                                              own, percent))
+        return lines
+
+
+# Counts the calls of the methods of a checker and the characters each call
+# looked at. Like Profiler, only the methods it is asked to count are
+# replaced, on the checker itself
+class Counters(object):
+    def __init__(self):
+        # Calls and characters of each method or pattern by name
+        self.stats = {}
+
+    # Count the calls of the method named name of obj. chars is called with
+    # what the method returned and its arguments and returns how many
+    # characters the call looked at
+    def wrap(self, obj, name, chars):
+        method = getattr(obj, name)
+        stats = self.stats.setdefault(name, {'calls': 0, 'chars': 0})
+
+        def counted_method(*args, **kwargs):
+            result = method(*args, **kwargs)
+            stats['calls'] += 1
+            stats['chars'] += chars(result, *args, **kwargs)
+            return result
+
+        setattr(obj, name, counted_method)
+
+    # Returns a stand in for the compiled pattern that counts its matches and
+    # the length of the strings they were tried on
+    def pattern(self, name, pattern):
+        return CountedPattern(pattern, self.stats.setdefault(name, {'calls': 0, 'chars': 0}))
+
+    # Returns the lines of a table of the counts, the most characters first
+    def report(self):
+        rows = sorted(self.stats.items(), key=lambda item: (-item[1]['chars'], item[0]))
+        lines = ['Stats:', '%-36s %10s %12s' % ('Primitive', 'Calls', 'Characters')]
+        for name, stats in rows:
+            lines.append('%-36s %10d %12d' % (name, stats['calls'], stats['chars']))
+        return lines
+
+
+class CountedPattern(object):
+    def __init__(self, pattern, stats):
+        self.pattern = pattern
+        self.stats = stats
+
+    def match(self, s, *args):
+        self.stats['calls'] += 1
+        self.stats['chars'] += len(s)
+        return self.pattern.match(s, *args)
@@ -0,0 +1,110 @@
+'''
+    Filename: rules.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import sys
+
+try:
+    from ConfigParser import RawConfigParser, Error as ConfigError
+except ImportError:
+    from configparser import RawConfigParser, Error as ConfigError
+
+# What every rule the checkers report is about, by the rule id. Each checker
+# lists the ones it reports in its RULES
+DESCRIPTIONS = {
+    'case-placement': 'Next case on the same line as the } of a case',
+    'comment-spacing': 'Comments that do not start with // and a space',
+    'commented-out-code': 'Comments that look like code',
+    'condition-spacing': 'Keywords not separated from their condition by a space',
+    'curly-braces': 'if/else/for/while without curly braces',
+    'curly-spacing': 'Curly braces not on the line of the condition and a space after it',
+    'else-spacing': 'else not on the line of the } before it and a space after it',
+    'empty-line-whitespace': 'White space on empty lines',
+    'excess-newlines': 'More empty lines in a row than the limit',
+    'indentation': 'Lines that are not indented as expected',
+    'leading-statement': 'Statements in front of a }',
+    'line-length': 'Lines over 80 characters',
+    'magic-number': 'Numbers and characters other than 0, 1 and -1 in code',
+    'space-indent': 'Assembly indented with spaces',
+    'tab-indent': 'C indented with tabs',
+    'todo-comment': 'Left in TODO comments',
+    'trailing-statement': 'Statements behind a terminator or label',
+    'trailing-whitespace': 'White space behind a statement',
+}
+
+
+# Rules named in a comma separated list
+def parse_list(text):
+    return [rule.strip() for rule in text.split(',') if len(rule.strip()) != 0]
+
+
+# Returns the rules of known that are checked, as a frozenset: default with
+# enable added and then disable removed. Raises ValueError for a rule that is
+# not in known
+def select(known, default, enable=(), disable=()):
+    for rule in list(enable) + list(disable):
+        if rule not in known:
+            raise ValueError('Unknown rule %s' % rule)
+    return frozenset([rule for rule in known
+                      if (rule in default or rule in enable) and rule not in disable])
+
+
+# Read the rules enabled and disabled in the config file at path for tool,
+# whose rules are known. The [rules] section applies to every checker and the
+# section named after the tool to it alone, each with comma separated enable
+# and disable lists:
+#
+#     [rules]
+#     disable = magic-number, space-indent
+#
+#     [cstyle]
+#     disable = commented-out-code
+#
+# The rules of [rules] that tool does not report are left out, so one file
+# can name the rules of both checkers. The ones no checker reports are left
+# out with a warning on stderr. Returns a tuple of (enable, disable). Raises
+# ValueError if the file cannot be read
+def load_config(path, tool, known):
+    parser = RawConfigParser()
+    try:
+        if len(parser.read([path])) == 0:
+            raise ValueError('Cannot read config file %s' % path)
+    except ConfigError as e:
+        raise ValueError('Cannot parse config file %s: %s' % (path, e))
+
+    enable = []
+    disable = []
+    for section in ('rules', tool):
+        for option, selected in (('enable', enable), ('disable', disable)):
+            if not parser.has_option(section, option):
+                continue
+            for rule in parse_list(parser.get(section, option)):
+                if section != 'rules' or rule in known:
+                    selected.append(rule)
+                elif rule not in DESCRIPTIONS:
+                    sys.stderr.write('Unknown rule %s in [rules] of %s\n' % (rule, path))
+    return enable, disable
+
+
+# Rules enabled and disabled by the config file overridden by the ones passed
+# on the command line. A rule that is both enabled and disabled on the command
+# line is disabled. Returns a tuple of (enable, disable) as tuples
+def merge(config, enable, disable):
+    config_enable, config_disable = config
+    merged_enable = [r for r in config_enable if r not in disable] + list(enable)
+    merged_disable = [r for r in config_disable if r not in merged_enable] + list(disable)
+    return tuple(merged_enable), tuple(merged_disable)
+
+
+# Lines listing the rules of known, whether each is checked by default and
+# what it is about
+def describe(known, default):
+    lines = []
+    for rule in sorted(known):
+        lines.append('%-22s %-4s %s' % (rule, 'on' if rule in default else 'off',
+                                        DESCRIPTIONS.get(rule, '')))
+    return lines
@@ -0,0 +1,275 @@
+'''
+    Filename: runner.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import os
+import sys
+import glob
+import time
+import traceback
+import multiprocessing
+from multiprocessing import Pool
+
+from cache import ResultCache
+from diagnostics import Diagnostic, TextReporter, from_entry_dict
+from errors import StyleCheckError
+
+GLOB_CHARS = "*?["
+
+# Result caches opened by this process keyed by directory
+result_caches = {}
+# Results of recently checked files kept in memory by the daemon, keyed by
+# path, modification time, size, checker and options. None when not running
+# as the daemon. It is skipped along with the result cache by --no-cache and
+# worker processes of a pool only read their copy of it
+memory = None
+
+
+# Expand the passed in files, directories and globs into a list of files.
+# Directories are searched recursively for files with one of the extensions.
+# Order is the order of the paths, with directories and globs sorted
+def collect_files(paths, extensions):
+    files = []
+    seen = set()
+    for path in paths:
+        if any([c in path for c in GLOB_CHARS]):
+            matches = sorted(glob.glob(path))
+        else:
+            # A path that does not exist is kept so the checker reports it
+            matches = [path]
+
+        for match in matches:
+            if os.path.isdir(match):
+                found = []
+                for root, dirs, names in os.walk(match):
+                    dirs.sort()
+                    for name in sorted(names):
+                        if os.path.splitext(name)[1] in extensions:
+                            found.append(os.path.join(root, name))
+            else:
+                found = [match]
+
+            for filename in found:
+                if filename not in seen:
+                    seen.add(filename)
+                    files.append(filename)
+
+    return files
+
+
+# Returns a pool of jobs processes forked from this one, so they start with a
+# copy of everything it has. Returns None where processes cannot be forked
+def fork_pool(jobs):
+    if not hasattr(os, 'fork'):
+        return None
+    if hasattr(multiprocessing, 'get_context'):
+        # Python 3 may start them some other way by default
+        return multiprocessing.get_context('fork').Pool(jobs)
+    return Pool(jobs)
+
+
+# Options that do not change what the checker reports, so they are left out
+# of the keys of cached results
+def output_options(options):
+    return dict([(k, v) for k, v in options.items() if k != 'jobs'])
+
+
+# Returns None if the cache directory cannot be used
+def get_cache(cache_dir):
+    if cache_dir not in result_caches:
+        try:
+            result_caches[cache_dir] = ResultCache(cache_dir)
+        except OSError:
+            result_caches[cache_dir] = None
+    return result_caches[cache_dir]
+
+
+# Check a single file and collect everything the checker reports
+# task is a tuple of (checker class, filename, keyword arguments of the checker,
+# cache directory or None to not use the cache)
+# Returns a tuple of (filename, entries as dicts, errors, ok, number of lines,
+# reason). reason is None if ok, and otherwise why the file could not be
+# checked as a dict of the message and the 1 based line (or None)
+def check_file(task):
+    checker_cls, filename, options, cache_dir = task
+    if memory is None or cache_dir is None:
+        return check_file_contents(task)
+
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return check_file_contents(task)
+
+    key = (os.path.abspath(filename), st.st_mtime, st.st_size, checker_cls.__name__,
+           checker_cls.VERSION, tuple(sorted(output_options(options).items())))
+    value = memory.get(key)
+    if value is not None:
+        return (filename,) + value
+
+    result = check_file_contents(task)
+    if result[3]:
+        memory.put(key, result[1:])
+    return result
+
+
+# Same as check_file without the memory of the daemon
+def check_file_contents(task):
+    checker_cls, filename, options, cache_dir = task
+    result_cache = None
+    if cache_dir is not None:
+        try:
+            with open(filename, 'rb') as f:
+                content = f.read()
+        except IOError:
+            content = None
+
+        if content is not None:
+            result_cache = get_cache(cache_dir)
+
+        if result_cache is not None:
+            # Files that did not change are answered without parsing them
+            key = result_cache.key(content, checker_cls.__name__,
+                                   checker_cls.VERSION, output_options(options))
+            value = result_cache.get(key)
+            if value is not None:
+                return filename, value['entries'], '', True, value['lines'], None
+
+    checker = None
+    # Why the checker gave up on the file, shown after what it found so far
+    failure = []
+    errors = ''
+    ok = True
+    reason = None
+    num_lines = 0
+    if result_cache is not None and getattr(checker_cls, 'INCREMENTAL', False):
+        # Reuse what is cached for the unchanged parts of the file
+        options = dict(options, result_cache=result_cache)
+
+    try:
+        checker = checker_cls(filename, **options)
+        num_lines = len(checker.lines)
+        checker.run()
+    except StyleCheckError as e:
+        # Checker could not open or parse the file
+        failure = e.context + [e.message]
+        reason = failure_reason(e)
+        ok = False
+    except Exception as e:
+        errors = traceback.format_exc()
+        reason = failure_reason(e)
+        ok = False
+
+    entries = checker.collector.to_list() if checker is not None else []
+    entries.extend([{'text': line} for line in failure])
+    if result_cache is not None and ok:
+        result_cache.put(key, {'entries': entries, 'lines': num_lines})
+
+    return filename, entries, errors, ok, num_lines, reason
+
+
+# Why a file could not be checked, given what the checker raised, for the
+# reporters
+def failure_reason(e):
+    if isinstance(e, StyleCheckError):
+        return {'message': e.message, 'line': getattr(e, 'line', None)}
+    return {'message': '%s: %s' % (e.__class__.__name__, e), 'line': None}
+
+
+# Check all files with jobs processes, or with this one where processes
+# cannot be forked, and write the results with reporter in the order of
+# files. A single file is checked with jobs processes instead if the checker
+# can split it up. If changes is not None, only the lines it maps each file
+# to are checked (see diffs.py). The text reporter is used if reporter is
+# None. Results are cached in cache_dir unless it is None.
+# Returns True if every file could be checked
+def run_files(checker_cls, files, options, jobs=1, cache_dir=None, reporter=None,
+              changes=None):
+    if reporter is None:
+        reporter = TextReporter(checker_cls.__name__)
+    start = time.time()
+    if jobs > 1 and len(files) == 1 and getattr(checker_cls, 'PARALLEL', False):
+        options = dict(options, jobs=jobs)
+    tasks = []
+    for filename in files:
+        file_options = options
+        if changes is not None:
+            file_options = dict(options, changed=tuple(changes.get(filename, ())))
+        tasks.append((checker_cls, filename, file_options, cache_dir))
+    pool = None
+    if jobs > 1 and len(tasks) > 1:
+        pool = fork_pool(jobs)
+    if pool is not None:
+        results = pool.imap(check_file, tasks)
+    else:
+        results = (check_file(task) for task in tasks)
+
+    single = len(tasks) == 1
+    total_lines = 0
+    total_issues = 0
+    failed = 0
+    try:
+        for filename, entries, errors, ok, num_lines, reason in results:
+            entries = [from_entry_dict(d) for d in entries]
+            reporter.write_file(filename, entries, not single, reason)
+            if errors:
+                sys.stderr.write(errors)
+
+            total_lines += num_lines
+            total_issues += len([e for e in entries if isinstance(e, Diagnostic)])
+            if not ok:
+                failed += 1
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    reporter.finish(len(tasks), total_lines, time.time() - start, total_issues, failed)
+    return failed == 0
+
+
+# Check the files one at a time with a checker that has stream(), writing what
+# it finds as it goes instead of once the whole file is checked. Nothing is
+# cached. The text reporter is used if reporter is None.
+# Returns True if every file could be checked
+def stream_files(checker_cls, files, options, reporter=None):
+    if reporter is None:
+        reporter = TextReporter(checker_cls.__name__)
+    start = time.time()
+    named = len(files) > 1
+    total_lines = 0
+    total_issues = 0
+    failed = 0
+    for filename in files:
+        checker = checker_cls(filename, **options)
+        chunks = checker.stream()
+        first = True
+        while True:
+            # Only what the checker raises is caught, not what writing raises
+            try:
+                entries = next(chunks)
+            except StopIteration:
+                break
+            except StyleCheckError as e:
+                # Checker could not read the file
+                reporter.write_file(filename, e.context + [e.message], named and first,
+                                    failure_reason(e))
+                failed += 1
+                break
+            except Exception as e:
+                sys.stderr.write(traceback.format_exc())
+                reporter.write_file(filename, [], named and first, failure_reason(e))
+                failed += 1
+                break
+
+            reporter.write_file(filename, entries, named and first)
+            first = False
+            total_issues += len([e for e in entries if isinstance(e, Diagnostic)])
+
+        total_lines += checker.num_lines
+
+    reporter.finish(len(files), total_lines, time.time() - start, total_issues, failed)
+    return failed == 0
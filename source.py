@@ -0,0 +1,356 @@
+'''
+    Filename: source.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import os
+import re
+import sys
+import mmap
+import locale
+from array import array
+
+try:
+    from itertools import izip as zip
+except ImportError:
+    pass
+
+from errors import SourceError
+
+# Filename that stands for stdin
+STDIN_NAME = '-'
+# Files opened as text only have their newlines translated on Python 3
+UNIVERSAL_NEWLINES = bytes is not str
+NEWLINE_REGEXP = b'\r\n|\r|\n' if UNIVERSAL_NEWLINES else b'\n'
+TAB_CHAR = '\t'
+SPACE_CHAR = ' '
+# Amount of a mapped file indexed at a time
+INDEX_CHUNK = 1 << 20
+# Amount of text split into lines at a time
+SPLIT_CHUNK = 1 << 16
+# Files at least this large are mapped instead of read. Mapped lines are
+# decoded every time they are used, which is slower than a list of them
+MAP_THRESHOLD = 16 << 20
+
+newline_ptrn = re.compile(NEWLINE_REGEXP)
+
+
+# Text of a file, read the same way as it always was with open(filename, "r")
+def read_source(filename):
+    try:
+        with open(filename, "r") as f:
+            return f.read()
+    except IOError:
+        raise SourceError('Could not open file', filename)
+    except UnicodeDecodeError:
+        raise SourceError('Could not decode file', filename)
+
+
+# Bytes are decoded as UTF-8 with newlines translated, the way a file opened
+# as text is read
+def decode_source(source):
+    if not isinstance(source, str):
+        if isinstance(source, bytes):
+            source = source.decode('utf-8', 'replace')
+            source = source.replace('\r\n', '\n').replace('\r', '\n')
+    return source
+
+
+# Lines of source without their newlines
+def split_lines(source):
+    lines = decode_source(source).split('\n')
+    if lines[-1] == '':
+        # Either the source is empty or it ends with a newline
+        lines.pop()
+    return lines
+
+
+# Same lines as split_lines one at a time, so that they are not all held
+# twice while they are turned into something else
+def iter_split_lines(source):
+    source = decode_source(source)
+    pos = 0
+    while True:
+        # Split a chunk at a time, each ending before a newline
+        end = source.find('\n', pos + SPLIT_CHUNK)
+        if end == -1:
+            break
+        for line in source[pos:end].split('\n'):
+            yield line
+        pos = end + 1
+
+    lines = source[pos:].split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    for line in lines:
+        yield line
+
+
+# Lines of the file named filename, or of stdin if it is STDIN_NAME, read one
+# at a time without their newlines. They are the same lines as split_lines
+# gives for the text of the file
+def iter_lines(filename):
+    if filename == STDIN_NAME:
+        f = sys.stdin
+    else:
+        try:
+            f = open(filename, "r")
+        except IOError:
+            raise SourceError('Could not open file', filename)
+
+    try:
+        for line in f:
+            if line.endswith('\n'):
+                line = line[:-1]
+            yield line
+    except UnicodeDecodeError:
+        raise SourceError('Could not decode file', filename)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+# Lines of the file named filename, mapped if it is large and read otherwise,
+# in which case they can only be iterated over once.
+# Raises SourceError if the file cannot be read
+def load_lines(filename):
+    try:
+        size = os.path.getsize(filename)
+    except OSError:
+        raise SourceError('Could not open file', filename)
+    if size >= MAP_THRESHOLD:
+        return MappedLines(filename)
+    return iter_split_lines(read_source(filename))
+
+
+# Lines with their tabs replaced by tab_length spaces. Mapped lines get a
+# view that expands them as they are used
+def expand_tabs(lines, tab_length):
+    if isinstance(lines, MappedLines):
+        return ExpandedLines(lines, tab_length)
+    return TabLines(lines, tab_length)
+
+
+# Line with its tabs replaced by spaces, and the columns of the line the tabs
+# were at or None if it has none
+def expand_line(line, spaces):
+    if TAB_CHAR not in line:
+        return line, None
+    parts = line.split(TAB_CHAR)
+    tabs = []
+    col = -1
+    for part in parts[:-1]:
+        col += len(part) + 1
+        tabs.append(col)
+    return spaces.join(parts), tuple(tabs)
+
+
+# Line as it was before expand_line, from the columns its tabs were at
+def unexpand_line(line, tabs, tab_length):
+    if tabs is None:
+        return line
+    parts = []
+    pos = 0
+    for k, col in enumerate(tabs):
+        # Every tab before this one made the line tab_length - 1 longer
+        j = col + k * (tab_length - 1)
+        parts.append(line[pos:j])
+        pos = j + tab_length
+    parts.append(line[pos:])
+    return TAB_CHAR.join(parts)
+
+
+# A list of the lines with their tabs expanded, which is the only copy of
+# them that is kept. The columns of the tabs of every line are kept in one
+# array, so the lines as they are in the file can be had back
+class TabLines(list):
+    def __init__(self, lines, tab_length):
+        list.__init__(self)
+        self.tab_length = tab_length
+        # Columns of the tabs of line n are tab_cols[tab_index[n]:tab_index[n+1]]
+        self.tab_index = array('I', [0])
+        self.tab_cols = array('I')
+        spaces = SPACE_CHAR * tab_length
+        append = self.append
+        add_index = self.tab_index.append
+        add_col = self.tab_cols.append
+        num_tabs = 0
+        for line in lines:
+            k = line.find(TAB_CHAR)
+            if k != -1:
+                if line.find(TAB_CHAR, k + 1) == -1:
+                    # Most lines with a tab have just the one
+                    add_col(k)
+                    num_tabs += 1
+                    line = line[:k] + spaces + line[k+1:]
+                else:
+                    parts = line.split(TAB_CHAR)
+                    col = -1
+                    for part in parts[:-1]:
+                        col += len(part) + 1
+                        add_col(col)
+                    num_tabs += len(parts) - 1
+                    line = spaces.join(parts)
+            add_index(num_tabs)
+            append(line)
+
+    def has_tabs(self, n):
+        return self.tab_index[n+1] != self.tab_index[n]
+
+    # Line n as it is in the file
+    def raw(self, n):
+        i = self.tab_index[n]
+        j = self.tab_index[n+1]
+        if i == j:
+            return self[n]
+        elif j == i + 1:
+            col = self.tab_cols[i]
+            return self[n][:col] + TAB_CHAR + self[n][col+self.tab_length:]
+        return unexpand_line(self[n], self.tab_cols[i:j], self.tab_length)
+
+    # Length of line n as it is in the file
+    def raw_length(self, n):
+        num_tabs = self.tab_index[n+1] - self.tab_index[n]
+        return len(self[n]) - num_tabs * (self.tab_length - 1)
+
+
+# Lines of a file read through mmap. Only where each line starts and ends is
+# kept and a line is decoded when it is asked for, so the lines cost a few
+# bytes each instead of a string each. They are the same lines as
+# split_lines gives for the text of the file.
+# Raises SourceError if the file cannot be read or decoded
+class MappedLines(object):
+    def __init__(self, filename):
+        self.filename = filename
+        self.data = b''
+        # Python 2 reads files as bytes
+        self.encoding = locale.getpreferredencoding(False) if UNIVERSAL_NEWLINES else None
+
+        try:
+            with open(filename, 'rb') as f:
+                f.seek(0, 2)
+                size = f.tell()
+                if size != 0:
+                    # The map stays valid after the file is closed
+                    self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, OSError):
+            raise SourceError('Could not open file', filename)
+
+        # Offsets of the lines fit in 4 bytes unless the file is over 4GB
+        typecode = 'I' if size <= 0xFFFFFFFF else 'L'
+        self.starts = array(typecode)
+        self.ends = array(typecode)
+        self.index()
+
+    # Find where every line starts and ends a chunk at a time. Each chunk is
+    # decoded as well so that a file that cannot be decoded fails as it would
+    # when read, without holding all of it decoded
+    def index(self):
+        data = self.data
+        size = len(data)
+        pos = 0
+        while pos < size:
+            end = min(pos + INDEX_CHUNK, size)
+            if end < size:
+                # Chunks end after a newline, or at the end of the file
+                k = data.rfind(b'\n', pos, end)
+                if k == -1:
+                    k = data.find(b'\n', end)
+                end = size if k == -1 else k + 1
+
+            chunk = data[pos:end]
+            if self.encoding is not None:
+                try:
+                    chunk.decode(self.encoding)
+                except UnicodeDecodeError:
+                    raise SourceError('Could not decode file', self.filename)
+            self.index_chunk(chunk, pos)
+            pos = end
+
+    def index_chunk(self, chunk, offset):
+        add_start = self.starts.append
+        add_end = self.ends.append
+        if UNIVERSAL_NEWLINES and b'\r' in chunk:
+            start = 0
+            for match in newline_ptrn.finditer(chunk):
+                add_start(offset + start)
+                add_end(offset + match.start())
+                start = match.end()
+            if start != len(chunk):
+                # Last line of the file has no newline
+                add_start(offset + start)
+                add_end(offset + len(chunk))
+            return
+
+        parts = chunk.split(b'\n')
+        if len(parts[-1]) == 0:
+            # Chunk ends with a newline
+            parts.pop()
+        pos = offset
+        for part in parts:
+            add_start(pos)
+            pos += len(part)
+            add_end(pos)
+            pos += 1
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, n):
+        try:
+            line = self.data[self.starts[n]:self.ends[n]]
+        except TypeError:
+            # Slice of lines
+            return [self[i] for i in range(*n.indices(len(self)))]
+        if self.encoding is not None:
+            return line.decode(self.encoding)
+        return line
+
+    def __iter__(self):
+        data = self.data
+        encoding = self.encoding
+        for start, end in zip(self.starts, self.ends):
+            if encoding is None:
+                yield data[start:end]
+            else:
+                yield data[start:end].decode(encoding)
+
+
+# Lines with their tabs replaced by tab_length spaces, made from the lines
+# as they are asked for. Lines without tabs are the lines themselves. Has the
+# same methods as TabLines
+class ExpandedLines(object):
+    def __init__(self, lines, tab_length):
+        self.lines = lines
+        self.spaces = SPACE_CHAR * tab_length
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __getitem__(self, n):
+        line = self.lines[n]
+        if isinstance(line, list):
+            # Slice of lines
+            return [l.replace(TAB_CHAR, self.spaces) for l in line]
+        if TAB_CHAR in line:
+            return line.replace(TAB_CHAR, self.spaces)
+        return line
+
+    def __iter__(self):
+        for line in self.lines:
+            if TAB_CHAR in line:
+                line = line.replace(TAB_CHAR, self.spaces)
+            yield line
+
+    def has_tabs(self, n):
+        return TAB_CHAR in self.lines[n]
+
+    # Line n as it is in the file
+    def raw(self, n):
+        return self.lines[n]
+
+    def raw_length(self, n):
+        return len(self.lines[n])
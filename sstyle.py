@@ -8,7 +8,20 @@
 
 import re
 import sys
+import time
 import getopt
+from bisect import bisect_right
+from collections import deque
+
+import cache
+from diagnostics import REPORTERS, Collector
+from errors import StyleCheckError
+from source import load_lines, expand_tabs, expand_line, unexpand_line, iter_split_lines, iter_lines
+import runner
+import diffs
+from lexer import Lexer, CODE, STRING, CHAR, LINE_CMMT, BLOCK_CMMT
+from profiler import Profiler
+import rules
 
 COLON = ':'
 START_BLOCK_COMMENT = '/*'
@@ -22,6 +35,9 @@ DOUBLE_QUOTE = '\"'
 SINGLE_QUOTE = '\''
 START_COMMENT_CHARS = ['@', '#']
 
+# Files picked up when a directory is passed in
+S_EXTENSIONS = ['.s', '.S']
+
 
 BLCK_CMMT_EMPTY_REGEXP = " *(\/\*.*\*\/) *\Z"    # Block comment followed by empty space
 LABEL_REGEXP = " *[a-zA-Z_\.][a-zA-Z0-9_\.]*\:"
@@ -46,6 +62,9 @@ white_space_ptrn = re.compile(WHITE_SPACE_REGEXP)
 
 todo_cmmt_ptrn = re.compile(TODO_COMMENT_REGEXP)
 
+s_lexer = Lexer([START_COMMENT_SLASH] + START_COMMENT_CHARS)
+char_mask_ptrn = re.compile(CHAR + '+')
+
 
 #Types
 _BLOCK_CMMT = 0
@@ -62,34 +81,69 @@ NEWLINES_LIMIT = 2
 NON_MAGIC_NUMBERS = [
     '0', '-1', '1', '\'\\0\''
 ]
+# Rules reported by the checker, see rules.py. All of them are checked
+# unless they are disabled
+RULES = [
+    'excess-newlines', 'indentation', 'line-length', 'magic-number', 'space-indent',
+    'todo-comment', 'trailing-statement'
+]
+# Methods timed with --profile along with every handle_* method
+PROFILED_METHODS = [
+    'get_block_comments', 'parse_line', 'check_indentation', 'contains_magic',
+    'check_line_limit', 'check_space_indentation'
+]
 
 class SStyleChecker(object):
-    def __init__(self, filename, print_headers=False):
+    # Bump when the output of the checker changes. Cached results are keyed
+    # by it
+    VERSION = 2
+    RULES = RULES
+
+    # Checks the file named filename, or source if it is passed in, in which
+    # case filename is only used to name it. source is text or bytes. The
+    # rules in disable are not checked. Every other rule is, enable is only
+    # taken to match CStyleChecker. If changed is passed, only the groups of
+    # lines that have one of the 1 based lines in it are checked.
+    # Raises SourceError if the file cannot be read and ValueError for rules
+    # it does not know of
+    def __init__(self, filename, print_headers=False, source=None, profile=False,
+                 enable=(), disable=(), changed=None):
+        self.filename = filename
         self.lines = []
-        self.og_lines = []
         self.indent_amt = TAB_LENGTH
         self.used_space_lines = []
         self.block_cmmts = []
+        self.block_cmmt_starts = []
+        # Per line classification of every character. See lexer.py
+        self.masks = []
         self.print_headers = print_headers
+        # Rules that are checked. The work of the others is skipped
+        self.rules = rules.select(RULES, RULES, enable, disable)
+        # 0 based lines that are checked, or None to check the whole file
+        self.changed = None if changed is None else set([n-1 for n in changed])
+        # Everything the checker finds. See diagnostics.py
+        self.collector = Collector(self.rules, None if changed is None else set(changed))
+        # Time spent in each phase of the checker, in seconds: read and
+        # preprocess here, check in run()
+        self.timings = {}
+        # Times the handlers and primitives when profile is set, see profiler.py
+        self.profiler = None
+        if profile:
+            self.profiler = Profiler()
+            self.profiler.wrap(self, PROFILED_METHODS +
+                               [name for name in dir(self) if name.startswith('handle_')])
+
+        # Only the lines with their tabs expanded are kept, see source.py
+        start = time.time()
+        if source is None:
+            self.lines = expand_tabs(load_lines(filename), TAB_LENGTH)
+        else:
+            self.lines = expand_tabs(iter_split_lines(source), TAB_LENGTH)
+        self.timings['read'] = time.time() - start
 
-        try:
-            f = open(filename, "r")
-        except IOError:
-            print('Could not open file')
-            sys.exit(1)
-
-        l = f.readline()
-        while l:
-            if l[-1] == '\n':
-                l = l[:-1]
-            
-            self.og_lines.append(l)
-            self.lines.append(l.replace(TAB_CHAR, SPACE_CHAR * TAB_LENGTH))
-            l = f.readline()
-
-        f.close()
-
+        start = time.time()
         self.get_block_comments()
+        self.timings['preprocess'] = time.time() - start
 
     def contains_magic(self, line, n):
         # Hack: Add a space at the beginning so the regexp works
@@ -98,131 +152,54 @@ class SStyleChecker(object):
         for match in matches:
             number = match.group(NUM_GROUP_IND)
             if number not in NON_MAGIC_NUMBERS:
-                lo, hi = match.start(NUM_GROUP_IND), match.end(NUM_GROUP_IND)
-                in_comment = self.within_comment(line, n, lo, hi)
-                in_quote = self.within_quotes(line, lo, hi)
-                if not in_comment and not in_quote:
+                # -1 to account for the space added in front
+                lo = match.start(NUM_GROUP_IND) - 1
+                if self.masks[n][lo] == CODE:
                     return True
 
-        in_quote = False
-        # index = line.find(DOUBLE_QUOTE)
-        # if index != -1:
-        #     prev_quote = index
-        #     # Check for strings on this line
-        #     for i in range(index, len(line)):
-        #         if line[i] == DOUBLE_QUOTE and (i == 0 or line[i-1] != BACKSLASH):
-        #             if in_quote:
-        #                 in_quote = False
-        #                 # Check if the string found is non magic string
-        #                 if line[prev_quote:i+1] not in NON_MAGIC_NUMBERS:
-        #                     index = line.find(line[prev_quote:i+1])
-        #                     lo, hi = index, index + len(line[prev_quote:i+1])
-        #                     in_comment = self.within_comment(line, n, lo, hi)
-        #                     if not in_comment:
-        #                         return True
-        #             else:
-        #                 in_quote = True
-        #                 prev_quote = i
-        #
-        index = line.find(SINGLE_QUOTE)
-        if index != -1:
-            prev_quote = index
-            # Check for strings on this line
-            for i in range(index, len(line)):
-                if line[i] == SINGLE_QUOTE and (i == 0 or line[i-1] != BACKSLASH):
-                    if in_quote:
-                        in_quote = False
-                        # Check if the char found is non magic char
-                        if line[prev_quote:i+1] not in NON_MAGIC_NUMBERS:
-                            index = line.find(line[prev_quote:i+1])
-                            lo, hi = index, index + len(line[prev_quote:i+1])
-                            in_comment = self.within_comment(line, n, lo, hi)
-                            if not in_comment:
-                                return True
-                    else:
-                        in_quote = True
-                        prev_quote = i
+        # Check the characters. The lexer only marks char literals that are
+        # outside strings and comments
+        line = line[1:]
+        for match in char_mask_ptrn.finditer(self.masks[n]):
+            # Check if the char found is non magic char
+            if line[match.start():match.end()] not in NON_MAGIC_NUMBERS:
+                return True
 
         return False
 
-    def within_quotes(self, s, lo, hi):
-        # Capture ranges that are within a string
-        ranges = []
-        index = s.find(DOUBLE_QUOTE)
-        if index == -1:
-            return False
-
-        # Look for matching double quotes that are not escaped
-        in_quote = False
-        prev_quote = index
-        for i in range(index, len(s)):
-            # Check if char at index i is a double quotes that is not escaped
-            if s[i] == DOUBLE_QUOTE and (i == 0 or s[i-1] != BACKSLASH):
-                if in_quote:
-                    in_quote = False
-                    ranges.append((prev_quote, i+1))
-                else:
-                    in_quote = True
-                    prev_quote = i
-
-        # If the range is within the quotes
-        return any([lo > left and hi < right for (left, right) in ranges])
+    # Line n as it is in the file, with its tabs
+    def raw_line(self, n):
+        return self.lines.raw(n)
 
-    def within_comment(self, s, n, lo, hi):
-        # Look left from lo to check for //, @, #
-        in_quote = False
-        for i in reversed(range(1, lo)):
-            if not in_quote and (s[i-1] + s[i]) == START_COMMENT_SLASH:
-                return True
+    # n is the line number, lo is the index in the line
+    def within_quotes(self, n, lo):
+        return self.masks[n][lo] in (STRING, CHAR)
 
-            if not in_quote and s[i] in START_COMMENT_CHARS:
-                return True
-
-            if s[i] == DOUBLE_QUOTE and (i == 0 or s[i-1] != BACKSLASH):
-                if in_quote:
-                    in_quote = False
-                else:
-                    in_quote = True
-
-        # Check if the string is within a block comment
-        for (start, end) in self.block_cmmts:
-            start_line, start_ind = start[0], start[1]
-            end_line, end_ind = end[0], end[1]
-            # If line is within range
-            if n >= start_line and n <= end_line:
-                if n == start_line and start_line == end_line:
-                    if lo >= start_ind and hi < end_ind:
-                        return True
-                elif n == start_line:
-                    if lo >= start_ind:
-                        return True
-                elif n == end_line:
-                    if lo <= end_ind:
-                        return True
-                else:
-                    return True
-
-        return False
+    # n is the line number, lo is the index in the line
+    def within_comment(self, n, lo):
+        return self.masks[n][lo] in (LINE_CMMT, BLOCK_CMMT)
 
     def print_lines(self, lines, print_n=False):
         for line_n in lines:
             if print_n:
-                print('%d\t\t%s' % (line_n+1, self.lines[line_n]))
+                self.collector.text('%d\t\t%s' % (line_n+1, self.lines[line_n]))
             else:
-                print(self.lines[line_n])
+                self.collector.text(self.lines[line_n])
 
+    # The lexer records the block comments in the same pass that builds
+    # the code/string/comment masks. Block comments cannot overlap, so the
+    # spans come out sorted by their start location
     def get_block_comments(self):
-        start = None
-
-        for i in range(len(self.lines)):
-            line = self.lines[i]
-            for j in range(len(line)-1):
-                if line[j:j+2] == START_BLOCK_COMMENT and not self.within_quotes(line, j, j+2)\
-                        and not self.within_comment(line, i, j, j+2):
-                    start = (i, j)
-                elif line[j:j+2] == END_BLOCK_COMMENT:
-                    end = (i, j+2)
-                    self.block_cmmts.append((start, end))
+        self.masks, self.block_cmmts = s_lexer.scan(self.lines)
+        self.block_cmmt_starts = [start for (start, end) in self.block_cmmts]
+
+    # Binary search for the block comment containing location (n, j)
+    # Returns the (start, end) span of the comment or None
+    def find_block_comment(self, n, j):
+        i = bisect_right(self.block_cmmt_starts, (n, j)) - 1
+        if i >= 0 and (n, j) < self.block_cmmts[i][1]:
+            return self.block_cmmts[i]
+        return None
 
     def parse_line(self, n):
         line = self.lines[n]
@@ -248,16 +225,13 @@ class SStyleChecker(object):
         if match:
             # Find the end of the comment block
             start = self.lines[n].find(START_BLOCK_COMMENT)
-            for line_n in range(n, len(self.lines)):
-                lo = start+2 if line_n == n else 0
-                for j in range(lo, len(self.lines[line_n])-1):
-                    pair = self.lines[line_n][j] + self.lines[line_n][j+1]
-                    if pair == END_BLOCK_COMMENT:
-                        # Found the end of the comment block
-                        group.append(line_n)
-                        return group, _BLOCK_CMMT
+            span = self.find_block_comment(n, start)
+            if span:
+                group.extend(range(n, span[1][0]+1))
+                return group, _BLOCK_CMMT
 
-                group.append(line_n)
+            # Comment block is never closed
+            group.extend(range(n, len(self.lines)))
 
         if label_ptrn.match(line):
             # Is a label
@@ -271,30 +245,33 @@ class SStyleChecker(object):
 
     def check_indentation(self, n, t):
         line = self.lines[n]
+        check_indent = 'indentation' in self.rules
         if t == _LABEL:
             stripped = line.lstrip()
-            if len(line) != len(stripped):
+            if check_indent and len(line) != len(stripped):
                 # Label was indented
-                print('Line %d: Assembly label should not be indented' % (n+1))
-                print(line)
+                self.collector.report('indentation', n+1,
+                                      'Assembly label should not be indented', context=[line])
         elif t == _INSTRUCTION or t == _DIRECTIVE:
             stripped = line.lstrip()
             actual_indent_amt = len(line) - len(stripped)
-            if actual_indent_amt == 0:
-                print('Line %d: Assembly instruction or directive should be '\
-                      'indented with 1 tab' % (n+1))
-                print(line)
-            elif actual_indent_amt != self.indent_amt:
-                print('Line %d: Inconsistent Indentation' % (n+1))
-                print(line)
+            if check_indent:
+                if actual_indent_amt == 0:
+                    self.collector.report('indentation', n+1,
+                                          'Assembly instruction or directive should be '
+                                          'indented with 1 tab', context=[line])
+                elif actual_indent_amt != self.indent_amt:
+                    self.collector.report('indentation', n+1, 'Inconsistent Indentation',
+                                          context=[line])
 
             # Check for Tab usage
-            og_line = self.og_lines[n]
-            stripped = og_line.lstrip()
-            whitespace = og_line[:len(og_line) - len(stripped)]
-            if whitespace.find(SPACE_CHAR) != -1:
-                # Indented using space
-                self.used_space_lines.append(n)
+            if 'space-indent' in self.rules:
+                og_line = self.raw_line(n)
+                stripped = og_line.lstrip()
+                whitespace = og_line[:len(og_line) - len(stripped)]
+                if whitespace.find(SPACE_CHAR) != -1:
+                    # Indented using space
+                    self.used_space_lines.append(n)
 
     def handle_trailing_string(self, trail, n, terminator):
         stripped = trail.lstrip()
@@ -302,9 +279,9 @@ class SStyleChecker(object):
             # Check if the trailing string is a comment. If it is then it's fine
             if len(stripped) != 0 and not cmmt_ptrn.match(trail) and not\
                     blck_cmmt_empty_ptrn.match(trail):
-                print('Line %d: Statements behind %s should be '\
-                      'on the next line' % (n+1, terminator))
-                print(self.lines[n])
+                self.collector.report('trailing-statement', n+1,
+                                      'Statements behind %s should be on the next line'
+                                      % terminator, context=[self.lines[n]])
 
     def handle_group(self, group, t):
         if t == _BLOCK_CMMT:
@@ -352,17 +329,16 @@ class SStyleChecker(object):
                         indent_error = True
 
             # If the comment block is indented, it must use tabs
-            if indent_amt != 0:
-                og_line = self.og_lines[line_n]
+            if indent_amt != 0 and 'space-indent' in self.rules:
+                og_line = self.raw_line(line_n)
                 if og_line[0] != TAB_CHAR:
                     self.used_space_lines.append(line_n)
 
         if indent_error:
-            if len(lines) > 1:
-                print('Line %d to %d: Inconsistent Indentation' % (lines[0]+1, lines[-1]+1))
-            else:
-                print('Line %d: Inconsistent Indentation' % (lines[0]+1))
-            self.print_lines(lines)
+            end_line = lines[-1]+1 if len(lines) > 1 else None
+            self.collector.report('indentation', lines[0]+1, 'Inconsistent Indentation',
+                                  end_line=end_line,
+                                  context=[self.lines[line_n] for line_n in lines])
 
         last_line = self.lines[lines[-1]]
         index = last_line.find(END_BLOCK_COMMENT)
@@ -377,18 +353,17 @@ class SStyleChecker(object):
         return None
 
     def handle_comment(self, lines):
-        if todo_cmmt_ptrn.match(self.lines[lines[0]]):
-            print('Line %d: Left in TODO comment' % (lines[0]+1))
-            print(self.lines[lines[0]])
+        if 'todo-comment' in self.rules and todo_cmmt_ptrn.match(self.lines[lines[0]]):
+            self.collector.report('todo-comment', lines[0]+1, 'Left in TODO comment',
+                                  context=[self.lines[lines[0]]])
 
         return lines[-1] + 1
 
     def handle_instruction(self, lines):
         self.check_indentation(lines[0], _INSTRUCTION)
-        magic = self.contains_magic(self.lines[lines[0]], lines[0])
-        if magic:
-            print('Line %d: Contains magic number' % (lines[0]+1))
-            print(self.lines[lines[0]])
+        if 'magic-number' in self.rules and self.contains_magic(self.lines[lines[0]], lines[0]):
+            self.collector.report('magic-number', lines[0]+1, 'Contains magic number',
+                                  context=[self.lines[lines[0]]])
         return lines[-1] + 1
 
     def handle_directive(self, lines):
@@ -402,34 +377,44 @@ class SStyleChecker(object):
         if len(after) != 0:
             if not white_space_ptrn.match(after) and not\
                     cmmt_ptrn.match(after) and not blck_cmmt_ptrn.match(after):
-                print('Line %d: Statements behind label should be on'\
-                      ' the next line' % (lines[0]+1))
-                print(self.lines[lines[0]])
+                self.collector.report('trailing-statement', lines[0]+1,
+                                      'Statements behind label should be on the next line',
+                                      context=[self.lines[lines[0]]])
 
         return lines[-1] + 1
 
     def handle_whitespace(self, lines):
         if len(lines) > NEWLINES_LIMIT:
             beg, end = lines[0]+1, lines[-1]+1
-            print('Line %d to %d: Excess newlines. More than the newline limit (%d)'\
-                  % (beg, end, NEWLINES_LIMIT))
+            self.collector.report('excess-newlines', beg,
+                                  'Excess newlines. More than the newline limit (%d)'
+                                  % NEWLINES_LIMIT, end_line=end)
 
         return lines[-1] + 1
 
     def check_line_limit(self):
-        for i, l in enumerate(self.og_lines):
-            if len(l) > LINE_LIMIT:
-                print('Line %d: Over %d characters' % (i+1, LINE_LIMIT))
-                print(l)
+        if 'line-length' not in self.rules:
+            return
+        lines = enumerate(self.lines)
+        if self.changed is not None:
+            lines = [(i, self.lines[i]) for i in sorted(self.changed) if i < len(self.lines)]
+        for i, l in lines:
+            # Expanding tabs only makes lines longer
+            if len(l) > LINE_LIMIT and self.lines.raw_length(i) > LINE_LIMIT:
+                self.collector.report('line-length', i+1, 'Over %d characters' % LINE_LIMIT,
+                                      column=LINE_LIMIT+1, context=[self.raw_line(i)])
 
     def check_space_indentation(self):
+        if self.changed is not None:
+            self.used_space_lines = [n for n in self.used_space_lines if n in self.changed]
         if len(self.used_space_lines) != 0:
-            lines = [str(n+1) for n in self.used_space_lines]
-            lines = ", ".join(lines)
-            print('Indented using spaces on lines %s' % lines)
+            lines = [n+1 for n in self.used_space_lines]
+            self.collector.report('space-indent', None, 'Indented using spaces on lines %s'
+                                  % ", ".join([str(n) for n in lines]), lines=lines)
 
     def run(self):
-        print('')
+        start = time.time()
+        self.collector.text('')
         self.check_line_limit()
 
         file_header = []
@@ -442,7 +427,10 @@ class SStyleChecker(object):
         prev_group = None
         while i < len(self.lines):
             group, t = self.parse_line(i)
-            i = self.handle_group(group, t)
+            if self.changed is None or any([n in self.changed for n in group]):
+                i = self.handle_group(group, t)
+            else:
+                i = group[-1] + 1
 
             # Collect headers
             if t == _BLOCK_CMMT:
@@ -473,51 +461,393 @@ class SStyleChecker(object):
             # Print the file header first, which is the first block of comment
             if len(self.block_cmmts) != 0:
                 if len(file_header) != 0:
-                    print('\nFile header:')
+                    self.collector.text('\nFile header:')
                     self.print_lines(file_header, print_n=True)
                 else:
-                    print('\nThere is no file header')
+                    self.collector.text('\nThere is no file header')
 
                 # Print function headers
                 if len(func_headers) != 0:
-                    print('\nFunction headers:')
+                    self.collector.text('\nFunction headers:')
                     for lines in func_headers:
                         self.print_lines(lines, print_n=True)
-                        print('')
+                        self.collector.text('')
                 else:
-                    print('\nThere are no function headers')
+                    self.collector.text('\nThere are no function headers')
             else:
-                print('\nNo file/function headers')
+                self.collector.text('\nNo file/function headers')
+
+        self.collector.text('')
+        self.timings['check'] = time.time() - start
+
+        if self.profiler is not None:
+            for line in self.profiler.report():
+                self.collector.text(line)
+            self.collector.text('')
+        return self.collector
+
+
+# Checks a file a line at a time, holding only the lines of the group being
+# checked, so memory does not grow with the size of the file. Issues are the
+# same as SStyleChecker finds but come out in the order of the lines, spaces
+# used to indent are reported for each group and the headers are printed as
+# they are found
+class SStyleStreamChecker(SStyleChecker):
+    # Checks the file named filename, or stdin if it is '-'. lines can be
+    # any iterable of lines without newlines to check instead, in which case
+    # filename is only used to name it.
+    # Raises SourceError while streaming if the file cannot be read
+    def __init__(self, filename, print_headers=False, lines=None, enable=(), disable=()):
+        self.filename = filename
+        self.indent_amt = TAB_LENGTH
+        self.used_space_lines = []
+        self.print_headers = print_headers
+        self.rules = rules.select(RULES, RULES, enable, disable)
+        self.changed = None
+        self.collector = Collector(self.rules)
+        # Lines that are read but not checked yet, keyed by line number, and
+        # the columns of the tabs of the ones that had any
+        self.lines = {}
+        self.tabs = {}
+        self.masks = {}
+        # Lines over the limit that are not reported yet
+        self.long_lines = {}
+        # Block comments that end on one of the lines that are held
+        self.block_cmmts = []
+        # Lines that were read ahead and have to be parsed again
+        self.pending = deque()
+        self.first_held = 0
+        self.num_lines = 0
+        self.found_block_cmmt = False
+        self.scanned = self.scan(iter_lines(filename) if lines is None else lines)
+
+    # Read and lex the lines one at a time. Yields each line number once the
+    # line is held
+    def scan(self, lines):
+        block_start = None
+        spaces = SPACE_CHAR * TAB_LENGTH
+        check_line_limit = 'line-length' in self.rules
+        for n, og_line in enumerate(lines):
+            line, tabs = expand_line(og_line, spaces)
+            self.lines[n] = line
+            if tabs is not None:
+                self.tabs[n] = tabs
+            self.masks[n], block_start = s_lexer.scan_line(n, line, block_start,
+                                                           self.block_cmmts)
+            if check_line_limit and len(og_line) > LINE_LIMIT:
+                self.long_lines[n] = og_line
+            if len(self.block_cmmts) != 0:
+                self.found_block_cmmt = True
+            self.num_lines = n + 1
+            yield n
+
+    def raw_line(self, n):
+        return unexpand_line(self.lines[n], self.tabs.get(n), TAB_LENGTH)
+
+    # Returns the number of the next line to parse or None at the end
+    def next_line(self):
+        if len(self.pending) != 0:
+            return self.pending.popleft()
+        return next(self.scanned, None)
+
+    # Drop the lines before line n
+    def forget(self, n):
+        for line_n in range(self.first_held, n):
+            self.lines.pop(line_n, None)
+            self.tabs.pop(line_n, None)
+            self.masks.pop(line_n, None)
+        self.first_held = max(self.first_held, n)
+        if len(self.block_cmmts) != 0:
+            self.block_cmmts = [span for span in self.block_cmmts if span[1][0] >= n]
+
+    # Same as SStyleChecker.parse_line, reading the lines of the group
+    def parse_line(self, n):
+        line = self.lines[n]
+
+        if len(line.strip()) == 0:
+            # Empty line. Only the number of empty lines is needed
+            end = n + 1
+            line_n = self.next_line()
+            while line_n is not None and len(self.lines[line_n].lstrip()) == 0:
+                end += 1
+                self.forget(line_n)
+                line_n = self.next_line()
+            if line_n is not None:
+                self.pending.appendleft(line_n)
+            return LineRange(n, end), _EMPTY_LINE
+
+        match = cmmt_ptrn.match(line)
+        if match:
+            return [n], _CMMT
+
+        match = blck_cmmt_ptrn.match(line)
+        if match:
+            # Read up to the end of the comment block
+            location = (n, line.find(START_BLOCK_COMMENT))
+            read = []
+            while True:
+                spans = [span for span in self.block_cmmts if span[0] <= location < span[1]]
+                if len(spans) != 0:
+                    return LineRange(n, spans[0][1][0] + 1), _BLOCK_CMMT
+                line_n = self.next_line()
+                if line_n is None:
+                    break
+                read.append(line_n)
+
+            # Comment block is never closed, so the lines read are parsed as usual
+            self.pending.extendleft(reversed(read))
+
+        if label_ptrn.match(line):
+            # Is a label
+            return [n], _LABEL
+        elif dir_ptrn.match(line):
+            # Is a directive
+            return [n], _DIRECTIVE
+        else:
+            # Is instruction
+            return [n], _INSTRUCTION
+
+    def check_line_limit(self, lines):
+        if len(self.long_lines) == 0:
+            return
+        for line_n in lines:
+            l = self.long_lines.pop(line_n, None)
+            if l is not None:
+                self.collector.report('line-length', line_n+1, 'Over %d characters' % LINE_LIMIT,
+                                      column=LINE_LIMIT+1, context=[l])
+
+    # The lines of a header as print_lines prints them
+    def header_lines(self, lines):
+        return ['%d\t\t%s' % (line_n+1, self.lines[line_n]) for line_n in lines]
+
+    # Check the lines as they are read. Yields the list of what is found in
+    # each group of lines, in order, with the headers if print_headers is set
+    def stream(self):
+        self.collector.text('')
+
+        found_header = False  # Flag for checking if there is a file header
+        file_header = False
+        found_func_header = False
+        # Lines of the block comment that can be the header of a function
+        prev_header = None
+
+        n = self.next_line()
+        while n is not None:
+            group, t = self.parse_line(n)
+            self.check_line_limit(group)
+            self.handle_group(group, t)
+            if len(self.used_space_lines) != 0:
+                self.check_space_indentation()
+                self.used_space_lines = []
+
+            if t == _BLOCK_CMMT:
+                prev_header = self.header_lines(group) if self.print_headers else []
+                if not found_header:
+                    file_header = True
+                    if self.print_headers:
+                        self.collector.text('\nFile header:')
+                        for header_line in prev_header:
+                            self.collector.text(header_line)
+            elif t == _LABEL and prev_header is not None:
+                if self.print_headers:
+                    if not found_func_header:
+                        self.collector.text('\nFunction headers:')
+                    for header_line in prev_header + self.header_lines(group):
+                        self.collector.text(header_line)
+                    self.collector.text('')
+                found_func_header = True
+                prev_header = None
+            elif t != _EMPTY_LINE:
+                prev_header = None
+
+            if t != _EMPTY_LINE:
+                found_header = True
+
+            self.forget(group[-1] + 1)
+            if len(self.collector.entries) != 0:
+                yield self.collector.entries
+                self.collector.entries = []
+            n = self.next_line()
+
+        if self.print_headers:
+            if not self.found_block_cmmt:
+                self.collector.text('\nNo file/function headers')
+            else:
+                if not file_header:
+                    self.collector.text('\nThere is no file header')
+                if not found_func_header:
+                    self.collector.text('\nThere are no function headers')
+
+        self.collector.text('')
+        yield self.collector.entries
+        self.collector.entries = []
+
+
+# Line numbers from start up to but not including end, the way a group of
+# lines is stored without listing every line
+class LineRange(object):
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.start + i
+
+    def __iter__(self):
+        return iter(range(self.start, self.end))
+
+
+# Check assembly source held in memory, see SStyleChecker for the options.
+# Returns the list of diagnostics found
+def check_source(source, filename='<source>', **options):
+    return SStyleChecker(filename, source=source, **options).run().diagnostics()
 
-        print('')
 
 def usage():
     print(
-        ("Usage: python %s -f <Assembly filename> [-h] [-p]\n" % sys.argv[0]) +
+        ("Usage: python %s -f <Assembly filename> [-h] [-p] [-j <jobs>] "
+         "[files/directories/globs...]\n" % sys.argv[0]) +
         "\t-h/--help: Show help message\n" +
-        "\t-f/--file: Filename to style check (required argument)\n" +
-        "\t-p/--print-headers: If passed, program will print the file/function headers\n"
+        "\t-f/--file: Filename to style check (can be passed more than once)\n" +
+        "\t-p/--print-headers: If passed, program will print the file/function headers\n" +
+        "\t-j/--jobs: Number of processes used to check the files\n" +
+        "\t--no-cache: Check every file even if the result is cached\n" +
+        "\t--cache-dir: Directory of the result cache (default: %s)\n" % cache.default_cache_dir() +
+        "\t--format: Output format, one of %s (default: text)\n" % ", ".join(sorted(REPORTERS)) +
+        "\t--stream: Check a line at a time in constant memory and write the issues as they\n" +
+        "\t          are found. - reads stdin. Results are not cached\n" +
+        "\t--profile: Print the time spent in each handler of the checker (not cached)\n" +
+        "\t--enable: Comma separated rules to check (can be passed more than once)\n" +
+        "\t--disable: Comma separated rules not to check (can be passed more than once)\n" +
+        "\t--config: Config file with the rules to enable and disable\n" +
+        "\t--list-rules: List the rules and whether they are checked by default\n" +
+        "\t--diff: Unified diff, - reads stdin. Only the lines it adds or changes are\n" +
+        "\t        checked, in the files passed or else in every file of the diff\n" +
+        "\tDirectories are searched recursively for %s files\n" % "/".join(S_EXTENSIONS)
     )
 
-if __name__ == '__main__':
-    opts, args = getopt.getopt(sys.argv[1:], "hf:p", ["help", "file=", "print-headers"])
-    file = None
+# Run the command line with the arguments in argv, without the program name
+def main(argv):
+    opts, args = getopt.getopt(argv, "hf:pj:", ["help", "file=", "print-headers",
+                                                "jobs=", "no-cache", "cache-dir=", "format=",
+                                                "stream", "profile", "enable=", "disable=",
+                                                "config=", "list-rules", "diff="])
+    files = []
     print_headers = False
+    jobs = 1
+    cache_dir = cache.default_cache_dir()
+    output_format = 'text'
+    stream = False
+    profile = False
+    enable = []
+    disable = []
+    config = None
+    list_rules = False
+    diff = None
     for o, a in opts:
         if o in ("--help", "-h"):
             usage()
             sys.exit(0)
         elif o in ("--file", "-f"):
-            file = a
+            files.append(a)
         elif o in ("--print-headers", "-p"):
             print_headers = True
+        elif o in ("--jobs", "-j"):
+            try:
+                jobs = int(a)
+            except ValueError:
+                print('Jobs must be able to convert to an integer')
+                sys.exit(1)
+        elif o == "--no-cache":
+            cache_dir = None
+        elif o == "--cache-dir":
+            cache_dir = a
+        elif o == "--format":
+            if a not in REPORTERS:
+                print('Format must be one of %s' % ", ".join(sorted(REPORTERS)))
+                sys.exit(1)
+            output_format = a
+        elif o == "--stream":
+            stream = True
+        elif o == "--profile":
+            profile = True
+        elif o == "--enable":
+            enable.extend(rules.parse_list(a))
+        elif o == "--disable":
+            disable.extend(rules.parse_list(a))
+        elif o == "--config":
+            config = a
+        elif o == "--list-rules":
+            list_rules = True
+        elif o == "--diff":
+            diff = a
+        else:
+            usage()
+            sys.exit(1)
+
+    if list_rules:
+        for line in rules.describe(RULES, RULES):
+            print(line)
+        sys.exit(0)
+
+    # Unknown rules are reported before any file is checked
+    try:
+        if config is not None:
+            enable, disable = rules.merge(rules.load_config(config, 'sstyle', RULES), enable, disable)
+        rules.select(RULES, RULES, enable, disable)
+    except ValueError as e:
+        print(str(e))
+        sys.exit(1)
+
+    if stream and diff is not None:
+        print('--diff cannot be used with --stream')
+        sys.exit(1)
+    changes = None
+    if diff is not None:
+        try:
+            changes = diffs.read_changes(diff)
+        except StyleCheckError as e:
+            print('%s: %s' % (e.message, diff))
+            sys.exit(1)
+        if len(files + args) != 0:
+            files = runner.collect_files(files + args, S_EXTENSIONS)
         else:
+            files = diffs.changed_files(changes, S_EXTENSIONS)
+        # Files the diff does not change have nothing to check
+        changes = diffs.file_changes(changes, files)
+        files = [filename for filename in files if filename in changes]
+    else:
+        files = runner.collect_files(files + args, S_EXTENSIONS)
+        if len(files) == 0:
             usage()
             sys.exit(1)
 
-    if file is None:
-        usage()
+    options = dict(print_headers=print_headers)
+    if enable or disable:
+        options.update(enable=tuple(enable), disable=tuple(disable))
+    if profile:
+        if stream:
+            print('--profile cannot be used with --stream')
+            sys.exit(1)
+        # Cached results would not be checked, so there would be nothing to time
+        options['profile'] = True
+        cache_dir = None
+    reporter = REPORTERS[output_format]('sstyle')
+    if stream:
+        ok = runner.stream_files(SStyleStreamChecker, files, options, reporter=reporter)
+    else:
+        ok = runner.run_files(SStyleChecker, files, options, jobs=jobs, cache_dir=cache_dir,
+                              reporter=reporter, changes=changes)
+    if not ok:
         sys.exit(1)
 
-    stl = SStyleChecker(file, print_headers=print_headers)
-    stl.run()
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,145 @@
+'''
+    Filename: test_cache.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+import cstyle
+from cache import ResultCache, MemoryCache
+
+# Three top level blocks, two of which report a magic number
+SOURCE = '''int f(void) {
+  return 42;
+}
+
+int g(void) {
+  return 0;
+}
+
+int h(void) {
+  return 7;
+}
+'''
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_hit_and_miss(self):
+        cache = ResultCache(self.directory)
+        key = cache.key(b'int x;\n', 'CStyleChecker', 1, {'strict': False})
+        self.assertIsNone(cache.get(key))
+        cache.put(key, {'entries': [], 'lines': 1})
+        self.assertEqual(cache.get(key), {'entries': [], 'lines': 1})
+        # Another process sees what was stored
+        self.assertEqual(ResultCache(self.directory).get(key), {'entries': [], 'lines': 1})
+
+    def test_key(self):
+        cache = ResultCache(self.directory)
+        key = cache.key(b'int x;\n', 'CStyleChecker', 1, {'strict': False})
+        self.assertEqual(key, cache.key(b'int x;\n', 'CStyleChecker', 1, {'strict': False}))
+        others = [cache.key(b'int y;\n', 'CStyleChecker', 1, {'strict': False}),
+                  cache.key(b'int x;\n', 'SStyleChecker', 1, {'strict': False}),
+                  cache.key(b'int x;\n', 'CStyleChecker', 2, {'strict': False}),
+                  cache.key(b'int x;\n', 'CStyleChecker', 1, {'strict': True})]
+        self.assertEqual(len(set(others + [key])), 5)
+
+    def test_eviction(self):
+        # Each entry takes 100 bytes, so the fifth one goes over the cap
+        cache = ResultCache(self.directory, max_size=450)
+        value = 'x' * 98
+        for i in range(4):
+            cache.put('k%d' % i, value)
+            os.utime(cache.path('k%d' % i), (i, i))
+        # Using the oldest entry makes it the most recently used
+        self.assertEqual(cache.get('k0'), value)
+        cache.put('k4', value)
+        kept = sorted([os.path.basename(path) for (mtime, size, path) in cache.entries()])
+        self.assertEqual(kept, ['k0.json', 'k3.json', 'k4.json'])
+        self.assertTrue(cache.size <= 450 * 0.8)
+
+    def test_clear(self):
+        cache = ResultCache(self.directory)
+        cache.put('k', [1])
+        cache.clear()
+        self.assertEqual((cache.get('k'), cache.entries()), (None, []))
+
+
+class MemoryCacheTest(unittest.TestCase):
+    def test_lru(self):
+        cache = MemoryCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')), (1, None, 3))
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+
+
+class IncrementalTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = ResultCache(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    # Returns the checker after checking source with the result cache
+    def check(self, source):
+        checker = cstyle.CStyleChecker('main.c', source=source, result_cache=self.cache)
+        checker.run()
+        return checker
+
+    # Rule and line of the diagnostics of checker
+    def findings(self, checker):
+        return [(d.rule, d.line) for d in checker.collector.diagnostics()]
+
+    def test_unchanged_blocks(self):
+        first = self.check(SOURCE)
+        self.assertEqual(self.findings(first), [('magic-number', 2), ('magic-number', 10)])
+        self.assertTrue(all(b.cached_output is None for b in first.tree))
+
+        second = self.check(SOURCE)
+        self.assertEqual(self.findings(second), self.findings(first))
+        functions = [b for b in second.tree if b.fingerprint is not None]
+        self.assertEqual(len(functions), 3)
+        self.assertTrue(all(b.cached_output is not None for b in functions))
+
+    def test_moved_and_changed_blocks(self):
+        self.check(SOURCE)
+        # f changes and gets a line longer, which moves h down
+        source = SOURCE.replace('  return 42;\n', '  int y = 5;\n  return y;\n')
+        checker = self.check(source)
+        self.assertEqual(self.findings(checker), [('magic-number', 2), ('magic-number', 11)])
+        reused = [b.cached_output is not None for b in checker.tree
+                  if b.fingerprint is not None]
+        self.assertEqual(reused, [False, True, True])
+        self.assertEqual(self.findings(checker),
+                         [(d.rule, d.line) for d in cstyle.check_source(source)])
+
+    def test_options_change_fingerprint(self):
+        self.check(SOURCE)
+        checker = cstyle.CStyleChecker('main.c', source=SOURCE, result_cache=self.cache,
+                                       disable=['magic-number'])
+        checker.run()
+        self.assertEqual(self.findings(checker), [])
+        self.assertTrue(all(b.cached_output is None for b in checker.tree))
+
+
+if __name__ == '__main__':
+    unittest.main()
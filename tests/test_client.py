@@ -0,0 +1,84 @@
+'''
+    Filename: test_client.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+import client
+
+EXAMPLE = os.path.join(ROOT, 'example_outputs', 'file1.c')
+ASSEMBLY = b'main:\n    ldr r0, =42\n\tbx lr\n'
+# A diff that adds main.c
+DIFF = b'''--- /dev/null
++++ b/main.c
+@@ -0,0 +1,3 @@
++int main(void) {
++  return 42;
++}
+'''
+
+
+class ClientTest(unittest.TestCase):
+    # Every test gets a daemon of its own, started by a first check
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.env = dict(os.environ)
+        self.env[client.SOCKET_ENV] = os.path.join(self.directory, 'daemon.sock')
+        self.env['STYLE_CHECKER_CACHE'] = os.path.join(self.directory, 'cache')
+        self.client('cstyle', '-f', EXAMPLE)
+        self.assertTrue(os.path.exists(self.env[client.SOCKET_ENV]))
+
+    def tearDown(self):
+        with open(os.devnull, 'w') as devnull:
+            subprocess.call([sys.executable, os.path.join(ROOT, 'daemon.py'), '--stop'],
+                            env=self.env, stdout=devnull)
+        shutil.rmtree(self.directory)
+
+    # Run script with args and input on stdin. Returns its stdout and status
+    def run_script(self, script, args, stdin=b''):
+        process = subprocess.Popen([sys.executable, os.path.join(ROOT, script)] + list(args),
+                                   stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                   cwd=self.directory, env=self.env)
+        out, _ = process.communicate(stdin)
+        return out, process.returncode
+
+    def client(self, *args, **kwargs):
+        return self.run_script('client.py', args, **kwargs)
+
+    def test_reads_stdin(self):
+        self.assertTrue(client.reads_stdin(['--stream', '-']))
+        self.assertTrue(client.reads_stdin(['--diff=-']))
+        self.assertFalse(client.reads_stdin(['-f', 'main.c', '-s']))
+
+    def test_same_as_checker(self):
+        direct = self.run_script('cstyle.py', ['--no-cache', '-s', '-f', EXAMPLE])
+        self.assertEqual(self.client('cstyle', '--no-cache', '-s', '-f', EXAMPLE), direct)
+
+    def test_stream_stdin(self):
+        out, status = self.client('sstyle', '--stream', '-', stdin=ASSEMBLY)
+        self.assertIn(b'Contains magic number', out)
+        self.assertEqual((out, status),
+                         self.run_script('sstyle.py', ['--stream', '-'], stdin=ASSEMBLY))
+
+    def test_diff_stdin(self):
+        with open(os.path.join(self.directory, 'main.c'), 'w') as f:
+            f.write('int main(void) {\n  return 42;\n}\n')
+        out, status = self.client('cstyle', '--diff', '-', stdin=DIFF)
+        self.assertIn(b'Line 2: Contains magic number', out)
+        self.assertEqual((out, status), self.run_script('cstyle.py', ['--diff', '-'], stdin=DIFF))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+'''
+    Filename: test_cstyle.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import os
+import sys
+import glob
+import unittest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+import cstyle
+from errors import ParseError
+
+
+# Rule and line of each diagnostic cstyle reports for source
+def findings(source, **options):
+    return [(d.rule, d.line) for d in cstyle.check_source(source, **options)]
+
+
+class CaseTest(unittest.TestCase):
+    # The label of a case whose { is on a later line is not part of its
+    # lines, so the number in it is not magic
+    def test_case_label_before_curly(self):
+        source = '\n'.join([
+            'int f(int x) {',
+            '  int y = 0;',
+            '  switch (x) {',
+            '    case 2:',
+            '',
+            '    {',
+            '      y = 1;',
+            '    }',
+            '    break;',
+            '    default:',
+            '      break;',
+            '  }',
+            '  return y;',
+            '}',
+            ''])
+        self.assertNotIn(('magic-number', 4), findings(source))
+
+
+class EndKeywordTest(unittest.TestCase):
+    # The line of a } followed by a keyword is not checked with the block
+    # it closes, as it was before the blocks were parsed into a tree
+    def test_structure_before_else(self):
+        self.assertEqual(findings('{\n  }\n'), [('indentation', 2)])
+        self.assertEqual(findings('{\n  } else {\n'), [])
+        self.assertEqual(findings('}\n  } else {\n  } else {\n'), [])
+
+
+class DiffTest(unittest.TestCase):
+    # Checking one changed line reports what checking the whole file does
+    # on that line
+    def test_same_as_full(self):
+        for path in sorted(glob.glob(os.path.join(ROOT, 'example_outputs', '*.c'))):
+            with open(path) as f:
+                source = f.read()
+            for options in ({}, {'strict': True}):
+                everything = cstyle.check_source(source, **options)
+                for n in range(1, source.count('\n') + 1):
+                    expected = [(d.rule, d.line, d.message) for d in everything
+                                if d.line <= n <= (d.end_line or d.line)]
+                    changed = cstyle.check_source(source, changed=[n], **options)
+                    self.assertEqual([(d.rule, d.line, d.message) for d in changed], expected,
+                                     '%s line %d' % (path, n))
+
+    # The gap --help tells of: without its ;, the statement in f runs into
+    # g, and a full check checks line 5 in both
+    def test_block_past_parent(self):
+        source = 'int f(void) {\n  y = 1\n}\nint g(void) {\n  return 42;\n}\n'
+        self.assertEqual(findings(source), [('indentation', 5), ('magic-number', 5),
+                                            ('magic-number', 5)])
+        self.assertEqual(findings(source, changed=[5]), [('magic-number', 5)])
+
+
+class StatsTest(unittest.TestCase):
+    # Finding the partner of a term is a lookup, however far away it is
+    def test_match_terms(self):
+        source = 'int f(int x) {\n  if (%s) {\n    return 0;\n  }\n}\n' % ' && '.join(['x'] * 100)
+        checker = cstyle.CStyleChecker('main.c', source=source, stats=True)
+        checker.run()
+        counts = checker.stats['match_terms']
+        self.assertTrue(counts['calls'] > 0)
+        self.assertEqual(counts['chars'], counts['calls'])
+
+
+class ParseErrorTest(unittest.TestCase):
+    # Returns the ParseError checking source raises
+    def parse_error(self, source):
+        try:
+            cstyle.check_source(source, filename='bad.c')
+        except ParseError as e:
+            return e
+        self.fail('No ParseError for %r' % source)
+
+    def test_missing_curly(self):
+        e = self.parse_error('int f(void) {\n  return 0;\n')
+        self.assertEqual((e.filename, e.line, e.context), ('bad.c', 1, ['int f(void) {']))
+
+    def test_unbalanced_paren(self):
+        e = self.parse_error('int f(void) {\n  if (x {\n  }\n}\n')
+        self.assertEqual((e.filename, e.line), ('bad.c', 2))
+
+    def test_stray_closer(self):
+        self.assertEqual(self.parse_error(')\n').line, 1)
+        self.assertEqual(self.parse_error('}\n').line, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
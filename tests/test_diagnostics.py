@@ -0,0 +1,71 @@
+'''
+    Filename: test_diagnostics.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+import runner
+from cstyle import CStyleChecker
+from diagnostics import JsonLinesReporter, SarifReporter
+
+
+class FailureTest(unittest.TestCase):
+    # A file that does not exist and one missing its }
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.missing = os.path.join(self.directory, 'missing.c')
+        self.unbalanced = os.path.join(self.directory, 'unbalanced.c')
+        with open(self.unbalanced, 'w') as f:
+            f.write('int f(void) {\n  return 0;\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    # Returns what reporter_cls writes for the files and whether they were checked
+    def run_files(self, reporter_cls):
+        out = StringIO()
+        ok = runner.run_files(CStyleChecker, [self.missing, self.unbalanced], {},
+                              reporter=reporter_cls('cstyle', out))
+        return out.getvalue(), ok
+
+    def test_jsonl(self):
+        text, ok = self.run_files(JsonLinesReporter)
+        self.assertFalse(ok)
+        records = [json.loads(line) for line in text.splitlines()]
+        self.assertEqual(records, [
+            {'file': self.missing, 'error': 'Could not open file', 'line': None},
+            {'file': self.unbalanced, 'error': 'Program ran into an error', 'line': 1},
+        ])
+
+    def test_sarif(self):
+        text, ok = self.run_files(SarifReporter)
+        self.assertFalse(ok)
+        invocation = json.loads(text)['runs'][0]['invocations'][0]
+        self.assertFalse(invocation['executionSuccessful'])
+        notifications = invocation['toolExecutionNotifications']
+        self.assertEqual([n['level'] for n in notifications], ['error', 'error'])
+        locations = [n['locations'][0]['physicalLocation'] for n in notifications]
+        self.assertEqual([l['artifactLocation']['uri'] for l in locations],
+                         [self.missing, self.unbalanced])
+        self.assertEqual(locations[1]['region'], {'startLine': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+'''
+    Filename: test_diffs.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+import diffs
+
+# What git diff writes for a changed, a new, a deleted and a renamed file
+GIT_DIFF = '''diff --git a/src/main.c b/src/main.c
+index 1111111..2222222 100644
+--- a/src/main.c
++++ b/src/main.c
+@@ -1,4 +1,5 @@
+ int main(void) {
+-  return 0;
++  int x = 2;
++  return x;
+ }
+ 
+@@ -10 +11,2 @@ int f(void)
+-old
++new
++newer
+diff --git a/new.c b/new.c
+new file mode 100644
+--- /dev/null
++++ b/new.c
+@@ -0,0 +1,2 @@
++int x;
++int y;
+\\ No newline at end of file
+diff --git a/gone.c b/gone.c
+deleted file mode 100644
+--- a/gone.c
++++ /dev/null
+@@ -1 +0,0 @@
+-int z;
+diff --git a/removed.c b/removed.c
+--- a/removed.c
++++ b/removed.c
+@@ -3,2 +3 @@
+-a
+-b
++c
+'''
+
+# What diff -u writes, with timestamps and no a/ or b/
+PLAIN_DIFF = '''--- b/old.c\t2026-10-18 10:00:00.000000000 +0000
++++ b/old.c\t2026-10-18 11:00:00.000000000 +0000
+@@ -2,2 +2,2 @@
+ x;
+-y;
++z;
+'''
+
+
+class ChangedLinesTest(unittest.TestCase):
+    def test_git_diff(self):
+        changes = diffs.changed_lines(GIT_DIFF.splitlines())
+        self.assertEqual(changes, {
+            os.path.join('src', 'main.c'): [2, 3, 11, 12],
+            'new.c': [1, 2],
+            'removed.c': [3],
+        })
+
+    def test_plain_diff(self):
+        # b/ is only taken off when the old side has a/ in front of it too
+        self.assertEqual(diffs.changed_lines(PLAIN_DIFF.splitlines()),
+                         {os.path.join('b', 'old.c'): [3]})
+
+    def test_only_removed(self):
+        diff = '--- a/main.c\n+++ b/main.c\n@@ -1,2 +1 @@\n x;\n-y;\n'
+        self.assertEqual(diffs.changed_lines(diff.splitlines()), {'main.c': []})
+
+    def test_hunk_lines_like_headers(self):
+        # Lines inside a hunk are never taken for headers
+        diff = '--- a/main.c\n+++ b/main.c\n@@ -1 +1,2 @@\n--- x;\n+++ y;\n+@@ -1 +1 @@\n'
+        self.assertEqual(diffs.changed_lines(diff.splitlines()), {'main.c': [1, 2]})
+
+    def test_stdin(self):
+        stdin = sys.stdin
+        sys.stdin = StringIO(GIT_DIFF)
+        try:
+            changes = diffs.read_changes('-')
+        finally:
+            sys.stdin = stdin
+        self.assertEqual(changes, diffs.changed_lines(GIT_DIFF.splitlines()))
+
+
+class ChangedFilesTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+        os.chdir(self.directory)
+        os.mkdir('src')
+        for path in [os.path.join('src', 'main.c'), 'new.c', 'notes.txt']:
+            with open(path, 'w') as f:
+                f.write('int main(void) {\n  return 0;\n}\n')
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory)
+
+    def test_changed_files(self):
+        changes = diffs.changed_lines(GIT_DIFF.splitlines())
+        changes['notes.txt'] = [1]
+        changes['empty.c'] = []
+        # removed.c does not exist and notes.txt is not C
+        self.assertEqual(diffs.changed_files(changes, ['.c', '.h']),
+                         ['new.c', os.path.join('src', 'main.c')])
+
+    def test_file_changes(self):
+        changes = diffs.changed_lines(GIT_DIFF.splitlines())
+        files = ['./src/main.c', os.path.abspath('new.c'), 'other.c']
+        self.assertEqual(diffs.file_changes(changes, files),
+                         {'./src/main.c': [2, 3, 11, 12], os.path.abspath('new.c'): [1, 2]})
+
+    def test_diff_stdin(self):
+        diff = '--- a/new.c\n+++ b/new.c\n@@ -1,3 +1,3 @@\n int main(void) {\n-  return 1;\n' \
+               '+  return 0;\n }\n--- a/src/main.c\n+++ b/src/main.c\n@@ -4,3 +4,3 @@\n' \
+               ' int g(void) {\n-  return 0;\n+  return 7;\n }\n'
+        with open(os.path.join('src', 'main.c'), 'w') as f:
+            f.write('int main(void) {\n  return 42;\n}\nint g(void) {\n  return 7;\n}\n')
+        process = subprocess.Popen([sys.executable, os.path.join(ROOT, 'cstyle.py'), '--no-cache',
+                                    '--diff', '-'], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        out = process.communicate(diff.encode('utf-8'))[0]
+        # The 42 on line 2 of main.c is not on a changed line
+        self.assertEqual(process.returncode, 0, out)
+        self.assertIn(b'Checking new.c', out)
+        self.assertEqual([line for line in out.splitlines() if line.startswith(b'Line')],
+                         [b'Line 5: Contains magic number'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+'''
+    Filename: test_lexer.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import os
+import sys
+import unittest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from lexer import Lexer
+
+c_lexer = Lexer(['//'])
+
+
+class MaskTest(unittest.TestCase):
+    def test_code(self):
+        self.assertEqual(c_lexer.scan(['x = 1;', '']), (['cccccc', ''], []))
+
+    def test_string(self):
+        masks, _ = c_lexer.scan(['s = "a // b";'])
+        self.assertEqual(masks, ['cccc' + 's' * 8 + 'c'])
+
+    def test_escapes(self):
+        masks, _ = c_lexer.scan(['s = "a\\"b";', "c = '\\'';"])
+        self.assertEqual(masks, ['cccc' + 's' * 6 + 'c', 'cccc' + 'q' * 4 + 'c'])
+
+    def test_char(self):
+        masks, _ = c_lexer.scan(["c = '\"'; d = '/';"])
+        self.assertEqual(masks, ['ccccqqqccccccqqqc'])
+
+    def test_unclosed_literal(self):
+        # A literal that is not closed runs to the end of its line only
+        masks, _ = c_lexer.scan(['s = "abc', 'x;'])
+        self.assertEqual(masks, ['ccccssss', 'cc'])
+
+    def test_line_comment(self):
+        masks, _ = c_lexer.scan(['x; // "not a string" /* nor */'])
+        self.assertEqual(masks, ['ccc' + 'l' * 27])
+
+    def test_block_comment(self):
+        masks, spans = c_lexer.scan(['x /* a', ' "b" // c', ' */ y; /**/'])
+        self.assertEqual(masks, ['cc' + 'b' * 4, 'b' * 9, 'bbbccccbbbb'])
+        self.assertEqual(spans, [((0, 2), (2, 3)), ((2, 7), (2, 11))])
+
+    def test_comment_in_string(self):
+        masks, spans = c_lexer.scan(['s = "/*"; t = \'/\';'])
+        self.assertEqual(masks, ['cccc' + 's' * 4 + 'cccccc' + 'qqq' + 'c'])
+        self.assertEqual(spans, [])
+
+    def test_nested_block_comment(self):
+        # Block comments do not nest, so the first */ ends the comment
+        masks, spans = c_lexer.scan(['/* /* */ x */'])
+        self.assertEqual(masks, ['b' * 8 + 'ccccc'])
+        self.assertEqual(spans, [((0, 0), (0, 8))])
+
+    def test_assembly_comments(self):
+        s_lexer = Lexer(['//', '@', '#'])
+        masks, _ = s_lexer.scan(['mov r0, r1 @ "c"', '# x', 'ldr r0, ="@"'])
+        self.assertEqual(masks, ['c' * 11 + 'l' * 5, 'lll', 'c' * 9 + 'sss'])
+
+
+if __name__ == '__main__':
+    unittest.main()
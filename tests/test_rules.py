@@ -0,0 +1,208 @@
+'''
+    Filename: test_rules.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import glob
+import json
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+import cstyle
+import rules
+import sstyle
+
+# Comments that fall under more than one of the comment rules
+COMMENTS_SOURCE = '\n'.join([
+    'int main(void) {',
+    '  //int y = 5;',
+    '  //TODO: x = y;',
+    '  //TODO finish this',
+    '  //nothing',
+    '  return 0;',
+    '}',
+    ''])
+
+ASSEMBLY_SOURCE = '\n'.join([
+    '@ TODO: mov r0, #1',
+    '    .global main',
+    'main:',
+    '    mov r0, #5',
+    '\tbx lr',
+    ''])
+
+
+def findings(diagnostics):
+    return sorted([(d.rule, d.line, d.message) for d in diagnostics])
+
+
+class DisableTest(unittest.TestCase):
+    # Disabling rule removes its findings and leaves the others as they are
+    def check_disable(self, check, known, source, **options):
+        everything = findings(check(source, **options))
+        for rule in known:
+            expected = [f for f in everything if f[0] != rule]
+            self.assertEqual(findings(check(source, disable=[rule], **options)), expected,
+                             'Disabling %s changed the other rules' % rule)
+
+    def test_cstyle_examples(self):
+        sources = [COMMENTS_SOURCE]
+        for path in sorted(glob.glob(os.path.join(ROOT, 'example_outputs', '*.c'))):
+            with open(path) as f:
+                sources.append(f.read())
+        for source in sources:
+            self.check_disable(cstyle.check_source, cstyle.RULES, source,
+                               strict=True, check_whitespace=True)
+            self.check_disable(cstyle.check_source, cstyle.RULES, source)
+
+    def test_sstyle(self):
+        self.check_disable(sstyle.check_source, sstyle.RULES, ASSEMBLY_SOURCE)
+
+
+class SelectTest(unittest.TestCase):
+    def test_parse_list(self):
+        self.assertEqual(rules.parse_list(' magic-number,, todo-comment ,'),
+                         ['magic-number', 'todo-comment'])
+
+    def test_select(self):
+        known = ['a', 'b', 'c']
+        self.assertEqual(rules.select(known, ['a', 'b']), frozenset(['a', 'b']))
+        self.assertEqual(rules.select(known, ['a'], enable=['c'], disable=['a']),
+                         frozenset(['c']))
+        # Disabling wins over enabling
+        self.assertEqual(rules.select(known, [], enable=['b'], disable=['b']), frozenset())
+        self.assertRaises(ValueError, rules.select, known, known, enable=['d'])
+        self.assertRaises(ValueError, rules.select, known, known, disable=['d'])
+
+    def test_merge(self):
+        config = (['todo-comment', 'tab-indent'], ['magic-number', 'indentation'])
+        # The command line overrides the config file either way
+        self.assertEqual(rules.merge(config, ['magic-number'], ['todo-comment']),
+                         (('tab-indent', 'magic-number'), ('indentation', 'todo-comment')))
+        self.assertEqual(rules.merge(config, [], []),
+                         (('todo-comment', 'tab-indent'), ('magic-number', 'indentation')))
+
+    def test_describe(self):
+        lines = rules.describe(cstyle.RULES, cstyle.default_rules())
+        self.assertEqual(len(lines), len(cstyle.RULES))
+        self.assertEqual([line.split()[:2] for line in lines if 'curly-braces' in line],
+                         [['curly-braces', 'off']])
+        for rule in cstyle.RULES + sstyle.RULES:
+            self.assertIn(rule, rules.DESCRIPTIONS)
+
+    def test_checker_rules(self):
+        source = 'int f(void) {\n  return 42;\n}\n'
+        self.assertEqual([d.rule for d in cstyle.check_source(source)], ['magic-number'])
+        self.assertEqual(cstyle.check_source(source, disable=['magic-number']), [])
+        self.assertRaises(ValueError, cstyle.check_source, '', disable=['space-indent'])
+        strict = cstyle.check_source('int f(void) {\n  if(x) {\n  }\n}\n', strict=True,
+                                     disable=['condition-spacing'])
+        self.assertNotIn('condition-spacing', [d.rule for d in strict])
+
+
+class ConfigTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    # Path of a config file holding text
+    def config(self, text):
+        path = os.path.join(self.directory, 'style.cfg')
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def test_sections(self):
+        path = self.config('[rules]\ndisable = magic-number\n'
+                           '[cstyle]\nenable = trailing-whitespace\ndisable = todo-comment\n'
+                           '[sstyle]\ndisable = space-indent\n')
+        self.assertEqual(rules.load_config(path, 'cstyle', cstyle.RULES),
+                         (['trailing-whitespace'], ['magic-number', 'todo-comment']))
+        self.assertEqual(rules.load_config(path, 'sstyle', sstyle.RULES),
+                         ([], ['magic-number', 'space-indent']))
+
+    def test_unknown_rule(self):
+        # Only the section of the checker keeps rules it does not report,
+        # which select then rejects
+        path = self.config('[cstyle]\ndisable = space-indent\n')
+        enable, disable = rules.load_config(path, 'cstyle', cstyle.RULES)
+        self.assertEqual(disable, ['space-indent'])
+        self.assertRaises(ValueError, rules.select, cstyle.RULES, cstyle.RULES, enable, disable)
+
+    def test_bad_file(self):
+        self.assertRaises(ValueError, rules.load_config,
+                          os.path.join(self.directory, 'missing.cfg'), 'cstyle', cstyle.RULES)
+        path = self.config('disable = magic-number\n')
+        self.assertRaises(ValueError, rules.load_config, path, 'cstyle', cstyle.RULES)
+
+    def test_command_line(self):
+        path = self.config('[cstyle]\ndisable = magic-number\n')
+        source = os.path.join(self.directory, 'main.c')
+        with open(source, 'w') as f:
+            f.write('int f(void) {\n  return 42;\n}\n')
+        script = os.path.join(ROOT, 'cstyle.py')
+
+        def run(*args):
+            process = subprocess.Popen([sys.executable, script, '--no-cache'] + list(args),
+                                       stdout=subprocess.PIPE)
+            return process.communicate()[0], process.returncode
+
+        self.assertNotIn(b'magic number', run('--config', path, '-f', source)[0])
+        # The command line overrides the config file
+        self.assertIn(b'magic number',
+                      run('--config', path, '--enable', 'magic-number', '-f', source)[0])
+        self.assertEqual(run('--disable', 'space-indent', '-f', source),
+                         (b'Unknown rule space-indent\n', 1))
+        out, status = run('--list-rules')
+        self.assertEqual((len(out.splitlines()), status), (len(cstyle.RULES), 0))
+
+
+class SharedConfigTest(unittest.TestCase):
+    # One config file with the rules of both checkers in [rules]
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.config = os.path.join(self.directory, 'style.cfg')
+        with open(self.config, 'w') as f:
+            f.write('[rules]\ndisable = magic-number, curly-braces, space-indent\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_load_config(self):
+        self.assertEqual(rules.load_config(self.config, 'cstyle', cstyle.RULES),
+                         ([], ['magic-number', 'curly-braces']))
+        self.assertEqual(rules.load_config(self.config, 'sstyle', sstyle.RULES),
+                         ([], ['magic-number', 'space-indent']))
+
+    def test_both_checkers(self):
+        sources = [('main.c', 'int main(void) {\n  return 42;\n}\n', cstyle, 'cstyle.py'),
+                   ('main.s', ASSEMBLY_SOURCE, sstyle, 'sstyle.py')]
+        for name, source, checker, script in sources:
+            path = os.path.join(self.directory, name)
+            with open(path, 'w') as f:
+                f.write(source)
+            process = subprocess.Popen([sys.executable, os.path.join(ROOT, script), '--no-cache',
+                                        '--format', 'jsonl', '--config', self.config, '-f', path],
+                                       stdout=subprocess.PIPE)
+            out = process.communicate()[0].decode('utf-8')
+            self.assertEqual(process.returncode, 0, out)
+            disabled = ['magic-number', 'curly-braces', 'space-indent']
+            expected = [d.rule for d in checker.check_source(source)
+                        if d.rule not in disabled]
+            self.assertEqual([json.loads(line)['rule'] for line in out.splitlines()], expected)
+            self.assertNotEqual(expected, [d.rule for d in checker.check_source(source)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+'''
+    Filename: test_runner.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import os
+import sys
+import glob
+import unittest
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+import runner
+from cstyle import CStyleChecker
+from diagnostics import JsonLinesReporter
+
+EXAMPLES = sorted(glob.glob(os.path.join(ROOT, 'example_outputs', '*.c')))
+
+
+class RunFilesTest(unittest.TestCase):
+    def setUp(self):
+        self.fork_pool = runner.fork_pool
+        self.pools = []
+
+    def tearDown(self):
+        runner.fork_pool = self.fork_pool
+
+    # Pools are made by fork_pool, which is wrapped to see the jobs of each
+    def counted_pool(self, jobs):
+        self.pools.append(jobs)
+        return self.fork_pool(jobs)
+
+    # What checking the examples with jobs processes writes as jsonl
+    def run_files(self, jobs):
+        out = StringIO()
+        ok = runner.run_files(CStyleChecker, EXAMPLES, {}, jobs=jobs,
+                              reporter=JsonLinesReporter('cstyle', out))
+        self.assertTrue(ok)
+        return out.getvalue()
+
+    def test_jobs(self):
+        runner.fork_pool = self.counted_pool
+        single = self.run_files(1)
+        self.assertEqual(self.pools, [])
+        self.assertEqual(self.run_files(2), single)
+        self.assertEqual(self.pools, [2])
+
+    def test_no_fork(self):
+        # Where processes cannot be forked, the files are checked by this one
+        runner.fork_pool = lambda jobs: None
+        self.assertEqual(self.run_files(2), self.run_files(1))
+
+
+if __name__ == '__main__':
+    unittest.main()
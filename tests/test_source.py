@@ -0,0 +1,134 @@
+'''
+    Filename: test_source.py
+    Author: Daniel Nguyen
+    Date Created: October 18, 2026
+    Last Modified: October 18, 2026
+    Python Version: 2.7
+'''
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+import source
+from errors import SourceError
+from source import MappedLines, TabLines, ExpandedLines
+
+# Texts whose lines the loaders must agree on
+TEXTS = [
+    b'',
+    b'\n',
+    b'int x;',
+    b'int x;\n\n',
+    b'int f(void) {\n\treturn 0;\t// zero\n}\n',
+    b'a\r\nb\rc\n\r\n',
+    b'\t\t\n  \tx\t\ty\n\t',
+]
+
+
+class LoaderTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.chunks = (source.INDEX_CHUNK, source.SPLIT_CHUNK)
+
+    def tearDown(self):
+        source.INDEX_CHUNK, source.SPLIT_CHUNK = self.chunks
+        shutil.rmtree(self.directory)
+
+    def write(self, data, name='main.c'):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    # The lines of the file at path as every loader gives them
+    def all_lines(self, path):
+        read = source.read_source(path)
+        return [source.split_lines(read), list(source.iter_split_lines(read)),
+                list(source.iter_lines(path)), list(MappedLines(path))]
+
+    def test_same_lines(self):
+        # Chunks of a few bytes make every line cross one
+        source.INDEX_CHUNK, source.SPLIT_CHUNK = 3, 2
+        for text in TEXTS:
+            lines = self.all_lines(self.write(text))
+            for other in lines[1:]:
+                self.assertEqual(other, lines[0], repr(text))
+
+    def test_mapped_indexing(self):
+        path = self.write(b'a\nbb\n\tc\n')
+        lines = MappedLines(path)
+        self.assertEqual((len(lines), lines[1], lines[-1], lines[0:2]),
+                         (3, 'bb', '\tc', ['a', 'bb']))
+
+    def test_map_threshold(self):
+        # Lines that do not add up to the threshold, so the last is shorter
+        line = b'\tint value; // ' + b'x' * 44 + b'\n'
+        count = source.MAP_THRESHOLD // len(line)
+        last = b'y' * (source.MAP_THRESHOLD - count * len(line))
+        text = line * count + last
+        below = source.load_lines(self.write(text[:-1], 'below.c'))
+        at = source.load_lines(self.write(text, 'at.c'))
+        self.assertNotIsInstance(below, MappedLines)
+        self.assertIsInstance(at, MappedLines)
+        below = list(below)
+        at = list(at)
+        self.assertEqual((len(below), len(at)), (count + 1, count + 1))
+        self.assertTrue(below[:-1] == at[:-1])
+        self.assertEqual((below[-1] + 'y', at[-1]), (last.decode(), last.decode()))
+
+    def test_missing_file(self):
+        missing = os.path.join(self.directory, 'missing.c')
+        self.assertRaises(SourceError, source.load_lines, missing)
+        self.assertRaises(SourceError, MappedLines, missing)
+        self.assertRaises(SourceError, source.read_source, missing)
+
+
+class TabLinesTest(unittest.TestCase):
+    LINES = ['int x;', '\tx = 1;', 'a\tb\t\tc', '\t', '']
+
+    def check_lines(self, lines, tab_length):
+        self.assertEqual(len(lines), len(self.LINES))
+        for n, raw in enumerate(self.LINES):
+            self.assertEqual(lines[n], raw.replace('\t', ' ' * tab_length))
+            self.assertEqual(lines.raw(n), raw)
+            self.assertEqual(lines.raw_length(n), len(raw))
+            self.assertEqual(lines.has_tabs(n), '\t' in raw)
+        self.assertEqual(list(lines), [l.replace('\t', ' ' * tab_length) for l in self.LINES])
+
+    def test_tab_lines(self):
+        for tab_length in (1, 2, 4):
+            self.check_lines(TabLines(self.LINES, tab_length), tab_length)
+
+    def test_expanded_lines(self):
+        for tab_length in (1, 2, 4):
+            self.check_lines(ExpandedLines(self.LINES, tab_length), tab_length)
+
+    def test_expand_tabs(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'main.s')
+            with open(path, 'w') as f:
+                f.write('\n'.join(self.LINES) + '\n')
+            mapped = source.expand_tabs(MappedLines(path), 2)
+            read = source.expand_tabs(source.split_lines(source.read_source(path)), 2)
+            self.assertIsInstance(mapped, ExpandedLines)
+            self.assertIsInstance(read, TabLines)
+            self.check_lines(mapped, 2)
+            self.check_lines(read, 2)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_unexpand_line(self):
+        for line in self.LINES:
+            expanded, tabs = source.expand_line(line, '   ')
+            self.assertEqual(source.unexpand_line(expanded, tabs, 3), line)
+
+
+if __name__ == '__main__':
+    unittest.main()